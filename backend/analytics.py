@@ -0,0 +1,125 @@
+# analytics.py: Rollup kepatuhan per jam/hari yang diperbarui bersamaan dengan penulisan gate_logs
+import json
+from collections import Counter
+
+GRANULARITIES = ("hour", "day")
+DIMENSIONS = ("all", "company", "role", "cctv", "missing")  # missing = item PPE_WAJIB/PPE_OPSIONAL yang tidak dipakai
+
+ROLLUP_TABLE = """
+    CREATE TABLE IF NOT EXISTS gate_log_rollups (
+        granularity VARCHAR(8) NOT NULL,
+        dimension VARCHAR(16) NOT NULL,
+        bucket_start DATETIME NOT NULL,
+        dim_value VARCHAR(128) NOT NULL,
+        ppe_status VARCHAR(16) NOT NULL,
+        count INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (granularity, dimension, bucket_start, dim_value, ppe_status)
+    )
+"""
+
+UPSERT_SQL = """
+    INSERT INTO gate_log_rollups (granularity, dimension, bucket_start, dim_value, ppe_status, count)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE count = count + VALUES(count)
+"""
+
+def bucket_start(timestamp, granularity):
+    timestamp = timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0) if granularity == "day" else timestamp
+
+def missing_items(ppe_details):
+    """Item APD yang tidak terdeteksi dari kolom ppe_details (JSON string atau dict)."""
+    details = json.loads(ppe_details) if isinstance(ppe_details, str) else ppe_details
+    used = details.get("ppe_used", {})
+    return [item for group in ("wajib", "opsional") for item, detected in used.get(group, {}).items() if not detected]
+
+def event_dimensions(company, role, cctv_id, missing):
+    yield "all", ""
+    yield "company", company or ""
+    yield "role", role or ""
+    yield "cctv", str(cctv_id) if cctv_id is not None else "local"
+    for item in missing:
+        yield "missing", item
+
+def rollup_deltas(events):
+    """events: iterable (timestamp, ppe_status, company, role, cctv_id, missing) -> Counter per kunci rollup."""
+    deltas = Counter()
+    for timestamp, status, company, role, cctv_id, missing in events:
+        for granularity in GRANULARITIES:
+            bucket = bucket_start(timestamp, granularity)
+            for dimension, value in event_dimensions(company, role, cctv_id, missing):
+                deltas[(granularity, dimension, bucket, value, status)] += 1
+    return deltas
+
+def apply_deltas(cursor, deltas):
+    if deltas:
+        cursor.executemany(UPSERT_SQL, [key + (count,) for key, count in deltas.items()])
+
+def update_rollups(cursor, batch):
+    """Hook GateLogWriter: dipanggil dalam transaksi yang sama dengan INSERT gate_logs.
+
+    batch = [(row, meta), ...] dengan row = (worker_id, timestamp_in, ppe_status, ppe_details, cctv_id)
+    dan meta = {"company", "role", "missing"} dari pipeline (tanpa perlu parse JSON lagi).
+    """
+    events = []
+    for (worker_id, timestamp, status, ppe_details, cctv_id), meta in batch:
+        meta = meta or {}
+        missing = meta["missing"] if "missing" in meta else missing_items(ppe_details)
+        events.append((timestamp, status, meta.get("company"), meta.get("role"), cctv_id, missing))
+    apply_deltas(cursor, rollup_deltas(events))
+
+def rebuild_rollups(db_cursor, chunk_size=5000, archive=None):
+    """Hitung ulang seluruh rollup dari gate_logs (backfill awal atau perbaikan), plus bulan di archive (LogArchive).
+
+    Baris dengan log_id di atas max_id saat mulai sudah ditangani writer secara inkremental.
+    """
+    with db_cursor() as cursor:
+        # DELETE dulu, max_id sesudahnya dalam transaksi yang sama. DELETE mengunci semua baris + gap rollup
+        # (REPEATABLE READ), jadi batch writer yang belum commit tertahan di upsert rollup-nya sampai transaksi
+        # ini selesai: barisnya tidak terlihat oleh MAX() di bawah dan hitungannya masuk ke tabel yang sudah kosong.
+        # Batch yang commit sebelum DELETE ikut terhapus, tapi log_id-nya <= max_id sehingga dihitung ulang di sini.
+        cursor.execute("DELETE FROM gate_log_rollups")
+        cursor.execute("SELECT COALESCE(MAX(log_id), 0) FROM gate_logs")
+        max_id = cursor.fetchone()[0]
+
+    last_id, total = 0, 0
+    while last_id < max_id:
+        with db_cursor() as cursor:
+            cursor.execute("""
+                SELECT gl.log_id, gl.timestamp_in, gl.ppe_status, gl.ppe_details, gl.cctv_id, w.company, w.role
+                FROM gate_logs gl JOIN workers w ON gl.worker_id = w.id
+                WHERE gl.log_id > %s AND gl.log_id <= %s ORDER BY gl.log_id LIMIT %s
+            """, (last_id, max_id, chunk_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            apply_deltas(cursor, rollup_deltas(
+                (ts, status, company, role, cctv_id, missing_items(details))
+                for _, ts, status, details, cctv_id, company, role in rows))
+            last_id = rows[-1][0]
+            total += len(rows)
+
+    for rows in (archive.scan(batch_size=chunk_size) if archive is not None else ()):
+        with db_cursor() as cursor:
+            apply_deltas(cursor, rollup_deltas(
+                (row["timestamp"], row["status"], row["company"], row["role"], row["cctv_id"], row["missing"])
+                for row in rows))
+        total += len(rows)
+    return total
+
+def build_rollup_query(granularity, dimension, start=None, end=None, group="bucket"):
+    """group="bucket": deret waktu per bucket; group="total": jumlah per nilai dimensi dalam rentang."""
+    where, val = ["granularity = %s", "dimension = %s"], [granularity, dimension]
+    if start is not None:
+        where.append("bucket_start >= %s")
+        val.append(bucket_start(start, granularity))
+    if end is not None:
+        where.append("bucket_start < %s")
+        val.append(end)
+    if group == "total":
+        sql = (f"SELECT dim_value AS value, ppe_status AS status, SUM(count) AS count FROM gate_log_rollups "
+               f"WHERE {' AND '.join(where)} GROUP BY dim_value, ppe_status ORDER BY dim_value")
+    else:
+        sql = (f"SELECT bucket_start AS bucket, dim_value AS value, ppe_status AS status, count FROM gate_log_rollups "
+               f"WHERE {' AND '.join(where)} ORDER BY bucket_start, dim_value")
+    return sql, tuple(val)
@@ -0,0 +1,94 @@
+# association.py: Pasca-proses deteksi tervektorisasi, APD dikaitkan ke orang dan wajah lewat matriks containment NumPy
+import numpy as np
+
+from ppe_classes import CLASS_NAMES, PPE_WAJIB, PPE_OPSIONAL
+
+ITEM_MIN_CONTAINMENT = 0.5  # Bagian minimum kotak APD yang harus berada di dalam region orang
+FACE_MIN_CONTAINMENT = 0.6  # Bagian minimum kotak wajah di dalam kotak 'person' agar dianggap orang yang sama
+
+PPE_ITEMS = sorted(PPE_WAJIB | PPE_OPSIONAL)  # Urutan kolom matriks hasil
+
+# class_id -> kolom PPE_ITEMS (-1 = bukan APD yang dinilai); beberapa class_id bisa berbagi label (coverall)
+_NUM_CLASSES = max(CLASS_NAMES) + 1
+ITEM_COLUMN = np.full(_NUM_CLASSES, -1, dtype=np.int64)
+for _class_id, _label in CLASS_NAMES.items():
+    if _label in PPE_ITEMS:
+        ITEM_COLUMN[_class_id] = PPE_ITEMS.index(_label)
+PERSON_CLASSES = np.array([class_id for class_id, label in CLASS_NAMES.items() if label == 'person'])
+
+
+def faces_to_xyxy(face_locations):
+    """(top, right, bottom, left) face_recognition -> array (F, 4) [x1, y1, x2, y2]."""
+    faces = np.asarray(face_locations, dtype=np.float32).reshape(-1, 4)
+    return faces[:, [3, 0, 1, 2]]
+
+def containment_matrix(regions, boxes):
+    """(R, B): bagian luas boxes[j] yang berada di dalam regions[i]. Format keduanya xyxy."""
+    x1 = np.maximum(regions[:, None, 0], boxes[None, :, 0])
+    y1 = np.maximum(regions[:, None, 1], boxes[None, :, 1])
+    x2 = np.minimum(regions[:, None, 2], boxes[None, :, 2])
+    y2 = np.minimum(regions[:, None, 3], boxes[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    return np.divide(inter, area[None, :], out=np.zeros_like(inter), where=area[None, :] > 0)
+
+def body_regions(faces):
+    """Perkiraan region badan dari kotak wajah, untuk wajah tanpa kotak 'person' (mis. kamera gate jarak dekat)."""
+    width = faces[:, 2] - faces[:, 0]
+    height = faces[:, 3] - faces[:, 1]
+    return np.stack([faces[:, 0] - 1.5 * width, faces[:, 1] - 0.5 * height,
+                     faces[:, 2] + 1.5 * width, faces[:, 3] + 7.0 * height], axis=1)
+
+def match_faces_to_persons(contain):
+    """contain (P, F) -> indeks person per wajah (-1 = tidak ada). Satu wajah per person, pasangan terkuat dulu."""
+    owner = np.full(contain.shape[1], -1, dtype=np.int64)
+    if contain.size == 0:
+        return owner
+    taken = np.zeros(contain.shape[0], dtype=bool)
+    for flat in np.argsort(contain, axis=None)[::-1]:
+        person, face = divmod(int(flat), contain.shape[1])
+        if contain[person, face] < FACE_MIN_CONTAINMENT:
+            break
+        if owner[face] < 0 and not taken[person]:
+            owner[face] = person
+            taken[person] = True
+    return owner
+
+def associate_ppe(detections, face_locations):
+    """APD per wajah dari satu frame.
+
+    detections: array (N, 6) [x1, y1, x2, y2, conf, class_id] dari PPEDetector.detect.
+    Returns bool array (F, len(PPE_ITEMS)): wajah f memakai PPE_ITEMS[k].
+
+    Region tiap wajah = kotak 'person' yang memuatnya, atau perkiraan badan bila tidak ada. Region orang
+    tanpa wajah dikenali ikut bersaing, sehingga APD orang lain di frame tidak ikut terhitung.
+    Setiap item APD masuk ke satu region dengan containment tertinggi (minimal ITEM_MIN_CONTAINMENT).
+    """
+    faces = faces_to_xyxy(face_locations)
+    worn = np.zeros((len(faces), len(PPE_ITEMS)), dtype=bool)
+    if len(faces) == 0:
+        return worn
+
+    class_ids = detections[:, 5].astype(np.int64)
+    known = (class_ids >= 0) & (class_ids < _NUM_CLASSES)
+    columns = np.where(known, ITEM_COLUMN[np.clip(class_ids, 0, _NUM_CLASSES - 1)], -1)
+    persons = detections[np.isin(class_ids, PERSON_CLASSES), :4]
+
+    # 1. Wajah -> person; wajah tanpa person mendapat region perkiraan di belakang daftar person
+    face_person = match_faces_to_persons(containment_matrix(persons, faces))
+    unmatched = face_person < 0
+    regions = np.concatenate([persons, body_regions(faces[unmatched])])
+    face_region = face_person.copy()
+    face_region[unmatched] = len(persons) + np.arange(unmatched.sum())
+
+    # 2. Item APD -> region dengan containment tertinggi
+    is_item = columns >= 0
+    items, item_columns = detections[is_item, :4], columns[is_item]
+    region_worn = np.zeros((len(regions), len(PPE_ITEMS)), dtype=bool)
+    if len(items):
+        contain = containment_matrix(regions, items)
+        best = contain.argmax(axis=0)
+        assigned = contain[best, np.arange(len(items))] >= ITEM_MIN_CONTAINMENT
+        region_worn[best[assigned], item_columns[assigned]] = True
+
+    return region_worn[face_region]
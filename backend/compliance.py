@@ -0,0 +1,193 @@
+# compliance.py: Evaluasi kepatuhan APD + SIML per pekerja dan overlay untuk satu frame (dipakai server dan benchmark)
+import collections
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+from metrics import COMPLIANCE_DECISIONS
+from ppe_classes import CLASS_NAMES, COLOR_MAP, PPE_WAJIB, PPE_OPSIONAL
+from association import associate_ppe, PPE_ITEMS
+
+# Smoothing per pekerja: status APD dari COMPLIANCE_WINDOW observasi terakhir (semua kamera), bukan satu frame
+COMPLIANCE_WINDOW = int(os.getenv("COMPLIANCE_WINDOW", "15"))
+COMPLIANCE_MIN_FRAMES = int(os.getenv("COMPLIANCE_MIN_FRAMES", "3"))  # Observasi sebelum status pertama dicatat
+# Hysteresis: item baru dianggap lepas bila hilang di >= OFF_RATIO window, dan dipakai lagi bila terlihat di >= ON_RATIO
+COMPLIANCE_OFF_RATIO = float(os.getenv("COMPLIANCE_OFF_RATIO", "0.7"))
+COMPLIANCE_ON_RATIO = float(os.getenv("COMPLIANCE_ON_RATIO", "0.6"))
+COMPLIANCE_HEARTBEAT_SECONDS = float(os.getenv("COMPLIANCE_HEARTBEAT_SECONDS", "60"))  # Log ulang status yang sama
+COMPLIANCE_EXPIRE_SECONDS = float(os.getenv("COMPLIANCE_EXPIRE_SECONDS", "30"))  # Tak terlihat selama ini = kunjungan baru
+
+
+def evaluate(user_info, ppe_worn):
+    """(overall_status, description, status_wajib, status_opsional) dari item APD yang dipakai."""
+    status_wajib = {item: ppe_worn[item] for item in PPE_WAJIB}
+    status_opsional = {item: ppe_worn[item] for item in PPE_OPSIONAL}
+
+    is_wajib_lengkap = all(status_wajib.values())
+    is_opsional_lengkap = all(status_opsional.values())
+    is_siml_aktif = user_info['status_sim_l'] == 'Aktif'
+
+    overall_status = "merah"
+    description = []
+
+    if not is_siml_aktif:
+        overall_status = "merah"
+        description.append("SIML Tidak Aktif")
+    else:
+        if not is_wajib_lengkap:
+            overall_status = "merah"
+            missing_wajib = [item for item, detected in status_wajib.items() if not detected]
+            description.extend([f"Tidak Menggunakan <b style='color:red'>{item.capitalize()}</b>" for item in missing_wajib])
+        else:
+            if is_opsional_lengkap:
+                overall_status = "hijau"
+                description.append("APD Lengkap dan SIML Aktif")
+            else:
+                overall_status = "orange"
+                missing_opsional = [item for item, detected in status_opsional.items() if not detected]
+                description.extend([f"Tidak Menggunakan <b style='color:orange'>{item.capitalize()}</b>" for item in missing_opsional])
+    return overall_status, description, status_wajib, status_opsional
+
+
+class ComplianceStore:
+    """State kepatuhan per pekerja untuk seluruh proses: semua kamera dan koneksi dashboard berbagi satu store.
+
+    observe() menggabungkan deteksi APD satu frame ke window pekerja itu, menghaluskannya dengan hysteresis
+    (satu frame tanpa helm tidak langsung "merah"), dan mengirim baris gate_logs ke log_sink(row, meta) hanya
+    bila status halus berubah atau heartbeat_seconds lewat sejak log terakhir. Aman dipanggil dari banyak thread.
+    """
+
+    def __init__(self, log_sink, window=COMPLIANCE_WINDOW, min_frames=COMPLIANCE_MIN_FRAMES,
+                 off_ratio=COMPLIANCE_OFF_RATIO, on_ratio=COMPLIANCE_ON_RATIO,
+                 heartbeat_seconds=COMPLIANCE_HEARTBEAT_SECONDS, expire_seconds=COMPLIANCE_EXPIRE_SECONDS):
+        self.log_sink = log_sink
+        self.window = max(1, window)
+        self.min_frames = max(1, min(min_frames, self.window))
+        self.off_ratio = off_ratio
+        self.on_ratio = on_ratio
+        self.heartbeat = timedelta(seconds=heartbeat_seconds)
+        self.expire = timedelta(seconds=expire_seconds)
+        self.counts = {"observed": 0, "logged_change": 0, "logged_heartbeat": 0, "suppressed": 0, "expired": 0}
+        self._workers = {}  # user_id -> {"samples", "worn", "last_seen", "logged_status", "logged_at"}
+        self._lock = threading.Lock()
+        self._swept_at = datetime.now()
+
+    def _smooth(self, entry):
+        """Item APD dengan hysteresis. Status awal = mayoritas sampel (seri = dipakai)."""
+        samples = entry["samples"]
+        worn = dict(entry["worn"])
+        for item in PPE_ITEMS:
+            seen = sum(1 for sample in samples if sample[item]) / len(samples)
+            previous = worn.get(item)
+            if previous is None:
+                worn[item] = seen >= 0.5
+            elif previous and 1 - seen >= self.off_ratio:
+                worn[item] = False
+            elif not previous and seen >= self.on_ratio:
+                worn[item] = True
+        return worn
+
+    def _sweep(self, now):
+        """Buang pekerja yang tidak terlihat lebih lama dari expire (paling sering sekali per periode expire)."""
+        if now - self._swept_at < self.expire:
+            return
+        self._swept_at = now
+        for user_id in [user_id for user_id, entry in self._workers.items() if now - entry["last_seen"] > self.expire]:
+            del self._workers[user_id]
+            self.counts["expired"] += 1
+
+    def observe(self, user_info, ppe_worn, cctv_id=None, now=None):
+        """Satu observasi pekerja di satu frame. Returns ppe_status halus untuk response dashboard."""
+        now = now or datetime.now()
+        user_id = user_info['id']
+        with self._lock:
+            self._sweep(now)
+            entry = self._workers.get(user_id)
+            if entry is not None and now - entry["last_seen"] > self.expire:
+                self.counts["expired"] += 1
+                entry = None
+            if entry is None:
+                entry = self._workers[user_id] = {"samples": collections.deque(maxlen=self.window), "worn": {},
+                                                  "last_seen": now, "logged_status": None, "logged_at": None}
+            entry["samples"].append(ppe_worn)
+            entry["last_seen"] = now
+            self.counts["observed"] += 1
+            worn = self._smooth(entry)
+            # Kunjungan baru: tampilkan mayoritas sementara, status ditetapkan + dicatat setelah min_frames observasi
+            settled = bool(entry["worn"]) or len(entry["samples"]) >= self.min_frames
+            decision = None
+            overall_status, description, status_wajib, status_opsional = evaluate(user_info, worn)
+            if settled:
+                entry["worn"] = worn
+                if overall_status != entry["logged_status"]:
+                    decision = "logged_change"
+                elif now - entry["logged_at"] >= self.heartbeat:
+                    decision = "logged_heartbeat"
+                else:
+                    decision = "suppressed"
+                self.counts[decision] += 1
+                if decision != "suppressed":
+                    entry["logged_status"], entry["logged_at"] = overall_status, now
+        if decision is not None:
+            COMPLIANCE_DECISIONS.inc(result=decision)
+        if decision in ("logged_change", "logged_heartbeat"):
+            ppe_used = {"wajib": status_wajib, "opsional": status_opsional}
+            details = json.dumps({"ppe_used": ppe_used, "description": "; ".join(description)})
+            # cctv_id None untuk kamera lokal dashboard
+            missing = [item for group in (status_wajib, status_opsional) for item, detected in group.items() if not detected]
+            self.log_sink((user_id, now, overall_status, details, cctv_id),
+                          {"company": user_info['company'], "role": user_info['role'], "missing": missing})
+        return {"wajib": status_wajib, "opsional": status_opsional, "overall": overall_status, "description": description}
+
+    def stats(self):
+        with self._lock:
+            return {**self.counts, "tracked": len(self._workers)}
+
+    def __len__(self):
+        return len(self._workers)
+
+
+def process_frame(frame, detections, faces, state, store):
+    """Kepatuhan + overlay untuk satu frame yang sudah dideteksi dan dikenali. state dibagi per kamera.
+
+    Frame tidak digambari di sini; kotak dan label masuk response_data["overlay"] dan digambar
+    oleh FramePacket (sekali, hanya bila ada client yang meminta frame beranotasi) atau oleh client.
+    store: ComplianceStore bersama semua kamera; status dihaluskan dan log gate_logs di-dedup di sana.
+    """
+    overlay = {"boxes": [], "faces": []}
+
+    # 1. Hasil deteksi YOLO (inferensi sudah jalan di executor); satu tolist() untuk semua box
+    for x1, y1, x2, y2, conf, class_id in detections.tolist():
+        label = CLASS_NAMES.get(int(class_id), 'unknown')
+
+        # Bounding box untuk semua item APD; COLOR_MAP dalam BGR
+        b, g, r = COLOR_MAP.get(label, (0, 0, 0))
+        overlay["boxes"].append({"label": label, "box": [int(x1), int(y1), int(x2), int(y2)],
+                                 "conf": round(conf, 2), "color": f"#{r:02x}{g:02x}{b:02x}"})
+
+    # 2. APD per orang: setiap wajah hanya mendapat item di dalam region badannya, bukan APD semua orang di frame
+    worn = associate_ppe(detections, [location for location, _ in faces])
+
+    # Wajah yang sudah dikenali (support multiple faces)
+    users = []
+    for ((top, right, bottom, left), user_info), worn_items in zip(faces, worn.tolist()):
+        if user_info is not None:
+            users.append((user_info, dict(zip(PPE_ITEMS, worn_items))))
+
+            # Tampilkan nama, role, company di dekat wajah
+            text = f"{user_info['name']} - {user_info['role']} @ {user_info['company']}"
+            overlay["faces"].append({"text": text, "at": [left, top]})
+
+    # 3. Kepatuhan APD dan SIML per user, dihaluskan lintas frame/kamera; log hanya bila berubah atau heartbeat
+    response_data = {"users": [], "overlay": overlay}
+    for user_info, ppe_worn in users:
+        ppe_status = store.observe(user_info, ppe_worn, state.get("cctv_id"))
+
+        # Tambah ke response untuk status panel
+        response_data["users"].append({
+            "user": user_info,
+            "ppe_status": ppe_status
+        })
+
+    return frame, response_data
@@ -1,5 +1,13 @@
-import mysql.connector
+import asyncio
+import concurrent.futures
+import os
+import time
+from contextlib import contextmanager
 from mysql.connector import Error
+from mysql.connector.errors import PoolError
+from mysql.connector.pooling import MySQLConnectionPool
+
+from metrics import DB_QUERY_SECONDS, current_endpoint
 
 # Konfigurasi koneksi ke database Anda di Laragon
 DB_CONFIG = {
@@ -9,11 +17,97 @@ DB_CONFIG = {
     'database': 'pertamina_gate_system'
 }
 
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))  # Thread query async (endpoint)
+# Koneksi tambahan untuk pemakai di luar executor: thread GateLogWriter, backfill rollup, pengarsip gate_logs,
+# dan loader lewat asyncio.to_thread (galeri, cctv_streams)
+DB_POOL_EXTRA = int(os.getenv("DB_POOL_EXTRA", "4"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))  # Detik menunggu koneksi bebas sebelum menyerah
+
+_pool = None
+# Pool = thread executor + DB_POOL_EXTRA, jadi thread executor tidak menunggu koneksi kecuali pemakai lain
+# memakai lebih dari DB_POOL_EXTRA sekaligus (lalu menunggu paling lama DB_POOL_TIMEOUT)
+_db_executor = concurrent.futures.ThreadPoolExecutor(max_workers=DB_POOL_SIZE, thread_name_prefix="db")
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        size = min(DB_POOL_SIZE + DB_POOL_EXTRA, 32)  # mysql-connector membatasi maksimal 32
+        _pool = MySQLConnectionPool(pool_name="gate_pool", pool_size=size, pool_reset_session=True, **DB_CONFIG)
+    return _pool
+
 def get_db_connection():
-    """Membuat dan mengembalikan objek koneksi database."""
+    """Mengambil koneksi dari pool; close() mengembalikannya ke pool. None bila database tidak tersedia."""
+    deadline = time.monotonic() + DB_POOL_TIMEOUT
+    while True:
+        conn = None
+        try:
+            conn = _get_pool().get_connection()
+            # Health check: koneksi yang diputus server (wait_timeout) disambung ulang sebelum dipakai
+            conn.ping(reconnect=True, attempts=2, delay=0)
+            return conn
+        except PoolError:
+            if time.monotonic() >= deadline:
+                print("Error connecting to MySQL: connection pool exhausted")
+                return None
+            time.sleep(0.01)
+        except Error as e:
+            print(f"Error connecting to MySQL: {e}")
+            if conn is not None:
+                try:
+                    conn.close()  # Kembalikan ke pool; tanpa ini pool menyusut permanen
+                except Error:
+                    pass
+            return None
+
+@contextmanager
+def db_cursor(dictionary=False):
+    """Cursor dengan koneksi pool yang selalu dikembalikan, juga saat query melempar exception."""
+    conn = get_db_connection()
+    if conn is None:
+        raise Error(msg="Database tidak tersedia")
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
-        return conn
-    except Error as e:
-        print(f"Error connecting to MySQL: {e}")
-        return None
\ No newline at end of file
+        yield conn.cursor(dictionary=dictionary)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+# --- Akses data non-blocking untuk endpoint async ---
+def _fetch_all(sql, params):
+    with db_cursor(dictionary=True) as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+def _fetch_one(sql, params):
+    with db_cursor(dictionary=True) as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+        cursor.fetchall()  # Habiskan sisa hasil agar koneksi bersih saat kembali ke pool
+        return row
+
+def _execute(sql, params):
+    with db_cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount, cursor.lastrowid
+
+def _timed_db_call(endpoint, fn, *args):
+    with DB_QUERY_SECONDS.time(endpoint=endpoint):
+        return fn(*args)
+
+async def run_db(fn, *args):
+    """Jalankan fungsi blocking yang memakai database di thread pool DB."""
+    loop = asyncio.get_running_loop()
+    # Context var tidak ikut ke thread executor, jadi label endpoint dibaca di sini
+    return await loop.run_in_executor(_db_executor, _timed_db_call, current_endpoint(), fn, *args)
+
+async def fetch_all(sql, params=()):
+    return await run_db(_fetch_all, sql, params)
+
+async def fetch_one(sql, params=()):
+    return await run_db(_fetch_one, sql, params)
+
+async def execute(sql, params=()):
+    """Returns (rowcount, lastrowid)."""
+    return await run_db(_execute, sql, params)
@@ -0,0 +1,78 @@
+# detection.py: Tahap inferensi berat (YOLO + wajah); kelas dan aturan APD ada di ppe_classes.py
+# torch/ultralytics/face_recognition baru di-import di worker saat pertama dipakai, agar import main.py tetap ringan
+import threading
+import cv2
+import numpy as np
+
+from ppe_backends import create_detector
+from face_regions import FACE_REGION_SCALE
+
+# Satu instance model per thread/proses worker; predictor YOLO tidak thread-safe
+_local = threading.local()
+
+def get_ppe_model():
+    """Detektor APD thread ini (backend dari PPE_BACKEND), dibuat + di-warmup saat pertama dipanggil."""
+    if getattr(_local, "ppe_model", None) is None:
+        detector = create_detector()
+        detector.warmup()
+        _local.ppe_model = detector
+    return _local.ppe_model
+
+def warm_up_ppe_model():
+    """Job executor untuk startup: muat + warmup detektor di worker ini (model tidak dikembalikan, tidak bisa di-pickle)."""
+    get_ppe_model()
+
+def _face_recognition():
+    import face_recognition  # Memuat dlib + model landmark/encoder (~detik); setelah itu dari sys.modules
+    return face_recognition
+
+def warm_up_face_models():
+    """Job executor untuk startup: import face_recognition + satu deteksi/encode dummy di worker ini."""
+    blank = np.zeros((160, 160, 3), dtype=np.uint8)
+    _face_recognition().face_encodings(blank, [(40, 120, 120, 40)])
+
+def detect_frame(frame):
+    """Tahap berat untuk satu frame. Hasilnya tipe sederhana agar bisa dikirim balik dari proses worker.
+
+    Returns (detections, face_locations) dengan detections array (N, 6) [x1, y1, x2, y2, conf, class_id].
+    Encoding wajah terpisah (encode_faces_at) agar hanya dihitung untuk track yang perlu.
+    """
+    return detect_batch([frame])[0]
+
+def detect_batch(frames, with_faces=True):
+    """Seperti detect_frame, tetapi YOLO dijalankan sekali untuk semua frame (satu frame per kamera).
+
+    with_faces=False hanya mengembalikan boxes per frame; lokasi wajah bisa dicari paralel dengan locate_faces.
+    """
+    detections = get_ppe_model().detect(frames)
+    if not with_faces:
+        return detections
+    return [(boxes, locate_faces(frame)) for frame, boxes in zip(frames, detections)]
+
+def locate_faces(frame):
+    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    return _face_recognition().face_locations(rgb_frame)
+
+def locate_faces_in_regions(frame, regions, scale=FACE_REGION_SCALE):
+    """HOG hanya di crop region (R, 4) [x1, y1, x2, y2] dari face_regions; lokasi dikembalikan ke koordinat frame."""
+    face_locations = []
+    for x1, y1, x2, y2 in regions:
+        crop = cv2.cvtColor(frame[y1:y2, x1:x2], cv2.COLOR_BGR2RGB)
+        if scale != 1.0:
+            crop = cv2.resize(crop, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        for top, right, bottom, left in _face_recognition().face_locations(crop):
+            face_locations.append((int(y1 + top / scale), int(x1 + right / scale),
+                                   int(y1 + bottom / scale), int(x1 + left / scale)))
+    return face_locations
+
+def encode_faces_at(frame, face_locations):
+    if not face_locations:
+        return []
+    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    return _face_recognition().face_encodings(rgb_frame, face_locations)
+
+def encode_faces(frame):
+    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    face_locations = _face_recognition().face_locations(rgb_frame)
+    face_encodings = _face_recognition().face_encodings(rgb_frame, face_locations)
+    return face_locations, face_encodings
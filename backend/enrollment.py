@@ -0,0 +1,88 @@
+# enrollment.py: Pendaftaran wajah pekerja bersama untuk ws_enroll, add_worker.py, dan enroll_bulk.py
+import os
+import cv2
+import numpy as np
+
+from gallery import FACE_TOLERANCE, encode_face_blob
+
+WORKER_COLUMNS = ("employee_id", "name", "company", "role", "status_sim_l")
+INSERT_WORKER_SQL = (f"INSERT INTO workers ({', '.join(WORKER_COLUMNS)}, face_encoding) "
+                     f"VALUES ({', '.join(['%s'] * (len(WORKER_COLUMNS) + 1))})")
+UPDATE_WORKER_SQL = (f"UPDATE workers SET {', '.join(f'{column} = %s' for column in WORKER_COLUMNS[1:])}, "
+                     f"face_encoding = %s WHERE employee_id = %s")
+
+ENROLL_MAX_SIDE = int(os.getenv("ENROLL_MAX_SIDE", "1600"))  # Foto lebih besar diperkecil dulu; HOG pada 12 MP sangat lambat
+ENROLL_BATCH_SIZE = int(os.getenv("ENROLL_BATCH_SIZE", "500"))  # Baris workers per transaksi
+
+
+def face_count_error(count):
+    """Pesan penolakan untuk jumlah wajah != 1, atau None bila tepat satu."""
+    if count == 0:
+        return "Wajah tidak terdeteksi."
+    if count > 1:
+        return "Terdeteksi lebih dari satu wajah."
+    return None
+
+def encode_photo(path, max_side=ENROLL_MAX_SIDE):
+    """Job process pool: (path, status, encoding atau None, detail). status: ok, unreadable, no_face, multiple_faces."""
+    from detection import encode_faces  # Di dalam worker: face_recognition dimuat di proses anak
+    frame = cv2.imread(path)
+    if frame is None:
+        return path, "unreadable", None, "File tidak bisa dibaca sebagai gambar."
+    height, width = frame.shape[:2]
+    if max_side and max(height, width) > max_side:
+        scale = max_side / max(height, width)
+        frame = cv2.resize(frame, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_AREA)
+    face_locations, face_encodings = encode_faces(frame)
+    error = face_count_error(len(face_locations))
+    if error:
+        return path, "no_face" if not face_locations else "multiple_faces", None, error
+    return path, "ok", np.asarray(face_encodings[0], dtype=np.float64), ""
+
+def combine_samples(encodings, average=True, tolerance=FACE_TOLERANCE):
+    """Satu encoding dari beberapa sampel pekerja yang sama.
+
+    Returns (encoding, outliers) dengan outliers = index sampel yang jaraknya ke median > tolerance
+    (kemungkinan foto orang lain). average=False memakai sampel pertama yang bukan outlier.
+    encoding None bila semua sampel outlier (sampel tidak konsisten; pekerja harus ditolak).
+    """
+    samples = np.asarray(encodings, dtype=np.float64)
+    if len(samples) < 3:
+        outliers = []  # Dua sampel tidak cukup untuk menentukan mana yang salah
+    else:
+        distances = np.linalg.norm(samples - np.median(samples, axis=0), axis=1)
+        outliers = [int(i) for i in np.flatnonzero(distances > tolerance)]
+    kept = np.delete(samples, outliers, axis=0)
+    if not len(kept):
+        return None, outliers
+    return (kept.mean(axis=0) if average else kept[0]), outliers
+
+def existing_employee_ids(cursor, employee_ids, chunk_size=1000):
+    found = set()
+    for start in range(0, len(employee_ids), chunk_size):
+        chunk = employee_ids[start:start + chunk_size]
+        cursor.execute(f"SELECT employee_id FROM workers WHERE employee_id IN ({', '.join(['%s'] * len(chunk))})",
+                       tuple(chunk))
+        found.update(row[0] for row in cursor.fetchall())
+    return found
+
+def worker_row(worker, encoding):
+    return tuple(worker[column] for column in WORKER_COLUMNS) + (encode_face_blob(encoding),)
+
+def write_workers(db_cursor, inserts, updates=(), batch_size=ENROLL_BATCH_SIZE):
+    """Tulis (worker, encoding) dalam transaksi per batch_size baris. Batch yang gagal di-rollback utuh.
+
+    Returns [(worker, error atau None), ...] per pekerja.
+    """
+    results = []
+    for sql, items, to_params in ((INSERT_WORKER_SQL, list(inserts), lambda row: row),
+                                  (UPDATE_WORKER_SQL, list(updates), lambda row: row[1:] + row[:1])):
+        for start in range(0, len(items), batch_size):
+            batch = items[start:start + batch_size]
+            try:
+                with db_cursor() as cursor:
+                    cursor.executemany(sql, [to_params(worker_row(worker, encoding)) for worker, encoding in batch])
+                results.extend((worker, None) for worker, _ in batch)
+            except Exception as e:
+                results.extend((worker, str(e)) for worker, _ in batch)
+    return results
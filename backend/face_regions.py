@@ -0,0 +1,69 @@
+# face_regions.py: Region pencarian wajah dari kotak YOLO face/head, dengan scan penuh berkala sebagai fallback
+import os
+import numpy as np
+
+from ppe_classes import CLASS_NAMES
+
+FACE_LOCATE_MODE = os.getenv("FACE_LOCATE_MODE", "full")  # "full" = HOG seluruh frame, "regions" = hanya region YOLO
+FACE_REGION_PADDING = float(os.getenv("FACE_REGION_PADDING", "0.25"))  # Perluasan kotak per sisi (fraksi lebar/tinggi)
+FACE_REGION_SCALE = float(os.getenv("FACE_REGION_SCALE", "1.0"))  # Skala crop sebelum HOG; <1 lebih cepat untuk kepala besar
+FACE_FULL_SCAN_EVERY = int(os.getenv("FACE_FULL_SCAN_EVERY", "30"))  # Scan seluruh frame tiap N frame (0 = tidak pernah)
+
+FACE_LOCATE_MODES = ("full", "regions")
+REGION_CLASSES = np.array([class_id for class_id, label in CLASS_NAMES.items() if label in ('face', 'head')])
+
+
+def face_regions(detections, shape, padding=FACE_REGION_PADDING):
+    """Kotak face/head dari detections (N, 6), diperluas, dipotong ke frame, dan yang tumpang tindih digabung.
+
+    Returns array (R, 4) int [x1, y1, x2, y2]. Region hasil gabungan tidak saling beririsan,
+    sehingga satu wajah hanya ditemukan di satu crop (wajah + kepala orang yang sama jadi satu region).
+    """
+    boxes = detections[np.isin(detections[:, 5], REGION_CLASSES), :4].astype(np.float32)
+    if not len(boxes):
+        return np.zeros((0, 4), dtype=np.int64)
+    pad = (boxes[:, 2:] - boxes[:, :2]) * padding
+    height, width = shape[:2]
+    boxes = np.concatenate([boxes[:, :2] - pad, boxes[:, 2:] + pad], axis=1)
+    boxes = np.clip(boxes, 0, [width, height, width, height]).round().astype(np.int64)
+
+    regions = [box for box in boxes if box[2] > box[0] and box[3] > box[1]]
+    merged = True
+    while merged:  # Sedikit kotak per frame; gabung berulang sampai tidak ada yang beririsan
+        merged = False
+        for i in range(len(regions)):
+            for j in range(i + 1, len(regions)):
+                a, b = regions[i], regions[j]
+                if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                    regions[i] = np.concatenate([np.minimum(a[:2], b[:2]), np.maximum(a[2:], b[2:])])
+                    del regions[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    return np.array(regions, dtype=np.int64).reshape(-1, 4)
+
+
+class FaceLocator:
+    """Per sumber kamera: memilih scan penuh atau scan region untuk setiap frame yang diproses.
+
+    Mode "regions": HOG hanya di region face/head dari YOLO (frame tanpa region tidak di-scan sama sekali),
+    kecuali setiap full_scan_every frame, di mana seluruh frame di-scan untuk menangkap wajah yang terlewat YOLO.
+    """
+
+    def __init__(self, mode=FACE_LOCATE_MODE, full_scan_every=FACE_FULL_SCAN_EVERY, padding=FACE_REGION_PADDING):
+        if mode not in FACE_LOCATE_MODES:
+            raise ValueError(f"FACE_LOCATE_MODE must be one of {', '.join(FACE_LOCATE_MODES)}")
+        self.mode = mode
+        self.full_scan_every = full_scan_every
+        self.padding = padding
+        self.frames = 0
+        self.full_scans = 0
+
+    def plan(self, detections, shape):
+        """None = scan seluruh frame, selain itu array region (R, 4) [x1, y1, x2, y2] (bisa kosong)."""
+        self.frames += 1
+        if self.mode == "full" or (self.full_scan_every and (self.frames - 1) % self.full_scan_every == 0):
+            self.full_scans += 1
+            return None
+        return face_regions(detections, shape, self.padding)
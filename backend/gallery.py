@@ -0,0 +1,295 @@
+# gallery.py: Galeri encoding wajah dalam satu matriks float32 untuk pencocokan batch (menggantikan compare_faces per wajah)
+import os
+import pickle
+import threading
+import numpy as np
+
+FACE_TOLERANCE = 0.5
+# Galeri sebesar ini atau lebih otomatis memakai index terpartisi (approximate); 0 = selalu exact
+FACE_INDEX_MIN_SIZE = int(os.getenv("FACE_INDEX_MIN_SIZE", "50000"))
+# Snapshot biner galeri (<path>.npz berisi ids + matrix) agar cold start tidak perlu unpickle setiap baris
+FACE_SNAPSHOT_PATH = os.getenv("FACE_SNAPSHOT_PATH", "../models/face_gallery")
+_CHUNK_ROWS = 8192
+_ENCODING_DTYPE = np.dtype('<f8')
+_ENCODING_BYTES = 128 * _ENCODING_DTYPE.itemsize  # Blob mentah selalu tepat 1024 byte
+
+def _sq_norms(matrix):
+    return np.einsum('ij,ij->i', matrix, matrix)
+
+def _sq_distances(queries, query_norms, matrix, norms):
+    # |q - g|^2 = |q|^2 + |g|^2 - 2 q.g  -> satu perkalian matriks untuk semua pasangan
+    d2 = query_norms[:, None] + norms[None, :] - 2.0 * (queries @ matrix.T)
+    return np.maximum(d2, 0.0, out=d2)
+
+def _nearest(matrix, norms, centroids, centroid_norms):
+    assign = np.empty(len(matrix), dtype=np.int64)
+    for start in range(0, len(matrix), _CHUNK_ROWS):
+        block = slice(start, start + _CHUNK_ROWS)
+        assign[block] = _sq_distances(matrix[block], norms[block], centroids, centroid_norms).argmin(axis=1)
+    return assign
+
+def encode_face_blob(encoding):
+    """Encoding -> 1024 byte float64 little-endian mentah untuk kolom workers.face_encoding."""
+    return np.asarray(encoding, dtype=_ENCODING_DTYPE).tobytes()
+
+def decode_face_blob(blob):
+    # Dibedakan dari panjang, bukan byte pertama: float64 mentah bisa saja diawali 0x80 (opcode PROTO pickle).
+    # Baris lama berupa pickle array numpy yang selalu lebih panjang karena header
+    if len(blob) == _ENCODING_BYTES:
+        return np.frombuffer(blob, dtype=_ENCODING_DTYPE)
+    return pickle.loads(blob)
+
+
+class PartitionedIndex:
+    """Index IVF sederhana untuk roster besar.
+
+    K-means membagi galeri ke n_lists partisi; query hanya diperiksa pada n_probe partisi dengan
+    centroid terdekat. Hasilnya approximate: match terdekat bisa terlewat bila berada di partisi lain.
+    """
+
+    def __init__(self, matrix, norms, centroids, n_probe=8):
+        n_lists = len(centroids)
+        self.centroids = centroids
+        self.centroid_norms = _sq_norms(centroids)
+        assign = _nearest(matrix, norms, centroids, self.centroid_norms)
+        order = np.argsort(assign, kind='stable')
+        self.row_ids = order  # posisi di galeri untuk setiap baris terurut per partisi
+        self.matrix = np.ascontiguousarray(matrix[order])
+        self.norms = norms[order]
+        self.offsets = np.concatenate(([0], np.cumsum(np.bincount(assign, minlength=n_lists))))
+        self.n_probe = min(n_probe, n_lists)
+
+    @classmethod
+    def train(cls, matrix, norms, n_lists=None, n_probe=8, iterations=10, seed=0):
+        n = len(matrix)
+        n_lists = min(n_lists or max(1, int(np.sqrt(n))), n)
+        rng = np.random.default_rng(seed)
+
+        # Latih centroid pada sampel, lalu tempatkan seluruh galeri
+        sample = matrix[rng.choice(n, min(n, 64 * n_lists), replace=False)]
+        sample_norms = _sq_norms(sample)
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assign = _nearest(sample, sample_norms, centroids, _sq_norms(centroids))
+            counts = np.bincount(assign, minlength=n_lists)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            filled = counts > 0
+            centroids[filled] = sums[filled] / counts[filled, None]
+        return cls(matrix, norms, centroids, n_probe)
+
+    def reassigned(self, matrix, norms):
+        """Index baru untuk galeri yang berubah, memakai centroid yang sama (tanpa melatih ulang)."""
+        return PartitionedIndex(matrix, norms, self.centroids, self.n_probe)
+
+    def search(self, queries, query_norms):
+        probes = np.argsort(_sq_distances(queries, query_norms, self.centroids, self.centroid_norms), axis=1)[:, :self.n_probe]
+        indices = np.full(len(queries), -1, dtype=np.int64)
+        distances = np.full(len(queries), np.inf, dtype=np.float32)
+        for i, lists in enumerate(probes):
+            rows = np.concatenate([np.arange(self.offsets[p], self.offsets[p + 1]) for p in lists])
+            if not len(rows):
+                continue
+            d2 = _sq_distances(queries[i:i + 1], query_norms[i:i + 1], self.matrix[rows], self.norms[rows])[0]
+            best = d2.argmin()
+            indices[i] = self.row_ids[rows[best]]
+            distances[i] = np.sqrt(d2[best])
+        return indices, distances
+
+
+class FaceGallery:
+    """Encoding wajah pekerja dalam satu matriks (N, 128) float32 contiguous dengan norma kuadrat yang sudah dihitung.
+
+    match() mencocokkan semua wajah di satu frame dengan satu perhitungan jarak batch dan
+    mengembalikan match terdekat per wajah (compare_faces + index(True) mengembalikan yang pertama).
+    Galeri tidak diubah di tempat: added/updated/removed mengembalikan galeri baru.
+    """
+
+    def __init__(self, encodings=(), metadata=(), tolerance=FACE_TOLERANCE):
+        metadata = list(metadata)
+        matrix = np.ascontiguousarray(np.asarray(encodings, dtype=np.float32).reshape(len(metadata), 128))
+        self._set(matrix, _sq_norms(matrix), metadata, tolerance, None)
+
+    def _set(self, matrix, norms, metadata, tolerance, index):
+        self.matrix = matrix
+        self.norms = norms
+        self.metadata = metadata
+        self.ids = np.array([m['id'] for m in metadata], dtype=np.int64)
+        self.tolerance = tolerance
+        self.index = index
+
+    def _derive(self, matrix, norms, metadata, reindex=True):
+        index = self.index
+        if reindex and index is not None:
+            index = index.reassigned(matrix, norms) if len(metadata) else None
+        gallery = FaceGallery.__new__(FaceGallery)
+        gallery._set(matrix, norms, metadata, self.tolerance, index)
+        return gallery
+
+    def __len__(self):
+        return len(self.metadata)
+
+    def position(self, worker_id):
+        rows = np.flatnonzero(self.ids == worker_id)
+        return int(rows[0]) if len(rows) else None
+
+    def added(self, encoding, metadata):
+        # id yang sudah ada diganti, bukan diduplikasi (add yang diputar ulang setelah reload bisa sudah ada di DB)
+        base = self.removed(metadata['id']) if self.position(metadata['id']) is not None else self
+        row = np.asarray(encoding, dtype=np.float32).reshape(1, 128)
+        return base._derive(np.concatenate([base.matrix, row]), np.concatenate([base.norms, _sq_norms(row)]),
+                            base.metadata + [metadata])
+
+    def updated(self, worker_id, **fields):
+        pos = self.position(worker_id)
+        if pos is None:
+            return self
+        metadata = list(self.metadata)
+        metadata[pos] = {**metadata[pos], **fields}
+        # Hanya metadata yang berubah; matriks dan index dipakai bersama
+        return self._derive(self.matrix, self.norms, metadata, reindex=False)
+
+    def removed(self, worker_id):
+        keep = self.ids != worker_id
+        if keep.all():
+            return self
+        return self._derive(np.ascontiguousarray(self.matrix[keep]), self.norms[keep],
+                            [m for m, k in zip(self.metadata, keep) if k])
+
+    def build_index(self, n_lists=None, n_probe=8):
+        if len(self):
+            self.index = PartitionedIndex.train(self.matrix, self.norms, n_lists, n_probe)
+        return self
+
+    def search(self, face_encodings):
+        """Index dan jarak euclidean galeri terdekat untuk setiap encoding -> (indices, distances)."""
+        queries = np.asarray(face_encodings, dtype=np.float32).reshape(-1, 128)
+        query_norms = _sq_norms(queries)
+        if not len(self):
+            return np.full(len(queries), -1, dtype=np.int64), np.full(len(queries), np.inf, dtype=np.float32)
+        if self.index is not None:
+            return self.index.search(queries, query_norms)
+
+        indices = np.empty(len(queries), dtype=np.int64)
+        best = np.full(len(queries), np.inf, dtype=np.float32)
+        for start in range(0, len(self), _CHUNK_ROWS * 8):
+            block = slice(start, start + _CHUNK_ROWS * 8)
+            d2 = _sq_distances(queries, query_norms, self.matrix[block], self.norms[block])
+            local = d2.argmin(axis=1)
+            local_best = d2[np.arange(len(queries)), local]
+            better = local_best < best
+            indices[better] = local[better] + start
+            best[better] = local_best[better]
+        return indices, np.sqrt(best)
+
+    def match(self, face_encodings):
+        """[(metadata atau None, distance), ...] per encoding; None bila di atas tolerance."""
+        if not len(face_encodings):
+            return []
+        indices, distances = self.search(face_encodings)
+        return [
+            (self.metadata[i] if i >= 0 and d <= self.tolerance else None, float(d))
+            for i, d in zip(indices, distances)
+        ]
+
+
+class FaceGalleryStore:
+    """Pemegang galeri aktif. Setiap perubahan membuat galeri baru lalu referensinya di-swap,
+    jadi pembaca (pipeline dashboard) tidak pernah melihat galeri yang setengah diisi.
+    """
+
+    def __init__(self, snapshot_path=FACE_SNAPSHOT_PATH, index_min_size=FACE_INDEX_MIN_SIZE):
+        self.gallery = FaceGallery()
+        self.snapshot_path = snapshot_path
+        self.index_min_size = index_min_size
+        self.dirty = False
+        self._lock = threading.Lock()
+        self._journals = []  # Satu list per reload yang sedang berjalan: perubahan yang harus diputar ulang
+
+    def __len__(self):
+        return len(self.gallery)
+
+    def match(self, face_encodings):
+        return self.gallery.match(face_encodings)
+
+    def _swap(self, change):
+        with self._lock:
+            self.gallery = change(self.gallery)
+            self.dirty = True
+            for journal in self._journals:
+                journal.append(change)
+
+    def add(self, encoding, metadata):
+        self._swap(lambda g: g.added(encoding, metadata))
+
+    def update(self, worker_id, **fields):
+        self._swap(lambda g: g.updated(worker_id, **fields))
+
+    def remove(self, worker_id):
+        self._swap(lambda g: g.removed(worker_id))
+
+    def reload(self, metadata, fetch_encodings, refresh_ids=()):
+        """Sinkronkan dengan tabel workers.
+
+        metadata: baris workers tanpa face_encoding, urut id. fetch_encodings(ids atau None) -> {id: encoding};
+        hanya dipanggil untuk id yang belum ada di snapshot (None = ambil semua) dan id di refresh_ids,
+        yaitu pekerja yang face_encoding-nya diganti langsung di DB sehingga isi snapshot sudah basi.
+        add/update/remove yang terjadi selama rebuild dicatat lalu diputar ulang ke galeri baru sebelum swap.
+        """
+        journal = []
+        with self._lock:
+            self._journals.append(journal)
+        try:
+            gallery, dirty, fetched = self._rebuild(metadata, fetch_encodings, refresh_ids)
+            with self._lock:
+                for change in journal:
+                    gallery = change(gallery)
+                self.gallery = gallery
+                self.dirty = dirty or bool(journal)
+        finally:
+            with self._lock:
+                self._journals.remove(journal)
+        if self.dirty:
+            self.save_snapshot()
+        return fetched
+
+    def _rebuild(self, metadata, fetch_encodings, refresh_ids):
+        """Galeri baru dari snapshot + DB tanpa menyentuh galeri aktif -> (gallery, snapshot basi?, jumlah di-fetch)."""
+        snapshot_matrix, snapshot_ids = self.load_snapshot()
+        refresh_ids = set(refresh_ids)
+        rows = {int(worker_id): i for i, worker_id in enumerate(snapshot_ids) if int(worker_id) not in refresh_ids}
+        missing = [m['id'] for m in metadata if m['id'] not in rows]
+        fetched = fetch_encodings(None if not rows else missing) if missing else {}
+
+        if not missing and [m['id'] for m in metadata] == [int(i) for i in snapshot_ids]:
+            matrix = snapshot_matrix  # Snapshot cocok persis: pakai langsung tanpa menyalin
+        else:
+            matrix = np.array([snapshot_matrix[rows[m['id']]] if m['id'] in rows else fetched[m['id']]
+                               for m in metadata], dtype=np.float32).reshape(len(metadata), 128)
+
+        gallery = FaceGallery(matrix, metadata)
+        if self.index_min_size and len(gallery) >= self.index_min_size:
+            gallery.build_index()
+        return gallery, bool(missing) or len(metadata) != len(snapshot_ids), len(fetched)
+
+    def load_snapshot(self):
+        """(matrix, ids) dari disk, atau matriks kosong bila snapshot belum ada/rusak."""
+        try:
+            with np.load(self.snapshot_path + ".npz") as snapshot:
+                matrix, ids = snapshot["matrix"], snapshot["ids"].tolist()
+            if matrix.shape == (len(ids), 128) and matrix.dtype == np.float32:
+                return matrix, ids
+        except (OSError, ValueError, KeyError):
+            pass
+        return np.empty((0, 128), dtype=np.float32), []
+
+    def save_snapshot(self):
+        # ids dan matrix dalam satu file, ditulis ke file sementara lalu satu os.replace: crash atau dua save
+        # bersamaan tidak bisa menghasilkan ids dari galeri yang satu dengan matrix dari galeri lain.
+        # Ditahan di bawah lock agar tidak ada swap di antara membaca galeri dan menandainya bersih.
+        tmp = self.snapshot_path + ".tmp.npz"
+        with self._lock:
+            with open(tmp, "wb") as f:
+                np.savez(f, ids=self.gallery.ids, matrix=self.gallery.matrix)
+            os.replace(tmp, self.snapshot_path + ".npz")
+            self.dirty = False
@@ -0,0 +1,64 @@
+# inference.py: Menjalankan inferensi di luar event loop asyncio (thread pool / process pool)
+import asyncio
+import concurrent.futures
+import multiprocessing
+import os
+import time
+
+from metrics import STAGE_SECONDS, INFERENCE_QUEUE_SECONDS
+
+INFERENCE_MODE = os.getenv("INFERENCE_MODE", "thread")  # "thread" atau "process"
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "2"))
+INFERENCE_MAX_IN_FLIGHT = int(os.getenv("INFERENCE_MAX_IN_FLIGHT", "4"))
+
+def _timed_call(fn, args):
+    # time.time() dipakai untuk titik mulai karena harus bisa dibandingkan antar proses
+    started_at = time.time()
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, started_at, time.perf_counter() - t0
+
+class InferenceExecutor:
+    """Pool worker untuk inferensi dengan batas jumlah pekerjaan in-flight.
+
+    run() mengembalikan (result, timing) dimana timing berisi queue_ms (menunggu slot/worker)
+    dan run_ms (waktu eksekusi fn).
+    """
+
+    def __init__(self, mode=INFERENCE_MODE, max_workers=INFERENCE_WORKERS,
+                 max_in_flight=INFERENCE_MAX_IN_FLIGHT, initializer=None):
+        if mode == "process":
+            # spawn: proses anak tidak mewarisi state torch/OpenCV dari parent
+            self._pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"),
+                initializer=initializer)
+        elif mode == "thread":
+            self._pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="inference", initializer=initializer)
+        else:
+            raise ValueError(f"Unknown inference mode: {mode}")
+        self.mode = mode
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self._slots = asyncio.Semaphore(max_in_flight)
+
+    async def run(self, fn, *args):
+        submitted_at = time.time()
+        async with self._slots:
+            self.in_flight += 1
+            try:
+                loop = asyncio.get_running_loop()
+                result, started_at, run_s = await loop.run_in_executor(self._pool, _timed_call, fn, args)
+            finally:
+                self.in_flight -= 1
+        queue_s = max(started_at - submitted_at, 0.0)
+        STAGE_SECONDS.observe(run_s, stage=fn.__name__)  # detect_batch = YOLO, locate_faces(_in_regions) = HOG, encode_faces_at
+        INFERENCE_QUEUE_SECONDS.observe(queue_s, stage=fn.__name__)
+        timing = {
+            "queue_ms": round(queue_s * 1000, 1),
+            "run_ms": round(run_s * 1000, 1),
+        }
+        return result, timing
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,264 @@
+# log_archive.py: Retensi gate_logs, bulan lama dipindah ke file Parquet (zstd) per bulan dan dibaca lintas hot + arsip
+import json
+import os
+import threading
+from datetime import datetime
+
+from analytics import missing_items
+
+LOG_ARCHIVE_DIR = os.getenv("LOG_ARCHIVE_DIR", os.path.join(os.path.dirname(__file__), "archive", "gate_logs"))
+LOG_HOT_MONTHS = int(os.getenv("LOG_HOT_MONTHS", "12"))  # Bulan berjalan + 11 bulan sebelumnya tetap di MySQL; 0 = tanpa arsip
+LOG_ARCHIVE_INTERVAL_SECONDS = float(os.getenv("LOG_ARCHIVE_INTERVAL_SECONDS", str(6 * 3600)))  # 0 = hanya lewat script
+LOG_ARCHIVE_ROW_GROUP = int(os.getenv("LOG_ARCHIVE_ROW_GROUP", "20000"))  # Unit pruning statistik min/max per file
+LOG_ARCHIVE_CHUNK = int(os.getenv("LOG_ARCHIVE_CHUNK", "5000"))  # Baris per SELECT/DELETE saat memindahkan
+
+# Kolom yang sama dengan LOG_COLUMNS (logs.py), plus kolom untuk rebuild rollup. Data pekerja disalin saat diarsip.
+# ppe_details tidak disimpan utuh: description + daftar item yang tidak dipakai sudah cukup untuk history dan rollup.
+RESULT_COLUMNS = ["log_id", "timestamp", "status", "description", "name", "company", "role"]
+ARCHIVE_COLUMNS = RESULT_COLUMNS + ["worker_id", "cctv_id", "missing"]
+
+SELECT_MONTH_SQL = """
+    SELECT gl.log_id, gl.timestamp_in, gl.ppe_status, gl.ppe_details, gl.worker_id, gl.cctv_id,
+           w.name, w.company, w.role
+    FROM gate_logs gl
+    LEFT JOIN workers w ON gl.worker_id = w.id
+    WHERE gl.timestamp_in >= %s AND gl.timestamp_in < %s AND gl.log_id > %s
+    ORDER BY gl.log_id LIMIT %s
+"""
+DELETE_MONTH_SQL = "DELETE FROM gate_logs WHERE timestamp_in >= %s AND timestamp_in < %s AND log_id <= %s LIMIT %s"
+
+_arrow = None
+
+
+def _pyarrow():
+    """(pyarrow, pyarrow.parquet, pyarrow.compute), diimpor saat pertama dipakai; pyarrow opsional."""
+    global _arrow
+    if _arrow is None:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.parquet
+        _arrow = (pyarrow, pyarrow.parquet, pyarrow.compute)
+    return _arrow
+
+def arrow_available():
+    try:
+        _pyarrow()
+        return True
+    except ImportError:
+        return False
+
+def month_start(timestamp):
+    return timestamp.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+def hot_cutoff(now=None, hot_months=LOG_HOT_MONTHS):
+    """Awal bulan tertua yang tetap di tabel hot; semua sebelum ini boleh diarsip."""
+    return add_months(month_start(now or datetime.now()), -(hot_months - 1))
+
+def _schema():
+    pa = _pyarrow()[0]
+    return pa.schema([
+        ("log_id", pa.int64()), ("timestamp", pa.timestamp("us")), ("status", pa.string()),
+        ("description", pa.string()), ("name", pa.string()), ("company", pa.string()), ("role", pa.string()),
+        ("worker_id", pa.int64()), ("cctv_id", pa.int64()), ("missing", pa.list_(pa.string())),
+    ])
+
+def archive_row(row):
+    """Baris SELECT_MONTH_SQL (dict) -> baris arsip."""
+    details = json.loads(row["ppe_details"]) if isinstance(row["ppe_details"], str) else (row["ppe_details"] or {})
+    return {"log_id": row["log_id"], "timestamp": row["timestamp_in"], "status": row["ppe_status"],
+            "description": details.get("description"), "name": row["name"], "company": row["company"],
+            "role": row["role"], "worker_id": row["worker_id"], "cctv_id": row["cctv_id"],
+            "missing": missing_items(details)}
+
+
+class LogArchive:
+    """File Parquet per bulan di root/month=YYYY-MM/gate_logs.parquet + _manifest.json.
+
+    archived_until (eksklusif) adalah batas tier: data sebelum batas hanya dibaca dari arsip, sesudahnya dari MySQL,
+    jadi baris yang sedang dipindah tidak pernah muncul dua kali. Setiap file diurutkan per timestamp dengan
+    row group kecil sehingga filter tanggal/status/perusahaan dipangkas lewat statistik sebelum data dibaca.
+    """
+
+    def __init__(self, root=LOG_ARCHIVE_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._manifest = self._load_manifest()
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.root, "_manifest.json")
+
+    def month_path(self, month):
+        return os.path.join(self.root, f"month={month:%Y-%m}", "gate_logs.parquet")
+
+    def _load_manifest(self):
+        try:
+            self._mtime = os.stat(self.manifest_path).st_mtime_ns
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"archived_until": None, "months": {}}
+
+    def _refresh(self):
+        """Muat ulang manifest bila diubah proses lain (mis. scripts/archive_logs.py saat server berjalan).
+
+        Jangan dipanggil sambil memegang self._lock (Lock biasa, tidak reentrant).
+        """
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime != self._mtime:
+            with self._lock:
+                self._manifest = self._load_manifest()
+
+    def _save_manifest(self):
+        os.makedirs(self.root, exist_ok=True)
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._manifest, f, indent=2)
+        os.replace(tmp, self.manifest_path)
+        self._mtime = os.stat(self.manifest_path).st_mtime_ns
+
+    @property
+    def archived_until(self):
+        self._refresh()
+        value = self._manifest["archived_until"]
+        return datetime.fromisoformat(value) if value else None
+
+    def months(self):
+        self._refresh()
+        return sorted(datetime.strptime(month, "%Y-%m") for month in self._manifest["months"])
+
+    def read_month(self, month):
+        path = self.month_path(month)
+        if not os.path.exists(path):
+            return []
+        return _pyarrow()[1].read_table(path).to_pylist()
+
+    def write_month(self, month, rows):
+        """Tulis (timpa) satu bulan secara atomik lalu majukan archived_until ke akhir bulan itu."""
+        pa, pq, _ = _pyarrow()
+        rows = sorted(rows, key=lambda row: (row["timestamp"], row["log_id"]))
+        table = pa.Table.from_pylist(rows, schema=_schema())
+        path = self.month_path(month)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        pq.write_table(table, path + ".tmp", compression="zstd", row_group_size=LOG_ARCHIVE_ROW_GROUP,
+                       use_dictionary=["status", "description", "name", "company", "role", "missing"])
+        os.replace(path + ".tmp", path)
+        with self._lock:
+            # Baca ulang dulu agar bulan yang ditulis proses lain sejak refresh terakhir tidak tertimpa
+            self._manifest = self._load_manifest()
+            self._manifest["months"][f"{month:%Y-%m}"] = {
+                "rows": len(rows), "bytes": os.path.getsize(path),
+                "max_log_id": max((row["log_id"] for row in rows), default=0)}
+            end = add_months(month, 1)
+            archived_until = self._manifest["archived_until"]
+            if archived_until is None or end > datetime.fromisoformat(archived_until):
+                self._manifest["archived_until"] = end.isoformat()
+            self._save_manifest()
+
+    def query(self, start=None, end=None, after=None, limit=50, status=None, company=None):
+        """Halaman terbaru-dulu dari arsip, kontrak sama dengan build_logs_query (end eksklusif, after keyset)."""
+        months = self.months()
+        if not months:
+            return []
+        pq, pc = _pyarrow()[1], _pyarrow()[2]
+        filters = []
+        if start is not None:
+            filters.append(("timestamp", ">=", start))
+        if end is not None:
+            filters.append(("timestamp", "<", end))
+        if after is not None:
+            filters.append(("timestamp", "<=", after[0]))
+        if status:
+            filters.append(("status", "==", status))
+        if company:
+            filters.append(("company", "==", company))
+
+        logs = []
+        for month in reversed(months):
+            if len(logs) >= limit:
+                break
+            # Pruning partisi: bulan di luar rentang (atau setelah cursor) tidak dibuka sama sekali
+            if (end is not None and month >= end) or (start is not None and add_months(month, 1) <= start):
+                continue
+            if after is not None and month > after[0]:
+                continue
+            table = pq.read_table(self.month_path(month), columns=RESULT_COLUMNS, filters=filters or None)
+            if after is not None and table.num_rows:
+                older = pc.or_(pc.less(table["timestamp"], after[0]),
+                               pc.and_(pc.equal(table["timestamp"], after[0]), pc.less(table["log_id"], after[1])))
+                table = table.filter(older)
+            table = table.sort_by([("timestamp", "descending"), ("log_id", "descending")])
+            logs += table.slice(0, limit - len(logs)).to_pylist()
+        return logs
+
+    def scan(self, columns=ARCHIVE_COLUMNS, batch_size=LOG_ARCHIVE_CHUNK):
+        """Semua baris arsip per batch (list of dict), bulan tertua dulu; untuk rebuild rollup."""
+        pq = _pyarrow()[1]
+        for month in self.months():
+            for batch in pq.ParquetFile(self.month_path(month)).iter_batches(batch_size=batch_size, columns=columns):
+                yield batch.to_pylist()
+
+    def stats(self):
+        self._refresh()
+        months = self._manifest["months"]
+        return {"archived_until": self._manifest["archived_until"], "months": len(months),
+                "rows": sum(m["rows"] for m in months.values()), "bytes": sum(m["bytes"] for m in months.values())}
+
+
+# --- Pemindahan dari MySQL ---
+def archive_month(db_cursor, archive, month, dry_run=False):
+    """Pindahkan satu bulan gate_logs ke arsip. Returns jumlah baris yang dipindah.
+
+    Urutan aman terhadap crash: tulis file (digabung dengan isi arsip bulan itu bila sudah ada), majukan
+    archived_until, baru DELETE per chunk. Crash di antaranya hanya menyisakan baris yang digabung ulang di run berikutnya.
+    """
+    end = add_months(month, 1)
+    rows, last_id = [], 0
+    while True:
+        with db_cursor(dictionary=True) as cursor:
+            cursor.execute(SELECT_MONTH_SQL, (month, end, last_id, LOG_ARCHIVE_CHUNK))
+            chunk = cursor.fetchall()
+        rows += [archive_row(row) for row in chunk]
+        if len(chunk) < LOG_ARCHIVE_CHUNK:
+            break
+        last_id = chunk[-1]["log_id"]
+    if not rows or dry_run:
+        return len(rows)
+
+    moved_ids = {row["log_id"] for row in rows}
+    existing = [row for row in archive.read_month(month) if row["log_id"] not in moved_ids]
+    archive.write_month(month, existing + rows)
+
+    max_id = max(moved_ids)
+    while True:
+        with db_cursor() as cursor:
+            cursor.execute(DELETE_MONTH_SQL, (month, end, max_id, LOG_ARCHIVE_CHUNK))
+            deleted = cursor.rowcount
+        if deleted < LOG_ARCHIVE_CHUNK:
+            break
+    return len(rows)
+
+def archive_due_months(db_cursor, archive, now=None, hot_months=LOG_HOT_MONTHS, dry_run=False):
+    """Arsipkan semua bulan sebelum hot_cutoff yang masih punya baris di gate_logs. Returns [(bulan, baris), ...]."""
+    if hot_months <= 0:
+        return []
+    cutoff = hot_cutoff(now, hot_months)
+    with db_cursor() as cursor:
+        cursor.execute("SELECT MIN(timestamp_in) FROM gate_logs WHERE timestamp_in < %s", (cutoff,))
+        oldest = cursor.fetchone()[0]
+    moved = []
+    month = month_start(oldest) if oldest else cutoff
+    while month < cutoff:
+        count = archive_month(db_cursor, archive, month, dry_run)
+        if count:
+            moved.append((f"{month:%Y-%m}", count))
+        month = add_months(month, 1)
+    return moved
@@ -0,0 +1,98 @@
+# log_events.py: Siaran event gate_logs baru ke dashboard, dengan resume dari log_id terakhir
+import asyncio
+import json
+import os
+from collections import deque
+
+LOG_EVENT_HISTORY = int(os.getenv("LOG_EVENT_HISTORY", "500"))  # Event terakhir yang disimpan untuk resume tanpa DB
+LOG_EVENT_QUEUE = int(os.getenv("LOG_EVENT_QUEUE", "200"))  # Antrean per client; penuh = client diputus lalu resume
+LOG_FETCH_LIMIT = 500
+
+
+def encode_event(row):
+    """JSON satu event; timestamp ISO seperti respons /api/logs."""
+    return json.dumps(row, default=lambda value: value.isoformat() if hasattr(value, "isoformat") else str(value))
+
+
+class LogEventHub:
+    """Satu query per batch GateLogWriter, berapa pun jumlah dashboard yang terbuka.
+
+    fetch_since(after_id, limit) -> baris gate_logs dengan log_id > after_id, urut naik.
+    fetch_last_id() -> log_id terbesar saat ini (titik awal siaran).
+    notify() aman dipanggil dari thread lain (hook on_commit GateLogWriter).
+    """
+
+    def __init__(self, fetch_since, fetch_last_id, history=LOG_EVENT_HISTORY, queue_size=LOG_EVENT_QUEUE):
+        self.fetch_since = fetch_since
+        self.fetch_last_id = fetch_last_id
+        self.queue_size = queue_size
+        self.recent = deque(maxlen=history)
+        self.last_id = None
+        self.subscribers = set()
+        self.published = 0
+        self._loop = None
+        self._wakeup = None
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+            self._wakeup.set()  # Ambil last_id segera
+            self._task = self._loop.create_task(self._run())
+
+    def notify(self, *_):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            try:
+                if self.last_id is None:
+                    self.last_id = await self.fetch_last_id()
+                    continue
+                while True:
+                    rows = await self.fetch_since(self.last_id, LOG_FETCH_LIMIT)
+                    for row in rows:
+                        self._publish(row)
+                    if len(rows) < LOG_FETCH_LIMIT:
+                        break
+            except Exception as e:
+                print(f"LOG EVENTS ERROR: {e}")
+
+    def _publish(self, row):
+        self.recent.append(row)
+        self.last_id = row['log_id']
+        self.published += 1
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(row)
+            except asyncio.QueueFull:
+                # Client terlalu lambat: putus, client reconnect dengan last_id dan mengejar dari histori
+                self.subscribers.discard(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+    async def subscribe(self, last_id=None):
+        """(backlog, queue). backlog = event setelah last_id yang terlewat; queue menerima event berikutnya.
+
+        Queue didaftarkan sebelum backlog dibaca; pemanggil membuang duplikat berdasarkan log_id.
+        """
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.add(queue)
+        if last_id is None or (self.last_id is not None and last_id >= self.last_id):
+            return [], queue
+        if self.recent and self.recent[0]['log_id'] <= last_id + 1:
+            return [row for row in self.recent if row['log_id'] > last_id], queue
+        # Terlalu jauh di belakang histori memori: ambil dari DB (dibatasi; sisanya lewat /api/logs)
+        return await self.fetch_since(last_id, LOG_FETCH_LIMIT), queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    def stats(self):
+        return {"subscribers": len(self.subscribers), "last_id": self.last_id,
+                "published": self.published, "history": len(self.recent)}
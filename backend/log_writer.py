@@ -0,0 +1,171 @@
+# log_writer.py: Penulis gate_logs di latar belakang, batch executemany dengan antrean terbatas
+import logging
+import os
+import queue
+import threading
+import time
+
+from metrics import GATE_LOG_ROWS, STAGE_SECONDS
+
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "100"))
+LOG_FLUSH_SECONDS = float(os.getenv("LOG_FLUSH_SECONDS", "1.0"))
+LOG_MAX_QUEUE = int(os.getenv("LOG_MAX_QUEUE", "10000"))
+LOG_OVERFLOW = os.getenv("LOG_OVERFLOW", "drop_oldest")  # "drop_oldest" atau "drop_newest"
+LOG_RETRY_SECONDS = float(os.getenv("LOG_RETRY_SECONDS", "0.5"))  # Jeda retry pertama, dua kali lipat setiap gagal
+LOG_RETRY_MAX_SECONDS = float(os.getenv("LOG_RETRY_MAX_SECONDS", "30"))
+
+GATE_LOG_COLUMNS = ("worker_id", "timestamp_in", "ppe_status", "ppe_details", "cctv_id")
+
+logger = logging.getLogger(__name__)
+
+
+class GateLogWriter:
+    """Sink event kepatuhan. submit() tidak pernah blocking; thread latar menulis batch ke gate_logs
+    setiap batch_size baris atau flush_seconds, mana yang lebih dulu.
+
+    Bila antrean penuh: drop_oldest membuang event tertua (data terbaru lebih berguna untuk dashboard),
+    drop_newest menolak event baru. Keduanya dihitung di stats()["dropped"].
+    Batch yang gagal ditulis (mis. DB putus sebentar) tetap di depan dan dicoba ulang dengan backoff eksponensial
+    sampai retry_max_seconds; baru dibuang dan dihitung di stats()["failed"] bila antrean di belakangnya sudah penuh
+    atau writer sedang ditutup.
+    connect() harus mengembalikan koneksi DB-API (MySQL, atau sqlite3 dengan placeholder="?" untuk pengujian).
+    on_batch(cursor, [(row, meta), ...]) opsional dijalankan dalam transaksi yang sama setelah INSERT;
+    on_commit(batch) opsional dipanggil setelah commit berhasil (mis. memberi tahu siaran event).
+    """
+
+    def __init__(self, connect, batch_size=LOG_BATCH_SIZE, flush_seconds=LOG_FLUSH_SECONDS,
+                 max_queue=LOG_MAX_QUEUE, overflow=LOG_OVERFLOW, placeholder="%s", on_batch=None,
+                 on_commit=None, retry_seconds=LOG_RETRY_SECONDS, retry_max_seconds=LOG_RETRY_MAX_SECONDS):
+        if overflow not in ("drop_oldest", "drop_newest"):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.connect = connect
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.overflow = overflow
+        self.on_batch = on_batch
+        self.on_commit = on_commit
+        self.retry_seconds = retry_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.sql = (f"INSERT INTO gate_logs ({', '.join(GATE_LOG_COLUMNS)}) "
+                    f"VALUES ({', '.join([placeholder] * len(GATE_LOG_COLUMNS))})")
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.retries = 0
+        self.batches = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="gate-log-writer", daemon=True)
+            self._thread.start()
+
+    def submit(self, row, meta=None):
+        """row = (worker_id, timestamp_in, ppe_status, ppe_details, cctv_id); meta diteruskan ke on_batch.
+        False bila event dibuang."""
+        item = (row, meta)
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            GATE_LOG_ROWS.inc(result="dropped")
+            if self.overflow == "drop_newest":
+                return False
+        # drop_oldest: buang satu event tertua lalu coba sekali lagi
+        try:
+            self._queue.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            return False
+
+    def close(self, timeout=10):
+        """Hentikan thread setelah semua event di antrean ditulis."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _take_batch(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_seconds
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._take_batch()
+            if batch:
+                self._write_with_retry(batch)
+
+    def _write_with_retry(self, batch):
+        delay = self.retry_seconds
+        while not self._write(batch):
+            # Event baru terus antre di belakang batch ini; baru dilepas bila antrean sudah meluap
+            if self._queue.full() or self._stop.is_set():
+                self.failed += len(batch)
+                GATE_LOG_ROWS.inc(len(batch), result="failed")
+                logger.error("Dropping %d gate_logs rows after failed write (%s)", len(batch),
+                             "queue full" if self._queue.full() else "shutting down")
+                return
+            self.retries += 1
+            self._stop.wait(delay)
+            delay = min(delay * 2, self.retry_max_seconds)
+
+    def _write(self, batch):
+        """Satu transaksi INSERT (+ on_batch). True bila sudah commit."""
+        conn = None
+        started = time.perf_counter()
+        try:
+            conn = self.connect()
+            cursor = conn.cursor()
+            cursor.executemany(self.sql, [row for row, _ in batch])  # mysql-connector menggabungkan jadi satu INSERT multi-row
+            if self.on_batch is not None:
+                self.on_batch(cursor, batch)
+            conn.commit()
+        except Exception as e:
+            logger.warning("Gate log write failed (%d rows), will retry: %s", len(batch), e)
+            if conn is not None:
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass  # Koneksi yang putus tidak bisa di-rollback; transaksinya sudah batal di server
+            return False
+        finally:
+            if conn is not None:
+                conn.close()
+
+        self.written += len(batch)
+        self.batches += 1
+        GATE_LOG_ROWS.inc(len(batch), result="written")
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage="gate_log_write")
+        if self.on_commit is not None:
+            # Di luar blok retry: batch sudah tersimpan, error di sini tidak boleh membuatnya ditulis dua kali
+            try:
+                self.on_commit(batch)
+            except Exception:
+                logger.exception("Gate log on_commit hook failed")
+        return True
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "retries": self.retries,
+        }
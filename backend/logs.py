@@ -0,0 +1,80 @@
+# logs.py: Query gate_logs, filter sebagai rentang tanggal + keyset pagination pada (timestamp_in, log_id)
+import base64
+import re
+from datetime import datetime, timedelta
+
+LOG_COLUMNS = """
+    SELECT gl.log_id, gl.timestamp_in AS timestamp, gl.ppe_status AS status,
+           JSON_UNQUOTE(JSON_EXTRACT(gl.ppe_details, '$.description')) AS description,
+           w.name, w.company, w.role
+    FROM gate_logs gl
+    JOIN workers w ON gl.worker_id = w.id
+"""
+
+def filter_range(filter="all", start_date=None, end_date=None, now=None):
+    """(start, end) untuk filter history; end eksklusif, None berarti tanpa batas."""
+    now = now or datetime.now()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if start_date and end_date:  # Custom range, end_date inklusif
+        return datetime.strptime(start_date, '%Y-%m-%d'), datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
+    if filter == "today":
+        return today, None
+    if filter == "this_week":
+        return today - timedelta(days=now.weekday()), None  # Mulai Senin
+    if filter == "this_month":
+        return today.replace(day=1), None
+    if filter == "this_year":
+        return today.replace(month=1, day=1), None
+    if filter == "last_year":
+        return datetime(now.year - 1, 1, 1), datetime(now.year, 1, 1)
+    if re.fullmatch(r"\d{4}", filter or ""):  # "2023", "2024", ... tahun apa pun
+        year = int(filter)
+        return datetime(year, 1, 1), datetime(year + 1, 1, 1)
+    return None, None
+
+def encode_cursor(row):
+    raw = f"{row['timestamp'].isoformat()}|{row['log_id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor):
+    """(timestamp_in, log_id) dari cursor; ValueError bila tidak valid."""
+    try:
+        timestamp, log_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(timestamp), int(log_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def build_logs_query(start=None, end=None, after=None, limit=50, status=None, company=None):
+    """SQL + parameter untuk satu halaman log terbaru-dulu.
+
+    after = (timestamp_in, log_id) baris terakhir halaman sebelumnya. Urutan (timestamp_in DESC, log_id DESC)
+    dengan index idx_gate_logs_ts_id membuat setiap halaman sama murahnya, tidak peduli seberapa jauh.
+    Cursor yang sama berlaku untuk arsip (LogArchive.query), jadi paging bisa menyeberang dari hot ke arsip.
+    """
+    where, val = [], []
+    if start is not None:
+        where.append("gl.timestamp_in >= %s")
+        val.append(start)
+    if end is not None:
+        where.append("gl.timestamp_in < %s")
+        val.append(end)
+    if after is not None:
+        where.append("(gl.timestamp_in < %s OR (gl.timestamp_in = %s AND gl.log_id < %s))")
+        val.extend([after[0], after[0], after[1]])
+    if status:
+        where.append("gl.ppe_status = %s")
+        val.append(status)
+    if company:
+        where.append("w.company = %s")
+        val.append(company)
+
+    sql = LOG_COLUMNS
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY gl.timestamp_in DESC, gl.log_id DESC LIMIT %s"
+    val.append(limit)
+    return sql, tuple(val)
+
+def build_logs_since_query(after_id, limit):
+    """Log dengan log_id > after_id, urut naik; untuk siaran event dan resume setelah reconnect."""
+    return LOG_COLUMNS + " WHERE gl.log_id > %s ORDER BY gl.log_id LIMIT %s", (after_id, limit)
@@ -1,27 +1,54 @@
 # main.py (Updated for continuous detection, status panel, new DB table, custom history filters)
+from readiness import Readiness  # Pertama: PROCESS_STARTED menjadi acuan waktu startup
 import cv2
-import torch
-import face_recognition
-import pickle
 import json
-import numpy as np
 import asyncio
-from fastapi import FastAPI, WebSocket, Depends, HTTPException, status
+import csv
+import io
+from fastapi import FastAPI, WebSocket, Depends, HTTPException, Request, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.websockets import WebSocketDisconnect
-from ultralytics import YOLO
 from pydantic import BaseModel 
-import concurrent.futures
-from datetime import datetime, timedelta
+import threading
+import time
 
 import auth
-from database import get_db_connection
-from models import WorkerUpdate, CCTV  # Add CCTV import
+import database
+from database import get_db_connection, db_cursor
+from models import WorkerUpdate, CCTV, GalleryReload  # Add CCTV import
+from pipeline import PipelineHub
+from transport import FramePacket, TransportOptions
+from gallery import FaceGalleryStore, decode_face_blob
+from enrollment import WORKER_COLUMNS, INSERT_WORKER_SQL, face_count_error, worker_row
+from inference import InferenceExecutor, INFERENCE_WORKERS
+from tracker import FaceTracker
+from streams import MultiStreamService, stream_url
+from workers import PIPELINE_MODE, PIPELINE_MODES, ProcessHub, ProcessPipeline
+from log_writer import GateLogWriter
+from log_events import LogEventHub, encode_event
+from logs import filter_range, build_logs_query, build_logs_since_query, encode_cursor, decode_cursor
+from log_archive import LogArchive, LOG_HOT_MONTHS, LOG_ARCHIVE_INTERVAL_SECONDS, arrow_available, archive_due_months
+from schema import ensure_schema
+from analytics import GRANULARITIES, DIMENSIONS, update_rollups, rebuild_rollups, build_rollup_query
+from compliance import process_frame, ComplianceStore
+import metrics
+from metrics import STAGE_SECONDS, FACES, WEBSOCKET_CLIENTS, HTTP_SECONDS, CallbackGauge
+from detection import (get_ppe_model, warm_up_ppe_model, warm_up_face_models, detect_batch, locate_faces,
+                       locate_faces_in_regions, encode_faces, encode_faces_at)
+from face_regions import FaceLocator
 
 # --- Inisialisasi Aplikasi ---
 app = FastAPI(title="Pertamina Gate System API")
 
+# Komponen berat dimuat di latar belakang setelah server mulai menerima request (lihat initialize)
+if PIPELINE_MODE not in PIPELINE_MODES:
+    raise ValueError(f"PIPELINE_MODE must be one of {', '.join(PIPELINE_MODES)}")
+# Mode workers: model dimuat oleh proses inferensi per kamera saat feed dibuka, bukan oleh proses API
+readiness = Readiness(["schema", "gallery"] + (["ppe_model", "face_model"] if PIPELINE_MODE == "inprocess" else []))
+PROBE_PATHS = ("/health/live", "/health/ready", "/metrics")
+
 origins = [
     "http://pertamina-gate.test",
     "http://localhost",
@@ -32,273 +59,519 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    token = metrics.current_request_scope.set(request.scope)  # Label untuk timing query DB di database.run_db
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        if request.url.path not in PROBE_PATHS:
+            readiness.mark_first_request()
+        return response
+    finally:
+        # Route baru diketahui setelah call_next; path mentah (ID, scan 404) tidak pernah jadi label
+        HTTP_SECONDS.observe(time.perf_counter() - started, endpoint=metrics.endpoint_label(request.scope),
+                             method=request.method, status=status_code)
+        metrics.current_request_scope.reset(token)
+
+@app.get("/health/live", tags=["Health"])
+async def liveness():
+    """Proses hidup dan event loop merespons; tidak menyentuh DB atau model."""
+    return {"status": "alive", "uptime_s": readiness.since_start()}
+
+@app.get("/health/ready", tags=["Health"])
+async def readiness_probe():
+    """200 bila schema, galeri wajah, dan model sudah dimuat; 503 selama inisialisasi atau bila ada yang gagal."""
+    return JSONResponse(status_code=200 if readiness.is_ready() else 503, content=readiness.snapshot())
+
+@app.get("/metrics", tags=["Pipeline"], response_class=PlainTextResponse)
+async def get_metrics():
+    """Format teks Prometheus; tanpa auth agar bisa di-scrape (hanya angka agregat, tanpa data pekerja)."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.exception_handler(database.Error)
+async def database_error_handler(request: Request, exc: database.Error):
+    print(f"DATABASE ERROR: {exc}")
+    return JSONResponse(status_code=503, content={"detail": "Database tidak tersedia"})
+
 # --- API Endpoints for CCTV ---
 @app.get("/api/cctv", tags=["CCTV"])
 async def get_all_cctv(current_user: dict = Depends(auth.get_current_user)):
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT id, name, ip_address, location, port, username, password FROM cctv_streams")
-    cctvs = cursor.fetchall()
-    conn.close()
-    return cctvs
+    return await database.fetch_all("SELECT id, name, ip_address, location, port, username, password FROM cctv_streams")
 
 @app.post("/api/cctv", tags=["CCTV"])
 async def add_cctv(cctv: CCTV, current_user: dict = Depends(auth.get_current_user)):
-    conn = get_db_connection()
-    cursor = conn.cursor()
     sql = "INSERT INTO cctv_streams (name, ip_address, location, port, username, password) VALUES (%s, %s, %s, %s, %s, %s)"
     val = (cctv.name, cctv.ip_address, cctv.location, cctv.port if cctv.port else None, cctv.username if cctv.username else None, cctv.password if cctv.password else None)
-    cursor.execute(sql, val)
-    conn.commit()
-    conn.close()
+    await database.execute(sql, val)
+    cctv_service.reload()
     return {"status": "success", "message": "CCTV added."}
 
-# --- PETA KELAS DAN WARNA ---
-CLASS_NAMES = {
-    0: 'person', 1: 'ear', 2: 'ear-muffs', 3: 'face', 4: 'face-guard',
-    5: 'face-mask', 6: 'foot', 7: 'tool', 8: 'glasses', 9: 'gloves',
-    10: 'helmet', 11: 'hands', 12: 'head', 13: 'coverall', 14: 'shoes',
-    15: 'coverall', 16: 'safety-vest'
-}
-
-COLOR_MAP = {
-    'person': (255, 255, 255), 'ear': (150, 150, 150), 'ear-muffs': (0, 165, 255),
-    'face': (200, 200, 200), 'face-guard': (255, 255, 0), 'face-mask': (235, 206, 135),
-    'foot': (42, 42, 165), 'tool': (255, 0, 255), 'glasses': (255, 0, 0),
-    'gloves': (50, 205, 50), 'helmet': (0, 255, 0), 'hands': (189, 215, 255),
-    'head': (203, 192, 255), 'coverall': (0, 0, 255), 'shoes': (0, 255, 255),
-    'safety-vest': (0, 215, 255)
-}
-
-# --- ATURAN APD ---
-PPE_WAJIB = {'coverall', 'helmet', 'shoes'}
-PPE_OPSIONAL = {'glasses', 'gloves', 'face-mask'}
-
-PPE_MODEL_PATH = "../models/ppe_yolov10m/weights/best.pt"
-ppe_model = YOLO(PPE_MODEL_PATH) 
-
-known_face_encodings = []
-known_face_metadata = []
-
-def load_known_faces_from_db():
-    global known_face_encodings, known_face_metadata
-    known_face_encodings.clear(); known_face_metadata.clear()
-    conn = get_db_connection()
-    if not conn: return
+
+known_faces = FaceGalleryStore()
+
+def _fetch_face_encodings(cursor, worker_ids):
+    # worker_ids None = ambil semua (belum ada snapshot); selain itu hanya id yang belum ada di snapshot
+    if worker_ids is None:
+        cursor.execute("SELECT id, face_encoding FROM workers")
+        return {row['id']: decode_face_blob(row['face_encoding']) for row in cursor.fetchall()}
+    encodings = {}
+    for start in range(0, len(worker_ids), 1000):
+        chunk = worker_ids[start:start + 1000]
+        cursor.execute(f"SELECT id, face_encoding FROM workers WHERE id IN ({', '.join(['%s'] * len(chunk))})", tuple(chunk))
+        encodings.update({row['id']: decode_face_blob(row['face_encoding']) for row in cursor.fetchall()})
+    return encodings
+
+def load_known_faces_from_db(refresh_employee_ids=()):
+    """Sinkronisasi penuh (startup): metadata dari DB, encoding dari snapshot biner + baris yang belum ada di snapshot.
+
+    refresh_employee_ids: pekerja yang encoding-nya diganti di DB; dibaca ulang walau sudah ada di snapshot.
+    """
+    with db_cursor(dictionary=True) as cursor:
+        cursor.execute("SELECT id, employee_id, name, company, role, status_sim_l FROM workers ORDER BY id")
+        metadata = cursor.fetchall()
+        refresh = set(refresh_employee_ids)
+        refresh_ids = [m['id'] for m in metadata if m['employee_id'] in refresh]
+        fetched = known_faces.reload(metadata, lambda worker_ids: _fetch_face_encodings(cursor, worker_ids), refresh_ids)
+    print(f"SUCCESS: Loaded {len(known_faces)} faces ({fetched} decoded from DB, rest from snapshot).")
+
+async def fetch_logs_since(after_id, limit):
+    return await database.fetch_all(*build_logs_since_query(after_id, limit))
+
+async def fetch_last_log_id():
+    row = await database.fetch_one("SELECT COALESCE(MAX(log_id), 0) AS last_id FROM gate_logs")
+    return row['last_id']
+
+# Rollup kepatuhan diperbarui dalam transaksi yang sama dengan INSERT gate_logs;
+# setelah commit, hub siaran mengambil baris baru sekali lalu mengirim ke semua dashboard
+log_events = LogEventHub(fetch_logs_since, fetch_last_log_id)
+log_writer = GateLogWriter(get_db_connection, on_batch=update_rollups, on_commit=log_events.notify)
+compliance_store = ComplianceStore(log_writer.submit)  # Satu state kepatuhan untuk semua kamera dan dashboard
+
+# Bulan lama gate_logs di file Parquet (log_archive.py); tanpa pyarrow history hanya membaca tabel hot
+log_archive = LogArchive() if arrow_available() else None
+if log_archive is None and LOG_HOT_MONTHS > 0:
+    print("WARNING: pyarrow tidak terpasang; arsip gate_logs nonaktif, semua log tetap di MySQL.")
+
+def backfill_rollups():
     try:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT id, employee_id, name, company, role, status_sim_l, face_encoding FROM workers")
-        for row in cursor.fetchall():
-            known_face_encodings.append(pickle.loads(row['face_encoding']))
-            known_face_metadata.append(row)
-        print(f"SUCCESS: Loaded {len(known_face_encodings)} faces from DB.")
-    finally:
-        if conn.is_connected():
-            conn.close()
+        print(f"ROLLUP: rebuilt from {rebuild_rollups(db_cursor, archive=log_archive)} gate_logs rows.")
+    except database.Error as e:
+        print(f"DATABASE ERROR: gagal rebuild rollup: {e}")
+
+def rollups_need_backfill():
+    with db_cursor() as cursor:
+        cursor.execute("SELECT EXISTS(SELECT 1 FROM gate_log_rollups), EXISTS(SELECT 1 FROM gate_logs)")
+        has_rollups, has_logs = cursor.fetchone()
+    return has_logs and not has_rollups
+
+def prepare_schema():
+    ensure_schema()
+    if rollups_need_backfill():  # Pertama kali setelah upgrade: isi rollup dari histori di latar belakang
+        threading.Thread(target=backfill_rollups, name="rollup-backfill", daemon=True).start()
+
+async def _warm_up_workers(job):
+    # Satu job per worker: setiap thread/proses memuat + warmup modelnya sendiri sebelum frame pertama
+    await asyncio.gather(*(inference_executor.run(job) for _ in range(INFERENCE_WORKERS)))
+
+async def _load_database_state():
+    # Galeri butuh tabel yang sudah ada; DB mati saat boot = coba lagi, endpoint lain tetap jalan
+    await readiness.run("schema", prepare_schema, retry_on=(database.Error,))
+    await readiness.run("gallery", load_known_faces_from_db, retry_on=(database.Error,))
 
 @app.on_event("startup")
 def on_startup():
-    load_known_faces_from_db()
+    log_writer.start()
+
+@app.on_event("startup")
+async def start_log_events():
+    log_events.start()
+
+async def _start_cctv_ingest():
+    # Semua CCTV terdaftar di-ingest dan dicatat sejak startup, tidak menunggu ada yang menonton
+    await readiness.wait("schema")
+    cctv_service.start()
+
+async def _initialize():
+    jobs = [_load_database_state(), _start_cctv_ingest()]
+    if PIPELINE_MODE == "inprocess":
+        jobs += [readiness.run("ppe_model", _warm_up_workers, warm_up_ppe_model),
+                 readiness.run("face_model", _warm_up_workers, warm_up_face_models)]
+    await asyncio.gather(*jobs)
+
+async def archive_logs_periodically():
+    await readiness.wait("schema")
+    while True:
+        try:
+            for month, rows in await asyncio.to_thread(archive_due_months, db_cursor, log_archive):
+                print(f"ARCHIVE: gate_logs {month} -> {rows} rows moved to {log_archive.root}")
+        except database.Error as e:
+            print(f"DATABASE ERROR: gagal mengarsip gate_logs: {e}")
+        await asyncio.sleep(LOG_ARCHIVE_INTERVAL_SECONDS)
+
+@app.on_event("startup")
+async def initialize():
+    # Tidak ditunggu: login/CRUD langsung dilayani; /health/ready menjadi 200 setelah semua komponen siap
+    app.state.init_task = asyncio.create_task(_initialize())
+    if log_archive is not None and LOG_HOT_MONTHS > 0 and LOG_ARCHIVE_INTERVAL_SECONDS > 0:
+        app.state.archive_task = asyncio.create_task(archive_logs_periodically())
+
+@app.on_event("shutdown")
+def on_shutdown():
+    cctv_service.stop()
+    inference_executor.shutdown()
+    log_writer.close()  # Flush event yang masih antre
+    if known_faces.dirty:
+        known_faces.save_snapshot()
 
 # --- Endpoint Otentikasi ---
 @app.post("/token", tags=["Authentication"])
 async def login(form_data: OAuth2PasswordRequestForm = Depends()):
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM app_users WHERE username = %s", (form_data.username,))
-    user = cursor.fetchone()
-    conn.close()
-    if not user or not auth.verify_password(form_data.password, user['hashed_password']):
+    user = await database.fetch_one("SELECT * FROM app_users WHERE username = %s", (form_data.username,))
+    # bcrypt sengaja lambat (~ratusan ms); jangan jalankan di event loop
+    if not user or not await asyncio.to_thread(auth.verify_password, form_data.password, user['hashed_password']):
         raise HTTPException(status_code=400, detail="Incorrect username or password")
     
     access_token = auth.create_access_token(data={"sub": user['username'], "role": user['role']})
     return {"access_token": access_token, "token_type": "bearer", "role": user['role']}
 
-# --- API Endpoints for Logs (updated with filter, using gate_logs, added custom date range) ---
+# --- API Endpoints for Logs (filter = rentang tanggal, keyset pagination, export streaming) ---
+EXPORT_PAGE_SIZE = 1000
+
+async def query_logs(start, end, after, limit, status=None, company=None):
+    """Satu halaman terbaru-dulu lintas tier: MySQL untuk data >= archived_until, sisanya dari arsip Parquet."""
+    # archived_until bisa membaca ulang manifest dari disk; jangan di event loop
+    boundary = await asyncio.to_thread(lambda: log_archive.archived_until) if log_archive is not None else None
+    logs = []
+    if boundary is None or ((end is None or end > boundary) and (after is None or after[0] >= boundary)):
+        hot_start = max(start, boundary) if start is not None and boundary is not None else (start or boundary)
+        logs = await database.fetch_all(*build_logs_query(hot_start, end, after, limit, status, company))
+    if len(logs) < limit and boundary is not None and (start is None or start < boundary):
+        archive_after = (logs[-1]['timestamp'], logs[-1]['log_id']) if logs else after
+        archive_end = min(end, boundary) if end is not None else boundary
+        logs += await asyncio.to_thread(log_archive.query, start, archive_end, archive_after, limit - len(logs),
+                                        status, company)
+    return logs
+
 @app.get("/api/logs", tags=["Logs"])
-async def get_logs(limit: int = 50, filter: str = "all", start_date: str = None, end_date: str = None, current_user: dict = Depends(auth.get_current_user)):
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-    sql = """
-        SELECT gl.log_id, gl.timestamp_in AS timestamp, gl.ppe_status AS status, gl.ppe_details, w.name, w.company, w.role
-        FROM gate_logs gl
-        JOIN workers w ON gl.worker_id = w.id
-    """
-    val = []
-    now = datetime.now()
-    if start_date and end_date:  # Custom range
-        sql += " WHERE gl.timestamp_in BETWEEN %s AND %s"
-        val.extend([datetime.strptime(start_date, '%Y-%m-%d'), datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)])
-    elif filter == "today":
-        sql += " WHERE gl.timestamp_in >= %s"
-        val.append(now.replace(hour=0, minute=0, second=0, microsecond=0))
-    elif filter == "this_week":
-        start_week = now - timedelta(days=now.weekday())  # Mulai Senin
-        sql += " WHERE gl.timestamp_in >= %s"
-        val.append(start_week.replace(hour=0, minute=0, second=0, microsecond=0))
-    elif filter == "this_month":
-        start_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        sql += " WHERE gl.timestamp_in >= %s"
-        val.append(start_month)
-    elif filter == "this_year":
-        start_year = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
-        sql += " WHERE gl.timestamp_in >= %s"
-        val.append(start_year)
-    elif filter == "last_year":
-        start_last = datetime(now.year - 1, 1, 1)
-        end_last = datetime(now.year, 1, 1)
-        sql += " WHERE gl.timestamp_in >= %s AND gl.timestamp_in < %s"
-        val.extend([start_last, end_last])
-    elif filter == "2024":
-        start_2024 = datetime(2024, 1, 1)
-        end_2024 = datetime(2025, 1, 1)
-        sql += " WHERE gl.timestamp_in >= %s AND gl.timestamp_in < %s"
-        val.extend([start_2024, end_2024])
-    elif filter == "2023":
-        start_2023 = datetime(2023, 1, 1)
-        end_2023 = datetime(2024, 1, 1)
-        sql += " WHERE gl.timestamp_in >= %s AND gl.timestamp_in < %s"
-        val.extend([start_2023, end_2023])
-
-    sql += " ORDER BY gl.timestamp_in DESC LIMIT %s"
-    val.append(limit)
-
-    cursor.execute(sql, tuple(val))
-    logs = cursor.fetchall()
-    # Parse ppe_details JSON for description
-    for log in logs:
-        details = json.loads(log['ppe_details'])
-        log['description'] = details['description']
-        log.pop('ppe_details')  # Clean up
-    conn.close()
+async def get_logs(response: Response, limit: int = 50, filter: str = "all", start_date: str = None, end_date: str = None,
+                   cursor: str = None, status: str = None, company: str = None,
+                   current_user: dict = Depends(auth.get_current_user)):
+    """Log terbaru dulu, termasuk bulan yang sudah diarsip. Halaman berikutnya: kirim header X-Next-Cursor sebagai cursor."""
+    start, end = filter_range(filter, start_date, end_date)
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    logs = await query_logs(start, end, after, limit, status, company)
+    if len(logs) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(logs[-1])
     return logs
 
+async def _iter_log_pages(start, end, status=None, company=None):
+    after = None
+    while True:
+        page = await query_logs(start, end, after, EXPORT_PAGE_SIZE, status, company)
+        if page:
+            yield page
+        if len(page) < EXPORT_PAGE_SIZE:
+            return
+        after = (page[-1]['timestamp'], page[-1]['log_id'])
+
+@app.get("/api/logs/export", tags=["Logs"])
+async def export_logs(format: str = "ndjson", filter: str = "all", start_date: str = None, end_date: str = None,
+                      status: str = None, company: str = None, current_user: dict = Depends(auth.get_current_user)):
+    """Export seluruh rentang sebagai NDJSON atau CSV; baris dikirim per halaman keyset, tidak ditampung di memori."""
+    if format not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="format must be ndjson or csv")
+    start, end = filter_range(filter, start_date, end_date)
+    columns = ["log_id", "timestamp", "status", "description", "name", "company", "role"]
+
+    async def rows():
+        if format == "csv":
+            yield ",".join(columns) + "\n"
+        async for page in _iter_log_pages(start, end, status, company):
+            buffer = io.StringIO()
+            if format == "csv":
+                csv.writer(buffer).writerows([[log[c] for c in columns] for log in page])
+            else:
+                buffer.writelines(json.dumps(log, default=str) + "\n" for log in page)
+            yield buffer.getvalue()
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"gate_logs.{'csv' if format == 'csv' else 'ndjson'}"
+    return StreamingResponse(rows(), media_type=media_type,
+                             headers={"Content-Disposition": f"attachment; filename={filename}"})
+
+@app.get("/api/logs/archive", tags=["Logs"])
+async def get_log_archive(current_user: dict = Depends(auth.get_current_user)):
+    """Status retensi: batas tier hot/arsip, jumlah bulan, baris, dan ukuran file arsip."""
+    if current_user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can view the log archive.")
+    if log_archive is None:
+        return {"enabled": False, "hot_months": LOG_HOT_MONTHS}
+    return {"enabled": True, "hot_months": LOG_HOT_MONTHS, **log_archive.stats()}
+
+# --- API Endpoints for Analytics (rollup kepatuhan per jam/hari) ---
+@app.get("/api/analytics/compliance", tags=["Analytics"])
+async def get_compliance(granularity: str = "day", dimension: str = "all", group: str = "bucket", filter: str = "all",
+                         start_date: str = None, end_date: str = None, current_user: dict = Depends(auth.get_current_user)):
+    """Jumlah event per status (hijau/orange/merah) dari tabel rollup, tanpa memindai gate_logs.
+
+    dimension: all | company | role | cctv | missing (item APD yang tidak dipakai).
+    group=bucket memberi deret waktu, group=total menjumlahkan seluruh rentang per nilai dimensi.
+    """
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"granularity must be one of {', '.join(GRANULARITIES)}")
+    if dimension not in DIMENSIONS:
+        raise HTTPException(status_code=400, detail=f"dimension must be one of {', '.join(DIMENSIONS)}")
+    if group not in ("bucket", "total"):
+        raise HTTPException(status_code=400, detail="group must be bucket or total")
+    start, end = filter_range(filter, start_date, end_date)
+    rows = await database.fetch_all(*build_rollup_query(granularity, dimension, start, end, group))
+    return [{**row, "count": int(row["count"])} for row in rows]
+
+@app.post("/api/analytics/rebuild", tags=["Analytics"])
+async def rebuild_analytics(current_user: dict = Depends(auth.get_current_user)):
+    if current_user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can rebuild analytics.")
+    rows = await database.run_db(rebuild_rollups, db_cursor)
+    return {"status": "success", "rows": rows}
+
 # --- WebSocket untuk Dashboard & Enrollment ---
 # --- FUNGSI UTAMA YANG DIPERBARUI TOTAL ---
+# process_frame (kepatuhan per pekerja + overlay) ada di compliance.py
+async def locate_frame_faces(frame, boxes, state):
+    """Lokasi wajah: HOG seluruh frame, atau hanya region face/head YOLO (FACE_LOCATE_MODE) dengan scan penuh berkala."""
+    regions = state.setdefault("face_locator", FaceLocator()).plan(boxes, frame.shape)
+    if regions is None:
+        return await inference_executor.run(locate_faces, frame)
+    if not len(regions):
+        return [], {"queue_ms": 0.0, "run_ms": 0.0}  # Tidak ada kepala/wajah menurut YOLO: tanpa HOG
+    return await inference_executor.run(locate_faces_in_regions, frame, regions)
+
+async def recognize_frame(frame, boxes, state, timing):
+    """Cari wajah, encode + cocokkan hanya wajah yang track-nya baru atau basi, lalu kepatuhan & anotasi.
+
+    boxes: array (N, 6) [x1, y1, x2, y2, conf, class_id] dari detect_frames.
+    """
+    await readiness.wait("gallery")  # Sebelum galeri dimuat semua wajah akan tercatat "unknown"
+    tracker = state.setdefault("tracker", FaceTracker())
+    face_locations, locate_timing = await locate_frame_faces(frame, boxes, state)
+    timing = {key: round(timing[key] + locate_timing[key], 1) for key in timing}
+
+    stale = tracker.update(face_locations)
+    if stale:
+        face_encodings, encode_timing = await inference_executor.run(
+            encode_faces_at, frame, [face_locations[i] for i in stale])
+        with STAGE_SECONDS.time(stage="gallery_match"):
+            matches = known_faces.match(face_encodings)
+        tracker.identify(stale, matches)
+        unknown = sum(1 for user_info, _ in matches if user_info is None)
+        FACES.inc(len(matches) - unknown, result="matched")
+        FACES.inc(unknown, result="unknown")
+        timing = {key: round(timing[key] + encode_timing[key], 1) for key in timing}
+    timing.update({"faces": len(face_locations), "faces_encoded": len(stale)})
+
+    with STAGE_SECONDS.time(stage="compliance"):
+        frame, response_data = await asyncio.to_thread(process_frame, frame, boxes, tracker.faces(), state, compliance_store)
+    response_data["timing"] = timing
+    readiness.mark_first_frame()
+    return frame, response_data
+
+async def analyze_frame(frame, state):
+    # Jalur yang sama dengan CCTV: YOLO lalu lokasi wajah, masing-masing punya metrik tahap sendiri
+    (boxes, timing), = await detect_frames([frame])
+    return await recognize_frame(frame, boxes, state, timing)
+
+async def detect_frames(frames):
+    """YOLO satu panggilan untuk semua kamera. Lokasi wajah butuh kotak face/head, jadi dicari per kamera
+    di recognize_frame (paralel antar kamera lewat gather di MultiStreamService)."""
+    boxes_per_frame, timing = await inference_executor.run(detect_batch, frames, False)
+    return [(boxes, dict(timing)) for boxes in boxes_per_frame]
+
+def load_cctv_streams():
+    with db_cursor(dictionary=True) as cursor:
+        cursor.execute("SELECT id, name, ip_address, port, username, password FROM cctv_streams")
+        return cursor.fetchall()
+
+async def finish_worker_frame(frame, result, state):
+    """PIPELINE_MODE=workers: YOLO, lokasi + encoding wajah sudah di proses worker; di sini galeri + kepatuhan.
+
+    Identitas disimpan per (worker, track_id) karena setiap proses worker punya FaceTracker sendiri.
+    """
+    await readiness.wait("gallery")
+    identities = state.setdefault("identities", {})
+    worker = result["worker"]
+    if result["encoded"]:
+        track_ids = list(result["encoded"])
+        with STAGE_SECONDS.time(stage="gallery_match"):
+            matches = known_faces.match([result["encoded"][track_id] for track_id in track_ids])
+        for track_id, (user_info, _) in zip(track_ids, matches):
+            identities[(worker, track_id)] = user_info
+        unknown = sum(1 for user_info, _ in matches if user_info is None)
+        FACES.inc(len(matches) - unknown, result="matched")
+        FACES.inc(unknown, result="unknown")
+    live = set(result["live"])
+    for key in [key for key in identities if key[0] == worker and key[1] not in live]:
+        del identities[key]  # Track yang sudah dibuang tracker worker
+    faces = [(location, identities.get((worker, track_id))) for location, track_id in result["faces"]]
+
+    with STAGE_SECONDS.time(stage="compliance"):
+        frame, response_data = await asyncio.to_thread(process_frame, frame, result["boxes"], faces, state, compliance_store)
+    response_data["timing"] = {**{stage: round(seconds * 1000, 1) for stage, seconds in result["stages"].items()},
+                               "faces": len(faces), "faces_encoded": len(result["encoded"]), "worker": worker}
+    if state.get("cctv_id") is not None:
+        response_data["cctv_id"] = state["cctv_id"]  # Sama dengan MultiStreamService._process_batch
+    readiness.mark_first_frame()
+    return frame, response_data
+
+async def resolve_cctv_url(cctv_id):
+    streams = await asyncio.to_thread(load_cctv_streams)
+    row = next((row for row in streams if row['id'] == cctv_id), None)
+    return stream_url(row) if row else None
+
+def create_camera_pipeline(source):
+    async def resolve():
+        return source
+    return ProcessPipeline(f"camera:{source}", resolve, finish_worker_frame)
+
+async def load_cctv_ids():
+    return [row['id'] for row in await asyncio.to_thread(load_cctv_streams)]
+
+def create_cctv_pipeline(cctv_id):
+    return ProcessPipeline(f"cctv:{cctv_id}", lambda: resolve_cctv_url(cctv_id), finish_worker_frame,
+                           initial_state={"cctv_id": cctv_id})
+
+# Satu producer per kamera; semua client dashboard berlangganan ke hasil yang sama
+CAMERA_SOURCE = 0
+if PIPELINE_MODE == "workers":
+    # Capture + inferensi di proses per kamera; executor hanya untuk enrollment (model dimuat saat pertama dipakai)
+    inference_executor = InferenceExecutor()
+    camera_hub = ProcessHub(create_camera_pipeline)
+    cctv_service = ProcessHub(create_cctv_pipeline, load_cctv_ids)
+else:
+    inference_executor = InferenceExecutor(initializer=get_ppe_model)
+    camera_hub = PipelineHub(analyze_frame)
+    cctv_service = MultiStreamService(load_cctv_streams, detect_frames, recognize_frame)
+
+# Gauge yang dibaca saat scrape, tanpa biaya di jalur frame
+CallbackGauge("ppe_inference_in_flight", "Pekerjaan inferensi yang sedang berjalan/antre", lambda: inference_executor.in_flight)
+CallbackGauge("ppe_gate_log_queue", "Event gate_logs yang menunggu ditulis", lambda: log_writer.stats()["queued"])
+CallbackGauge("ppe_compliance_tracked_workers", "Pekerja dengan state kepatuhan aktif", lambda: len(compliance_store))
+CallbackGauge("ppe_gallery_faces", "Jumlah wajah di galeri", lambda: len(known_faces))
+CallbackGauge("ppe_startup_seconds", "Detik sejak proses mulai sampai fase startup tercapai", readiness.timings,
+              labels=["phase"])
+CallbackGauge("ppe_stream_effective_fps", "Laju efektif per sumber kamera", lambda: {
+    **{(f"camera:{source}",): pipeline.scheduler.effective_fps() for source, pipeline in camera_hub.pipelines.items()},
+    **{(f"cctv:{cctv_id}",): scheduler.effective_fps() for cctv_id, scheduler in cctv_service.schedulers.items()},
+}, labels=["source"])
+
+async def _send_feed(websocket, subscription, options):
+    while True:
+        # Client lambat langsung dapat frame terbaru, bukan antrean frame lama
+        packet = await subscription.get()
+        if packet is None: break
+
+        # 5. Kirim data ke frontend (continuous, no break); JPEG per setelan dipakai bersama client lain
+        await options.send(websocket, packet)
+
+def _transport_options(websocket):
+    """?mode=legacy|framed|overlay&width=...&quality=...; None (socket ditutup) bila tidak valid."""
+    try:
+        return TransportOptions.from_query(websocket.query_params)
+    except ValueError as e:
+        print(f"Invalid transport options: {e}")
+        return None
+
+@app.get("/api/pipeline/stats", tags=["Pipeline"])
+async def get_pipeline_stats(current_user: dict = Depends(auth.get_current_user)):
+    """Penghitung frame processed/skipped/dropped dan laju efektif per kamera."""
+    return {
+        "cameras": {str(source): pipeline.scheduler.stats() for source, pipeline in camera_hub.pipelines.items()},
+        "cctv": cctv_service.stats(),
+        "gate_logs": log_writer.stats(),
+        "compliance": compliance_store.stats(),
+        "log_events": log_events.stats(),
+    }
+
 @app.websocket("/ws/dashboard")
 async def ws_dashboard(websocket: WebSocket):
+    options = _transport_options(websocket)
+    if options is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
     await websocket.accept()
-    cap = cv2.VideoCapture(0)
-    last_records = {}  # Track last record time per user to avoid spam (record every 60s or on change)
+    pipeline = camera_hub.get(CAMERA_SOURCE)
+    subscription = pipeline.subscribe()
+    WEBSOCKET_CLIENTS.inc(endpoint="dashboard")
     try:
-        while True:
-            ret, frame = cap.read()
-            if not ret: break
-
-            # 1. Deteksi semua objek dengan YOLO
-            results = ppe_model(frame, verbose=False)
-            detected_items = set()
-            
-            for result in results:
-                for box in result.boxes:
-                    class_id = int(box.cls)
-                    label = CLASS_NAMES.get(class_id, 'unknown')
-                    detected_items.add(label)
-                    
-                    # Gambar bounding box untuk semua item APD
-                    x1, y1, x2, y2 = map(int, box.xyxy[0])
-                    color = COLOR_MAP.get(label, (0, 0, 0))
-                    cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
-                    cv2.putText(frame, label, (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
-
-            # 2. Kenali wajah (support multiple faces)
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            face_locations = face_recognition.face_locations(rgb_frame)
-            face_encodings = face_recognition.face_encodings(rgb_frame, face_locations)
-            
-            user_infos = []
-            for i, encoding in enumerate(face_encodings):
-                matches = face_recognition.compare_faces(known_face_encodings, encoding, tolerance=0.5)
-                if True in matches:
-                    match_index = matches.index(True)
-                    user_info = known_face_metadata[match_index]
-                    user_infos.append(user_info)
-
-                    # Tampilkan nama, role, company di dekat wajah
-                    top, right, bottom, left = face_locations[i]
-                    text = f"{user_info['name']} - {user_info['role']} @ {user_info['company']}"
-                    cv2.putText(frame, text, (left, top - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-
-            # 3. Analisis Kepatuhan APD dan SIML untuk setiap user
-            response_data = {"users": []}
-            for user_info in user_infos:
-                # Asumsi deteksi APD global; untuk per person, butuh asosiasi lanjutan (tambahkan proximity check if needed)
-                status_wajib = {item: (item in detected_items) for item in PPE_WAJIB}
-                status_opsional = {item: (item in detected_items) for item in PPE_OPSIONAL}
-
-                is_wajib_lengkap = all(status_wajib.values())
-                is_opsional_lengkap = all(status_opsional.values())
-                is_siml_aktif = user_info['status_sim_l'] == 'Aktif'
-
-                overall_status = "merah"
-                description = []
-
-                if not is_siml_aktif:
-                    overall_status = "merah"
-                    description.append("SIML Tidak Aktif")
-                else:
-                    if not is_wajib_lengkap:
-                        overall_status = "merah"
-                        missing_wajib = [item for item, detected in status_wajib.items() if not detected]
-                        description.extend([f"Tidak Menggunakan <b style='color:red'>{item.capitalize()}</b>" for item in missing_wajib])
-                    else:
-                        if is_opsional_lengkap:
-                            overall_status = "hijau"
-                            description.append("APD Lengkap dan SIML Aktif")
-                        else:
-                            overall_status = "orange"
-                            missing_opsional = [item for item, detected in status_opsional.items() if not detected]
-                            description.extend([f"Tidak Menggunakan <b style='color:orange'>{item.capitalize()}</b>" for item in missing_opsional])
-
-                # 4. Record to DB if new or changed (every 60s max)
-                user_id = user_info['id']
-                now = datetime.now()
-                last_time = last_records.get(user_id, now - timedelta(seconds=61))
-                if (now - last_time).total_seconds() > 60:  # Record if >60s since last
-                    conn = get_db_connection()
-                    cursor = conn.cursor()
-                    sql = """
-                        INSERT INTO gate_logs (worker_id, timestamp_in, ppe_status, ppe_details, cctv_id)
-                        VALUES (%s, %s, %s, %s, %s)
-                    """
-                    ppe_used = {"wajib": status_wajib, "opsional": status_opsional}
-                    details = json.dumps({"ppe_used": ppe_used, "description": "; ".join(description)})
-                    val = (user_id, now, overall_status, details, None)  # cctv_id None for dashboard
-                    cursor.execute(sql, val)
-                    conn.commit()
-                    conn.close()
-                    last_records[user_id] = now
-
-                # Tambah ke response untuk status panel
-                response_data["users"].append({
-                    "user": user_info,
-                    "ppe_status": {
-                        "wajib": status_wajib,
-                        "opsional": status_opsional,
-                        "overall": overall_status,
-                        "description": description
-                    }
-                })
-
-            # 5. Kirim data ke frontend (continuous, no break)
-            _, buffer = cv2.imencode('.jpg', frame)
-            await websocket.send_bytes(buffer.tobytes())
-            await websocket.send_json(response_data)
-                
-            await asyncio.sleep(0.1)  # Optimized sleep for smoother feed
-
+        await _send_feed(websocket, subscription, options)
     except WebSocketDisconnect:
         print("Dashboard client disconnected.")
     finally:
-        if cap.isOpened():
-            cap.release()
+        WEBSOCKET_CLIENTS.dec(endpoint="dashboard")
+        pipeline.unsubscribe(subscription)
+
+@app.websocket("/ws/cctv/{cctv_id}")
+async def ws_cctv(websocket: WebSocket, cctv_id: int):
+    options = _transport_options(websocket)
+    if options is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+    subscription = cctv_service.subscribe(cctv_id)
+    WEBSOCKET_CLIENTS.inc(endpoint="cctv")
+    try:
+        await _send_feed(websocket, subscription, options)
+    except WebSocketDisconnect:
+        print(f"CCTV {cctv_id} client disconnected.")
+    finally:
+        WEBSOCKET_CLIENTS.dec(endpoint="cctv")
+        cctv_service.unsubscribe(cctv_id, subscription)
+
+@app.websocket("/ws/logs")
+async def ws_logs(websocket: WebSocket, token: str, last_id: int = None):
+    """Push setiap gate_logs baru. last_id = log_id terakhir yang sudah dimiliki client (resume setelah reconnect)."""
+    try:
+        await auth.get_current_user(token)  # Browser tidak bisa mengirim header Authorization untuk WebSocket
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+    backlog, queue = await log_events.subscribe(last_id)
+    sent = last_id or 0
+    WEBSOCKET_CLIENTS.inc(endpoint="logs")
+    try:
+        for row in backlog:
+            await websocket.send_text(encode_event(row))
+            sent = row['log_id']
+        while True:
+            row = await queue.get()
+            if row is None: break  # Terlalu lambat; client reconnect dengan last_id
+            if row['log_id'] > sent:
+                await websocket.send_text(encode_event(row))
+                sent = row['log_id']
+        await websocket.close()
+    except WebSocketDisconnect:
+        print("Log stream client disconnected.")
+    finally:
+        WEBSOCKET_CLIENTS.dec(endpoint="logs")
+        log_events.unsubscribe(queue)
 
 # Ganti fungsi ws_enroll Anda dengan yang ini di file backend/main.py (no change, kept as is)
 
 @app.websocket("/ws/enroll")
 async def ws_enroll(websocket: WebSocket):
+    options = _transport_options(websocket)
+    if options is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
     await websocket.accept()
     cap = cv2.VideoCapture(0)
     if not cap.isOpened():
@@ -306,96 +579,96 @@ async def ws_enroll(websocket: WebSocket):
         await websocket.close()
         return
         
+    seq = 0
+    WEBSOCKET_CLIENTS.inc(endpoint="enroll")
     try:
         while True:
             message = None
+            result = {}  # Hasil capture; legacy = pesan JSON terpisah, framed = metadata frame berikutnya
             try:
                 message_text = await asyncio.wait_for(websocket.receive_text(), timeout=0.01)
                 message = json.loads(message_text)
             except (asyncio.TimeoutError, json.JSONDecodeError):
                 pass
             
-            ret, frame = cap.read()
+            ret, frame = await asyncio.to_thread(cap.read)
             if not ret: break
 
             if message and message.get("command") == "capture":
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                face_locations = face_recognition.face_locations(rgb_frame)
+                (face_locations, face_encodings), _ = await inference_executor.run(encode_faces, frame)
                 
-                if len(face_locations) == 1:
-                    face_encoding = face_recognition.face_encodings(rgb_frame, face_locations)[0]
-                    encoding_bytes = pickle.dumps(face_encoding)
-                    
+                error = face_count_error(len(face_locations))
+                if error is None:
+                    face_encoding = face_encodings[0]
+                    worker = {column: message[column] for column in WORKER_COLUMNS}
+
                     try:
-                        conn = get_db_connection()
-                        cursor = conn.cursor()
-                        sql = "INSERT INTO workers (employee_id, name, company, role, status_sim_l, face_encoding) VALUES (%s, %s, %s, %s, %s, %s)"
-                        val = (
-                            message['employee_id'], message['name'], message['company'], 
-                            message['role'], message['status_sim_l'], encoding_bytes
-                        )
-                        cursor.execute(sql, val)
-                        conn.commit()
-                        conn.close()
+                        _, worker_id = await database.execute(INSERT_WORKER_SQL, worker_row(worker, face_encoding))
                         
-                        load_known_faces_from_db()
-                        await websocket.send_json({"status": "success", "message": f"Worker {message['name']} berhasil ditambahkan."})
+                        await readiness.wait("gallery")  # reload awal tidak boleh menimpa wajah baru ini
+                        known_faces.add(face_encoding, {"id": worker_id, **worker})
+                        result = {"status": "success", "message": f"Worker {message['name']} berhasil ditambahkan."}
 
                     except Exception as e:
                         print(f"DATABASE ERROR: {e}")
                         error_message = f"Error: Employee ID '{message['employee_id']}' sudah terdaftar."
-                        await websocket.send_json({"status": "error", "message": error_message})
+                        result = {"status": "error", "message": error_message}
 
                 else:
-                    msg = "Wajah tidak terdeteksi." if len(face_locations) == 0 else "Terdeteksi lebih dari satu wajah."
-                    await websocket.send_json({"status": "error", "message": msg})
-
-            _, buffer = cv2.imencode('.jpg', frame)
-            await websocket.send_bytes(buffer.tobytes())
+                    result = {"status": "error", "message": error}
+
+            seq += 1
+            if options.mode == "legacy":
+                if result:
+                    await websocket.send_json(result)
+                jpeg_bytes = await asyncio.to_thread(FramePacket(seq, frame, {}).jpeg, options.width, options.quality, False)
+                await websocket.send_bytes(jpeg_bytes)
+            else:
+                await options.send(websocket, FramePacket(seq, frame, result))
             await asyncio.sleep(0.1)  # Optimized
             
     except WebSocketDisconnect: 
         print("Enrollment client disconnected.")
     finally: 
+        WEBSOCKET_CLIENTS.dec(endpoint="enroll")
         if cap.isOpened():
             cap.release()
 
 # --- API Endpoints CRUD untuk Workers --- (no change, kept as is)
 @app.get("/api/workers", tags=["Workers"])
 async def get_all_workers(current_user: dict = Depends(auth.get_current_user)):
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT id, employee_id, name, company, role, status_sim_l, created_at FROM workers ORDER BY name")
-    workers = cursor.fetchall()
-    conn.close()
-    return workers
+    return await database.fetch_all("SELECT id, employee_id, name, company, role, status_sim_l, created_at FROM workers ORDER BY name")
 
 @app.get("/api/workers/{worker_id}", tags=["Workers"])
 async def get_worker_by_id(worker_id: int, current_user: dict = Depends(auth.get_current_user)):
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT id, employee_id, name, company, role, status_sim_l FROM workers WHERE id = %s", (worker_id,))
-    worker = cursor.fetchone()
-    conn.close()
+    worker = await database.fetch_one("SELECT id, employee_id, name, company, role, status_sim_l FROM workers WHERE id = %s", (worker_id,))
     if not worker:
         raise HTTPException(status_code=404, detail="Worker not found")
     return worker
 
+@app.post("/api/workers/reload-gallery", tags=["Workers"])
+async def reload_gallery(body: GalleryReload = None, current_user: dict = Depends(auth.get_current_user)):
+    """Sinkronkan galeri wajah dengan tabel workers sekali, mis. setelah scripts/enroll_bulk.py.
+
+    body.employee_ids: pekerja yang wajahnya ditimpa; encoding mereka dibaca ulang dari DB, bukan dari snapshot.
+    """
+    if current_user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can reload the face gallery.")
+    await readiness.wait("gallery")
+    await database.run_db(load_known_faces_from_db, body.employee_ids if body else ())
+    return {"status": "success", "faces": len(known_faces)}
+
 @app.put("/api/workers/{worker_id}", tags=["Workers"])
 async def update_worker(worker_id: int, worker_data: WorkerUpdate, current_user: dict = Depends(auth.get_current_user)):
-    conn = get_db_connection()
-    cursor = conn.cursor()
     sql = """
         UPDATE workers SET employee_id = %s, name = %s, company = %s, role = %s, status_sim_l = %s
         WHERE id = %s
     """
     val = (worker_data.employee_id, worker_data.name, worker_data.company, worker_data.role, worker_data.status_sim_l, worker_id)
-    cursor.execute(sql, val)
-    conn.commit()
-    affected = cursor.rowcount > 0
-    conn.close()
-    if affected:
-        load_known_faces_from_db()
+    rowcount, _ = await database.execute(sql, val)
+    if rowcount > 0:
+        await readiness.wait("gallery")
+        known_faces.update(worker_id, **worker_data.dict())
         return {"status": "success", "message": "Worker data updated."}
     raise HTTPException(status_code=404, detail="Worker not found")
 
@@ -404,14 +677,10 @@ async def delete_worker(worker_id: int, current_user: dict = Depends(auth.get_cu
     if current_user.get("role") != "admin":
         raise HTTPException(status_code=403, detail="Only admins can delete workers.")
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM workers WHERE id = %s", (worker_id,))
-    conn.commit()
-    is_deleted = cursor.rowcount > 0
-    conn.close()
+    rowcount, _ = await database.execute("DELETE FROM workers WHERE id = %s", (worker_id,))
     
-    if is_deleted:
-        load_known_faces_from_db()
+    if rowcount > 0:
+        await readiness.wait("gallery")
+        known_faces.remove(worker_id)
         return {"status": "success", "message": "Worker deleted."}
     raise HTTPException(status_code=404, detail="Worker not found.")
\ No newline at end of file
@@ -0,0 +1,168 @@
+# metrics.py: Counter/Gauge/Histogram ringan tanpa dependensi, diekspos dalam format teks Prometheus di /metrics
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# Batas bucket (detik) untuk latensi tahap pipeline dan query DB
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Scope ASGI request yang sedang dilayani (diisi middleware); route-nya dipakai sebagai label timing query DB
+current_request_scope = contextvars.ContextVar("current_request_scope", default=None)
+
+_registry = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def endpoint_label(scope):
+    """Template path route yang cocok (/api/workers/{worker_id}), bukan path mentah, agar jumlah label tetap kecil.
+    Router baru mengisi scope["route"] setelah routing; sebelum itu atau bila tidak ada yang cocok -> "unmatched"."""
+    return getattr(scope.get("route"), "path", None) or "unmatched"
+
+def current_endpoint():
+    scope = current_request_scope.get()
+    return "background" if scope is None else endpoint_label(scope)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()  # Diamati dari event loop, thread inferensi, dan thread writer
+        _registry.append(self)
+
+    def _key(self, labels):
+        return tuple(labels.get(name, "") for name in self.labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labels, key)} {value}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class CallbackGauge(_Metric):
+    """Gauge yang nilainya dibaca saat scrape: fn() -> {label_tuple: value} atau angka tunggal."""
+    kind = "gauge"
+
+    def __init__(self, name, help, fn, labels=()):
+        super().__init__(name, help, labels)
+        self.fn = fn
+
+    def render(self):
+        values = self.fn()
+        if not isinstance(values, dict):
+            values = {(): values}
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in sorted(values.items()):
+            if value is not None:
+                lines.append(f"{self.name}{_format_labels(self.labels, key)} {value}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Histogram kumulatif ala Prometheus. observe() = satu bisect + satu lock, aman dibiarkan aktif."""
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted((key, ([*counts], total, count)) for key, (counts, total, count) in self._values.items())
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, [('le', le)])} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {count}")
+        return lines
+
+
+def render():
+    """Semua metrik terdaftar dalam format teks Prometheus 0.0.4."""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# --- Metrik pipeline ---
+STAGE_SECONDS = Histogram("ppe_stage_seconds", "Latensi per tahap pipeline (eksekusi, tanpa antre)", ["stage"])
+INFERENCE_QUEUE_SECONDS = Histogram("ppe_inference_queue_seconds", "Waktu menunggu slot/worker inferensi", ["stage"])
+FRAMES = Counter("ppe_frames_total", "Frame per sumber: captured, dropped (basi), skipped (statis), processed",
+                 ["source", "result"])
+FACES = Counter("ppe_faces_total", "Wajah yang di-encode dan dicocokkan: matched atau unknown", ["result"])
+GATE_LOG_ROWS = Counter("ppe_gate_log_rows_total",
+                        "Baris gate_logs: written, dropped (antrean penuh), failed (gagal ditulis saat antrean penuh)",
+                        ["result"])
+COMPLIANCE_DECISIONS = Counter("ppe_compliance_decisions_total",
+                               "Observasi kepatuhan pekerja: logged_change, logged_heartbeat, suppressed (dedup)",
+                               ["result"])
+WEBSOCKET_CLIENTS = Gauge("ppe_websocket_clients", "Client websocket yang terhubung", ["endpoint"])
+HTTP_SECONDS = Histogram("ppe_http_request_seconds", "Latensi request HTTP", ["endpoint", "method", "status"])
+DB_QUERY_SECONDS = Histogram("ppe_db_query_seconds", "Latensi query DB (di thread pool DB) per endpoint", ["endpoint"])
@@ -8,6 +8,9 @@ class WorkerUpdate(BaseModel):
     role: str
     status_sim_l: str
 
+class GalleryReload(BaseModel):
+    employee_ids: list[str] = []  # Pekerja yang wajahnya diganti di DB (mis. enroll_bulk --on-duplicate update)
+
 class CCTV(BaseModel):
     name: str
     ip_address: str
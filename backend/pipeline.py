@@ -0,0 +1,168 @@
+# pipeline.py: Satu producer per kamera (capture -> inferensi), hasilnya di-fan-out ke semua client dashboard
+import asyncio
+import os
+import threading
+import time
+import cv2
+
+from scheduler import FrameScheduler
+from transport import FramePacket
+
+RECONNECT_SECONDS = 5
+
+
+class Subscription:
+    """Slot frame terbaru untuk satu client. Frame lama ditimpa, tidak diantrekan."""
+
+    def __init__(self):
+        self._latest = None
+        self._event = asyncio.Event()
+
+    def publish(self, packet):
+        self._latest = packet
+        self._event.set()
+
+    async def get(self):
+        """Tunggu paket berikutnya. None berarti producer sudah berhenti."""
+        await self._event.wait()
+        self._event.clear()
+        packet, self._latest = self._latest, None
+        return packet
+
+
+class StreamReader:
+    """Thread pembaca untuk satu stream. Hanya frame terbaru yang disimpan; frame lain dibuang.
+
+    on_frame(frame), bila diberikan, dipanggil di thread pembaca untuk setiap frame (mis. tulis ke ring shared memory).
+    """
+
+    def __init__(self, name, url, on_frame=None):
+        self.name = name
+        self.url = url
+        self.on_frame = on_frame
+        self._frame = None
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"capture-{name}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
+
+    def latest(self, after_seq=0):
+        """(seq, frame) bila ada frame lebih baru dari after_seq, selain itu None."""
+        with self._lock:
+            if self._seq > after_seq:
+                return self._seq, self._frame
+        return None
+
+    def _run(self):
+        is_file = isinstance(self.url, str) and os.path.isfile(self.url)
+        cap = cv2.VideoCapture(self.url)
+        # File video diputar sesuai fps aslinya (dan diulang) agar berperilaku seperti kamera live
+        delay = 1.0 / (cap.get(cv2.CAP_PROP_FPS) or 25) if is_file else 0
+        try:
+            while not self._stop.is_set():
+                ret, frame = cap.read()
+                if not ret:
+                    if is_file:
+                        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                        continue
+                    print(f"Kamera {self.name}: stream terputus, mencoba lagi dalam {RECONNECT_SECONDS}s.")
+                    cap.release()
+                    self._stop.wait(RECONNECT_SECONDS)
+                    cap = cv2.VideoCapture(self.url)
+                    continue
+                with self._lock:
+                    self._frame = frame
+                    self._seq += 1
+                if self.on_frame is not None:
+                    self.on_frame(frame)
+                if delay:
+                    self._stop.wait(delay)
+        finally:
+            cap.release()
+
+
+class CameraPipeline:
+    """Producer untuk satu sumber kamera; jalan selama masih ada subscriber."""
+
+    def __init__(self, source, analyze):
+        self.source = source
+        self.analyze = analyze  # async (frame, state) -> (frame, response_data dengan "overlay")
+        self.subscribers = set()
+        self.scheduler = FrameScheduler(source=f"camera:{source}")
+        self.last_timing = None
+        self._task = None
+
+    def subscribe(self):
+        sub = Subscription()
+        self.subscribers.add(sub)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return sub
+
+    def unsubscribe(self, sub):
+        self.subscribers.discard(sub)
+        if not self.subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _publish(self, packet):
+        for sub in list(self.subscribers):
+            sub.publish(packet)
+
+    async def _run(self):
+        # Thread pembaca terus mengambil frame sehingga buffer OpenCV tidak menumpuk frame basi
+        reader = StreamReader(self.source, self.source)
+        reader.start()
+        state = {}  # State per kamera (mis. tracker, face_locator), dipakai bersama semua client
+        seq = 0
+        published = 0
+        try:
+            while self.subscribers:
+                item = reader.latest(seq)
+                if item is None:
+                    await asyncio.sleep(self.scheduler.delay())
+                    continue
+                self.scheduler.frame_read(item[0] - seq - 1)
+                seq, frame = item
+
+                # Scene statis: lewati inferensi, client tetap menampilkan hasil terakhir
+                if not await asyncio.to_thread(self.scheduler.should_process, frame):
+                    await asyncio.sleep(self.scheduler.delay())
+                    continue
+
+                # Event loop hanya menunggu; inferensi jalan di thread/proses lain.
+                # Anotasi + encode JPEG dilakukan sekali per varian oleh FramePacket, saat client pertama memintanya
+                started = time.perf_counter()
+                frame, response_data = await self.analyze(frame, state)
+                elapsed = time.perf_counter() - started
+                self.scheduler.record_latency(elapsed)
+                self.last_timing = response_data.get("timing")
+                published += 1
+                self._publish(FramePacket(published, frame, response_data))
+
+                await asyncio.sleep(self.scheduler.delay(elapsed))
+        finally:
+            reader.stop()
+            self._publish(None)  # Beri tahu client bahwa feed berhenti
+
+
+class PipelineHub:
+    """Registry pipeline per sumber kamera."""
+
+    def __init__(self, analyze):
+        self.analyze = analyze
+        self.pipelines = {}
+
+    def get(self, source):
+        if source not in self.pipelines:
+            self.pipelines[source] = CameraPipeline(source, self.analyze)
+        return self.pipelines[source]
@@ -0,0 +1,191 @@
+# ppe_backends.py: Backend detektor APD yang bisa diganti (ultralytics / ONNX Runtime / OpenVINO, termasuk model int8)
+import os
+
+import cv2
+import numpy as np
+
+from ppe_classes import CLASS_NAMES
+
+PPE_BACKEND = os.getenv("PPE_BACKEND", "ultralytics")  # "ultralytics", "onnxruntime" atau "openvino"
+PPE_MODEL_PATH = os.getenv("PPE_MODEL_PATH", "../models/ppe_yolov10m/weights/best.pt")  # .pt, .onnx, atau .xml OpenVINO
+PPE_IMGSZ = int(os.getenv("PPE_IMGSZ", "640"))  # Sisi input model; lebih kecil = lebih cepat, objek kecil bisa hilang
+PPE_THREADS = int(os.getenv("PPE_THREADS", "0"))  # Thread intra-op per instance model; 0 = default runtime
+PPE_CONF = float(os.getenv("PPE_CONF", "0.25"))  # Sama dengan default predict ultralytics
+PPE_IOU = float(os.getenv("PPE_IOU", "0.7"))  # NMS untuk graph tanpa NMS bawaan (bukan YOLOv10)
+
+BACKENDS = ("ultralytics", "onnxruntime", "openvino")
+
+
+class PPEDetector:
+    """detect(frames) -> [array (N, 6) float32 [x1, y1, x2, y2, conf, class_id], ...], class_id = kunci CLASS_NAMES."""
+
+    name = None
+
+    def __init__(self, path, imgsz=PPE_IMGSZ, threads=PPE_THREADS, conf=PPE_CONF, iou=PPE_IOU):
+        self.path = path
+        self.imgsz = imgsz
+        self.threads = threads
+        self.conf = conf
+        self.iou = iou
+
+    def detect(self, frames):
+        raise NotImplementedError
+
+    def warmup(self, runs=2):
+        """Inferensi dummy agar alokasi memori/kernel tidak dibayar oleh frame pertama."""
+        dummy = np.zeros((self.imgsz, self.imgsz, 3), dtype=np.uint8)
+        for _ in range(runs):
+            self.detect([dummy])
+
+
+class UltralyticsDetector(PPEDetector):
+    """Checkpoint PyTorch (atau hasil export yang bisa dibaca ultralytics) lewat API predict bawaan."""
+
+    name = "ultralytics"
+
+    def __init__(self, path, **kwargs):
+        super().__init__(path, **kwargs)
+        from ultralytics import YOLO
+        if self.threads:
+            import torch
+            torch.set_num_threads(self.threads)
+        self.model = YOLO(path)
+
+    def detect(self, frames):
+        results = self.model(frames, imgsz=self.imgsz, conf=self.conf, iou=self.iou, verbose=False)
+        # Satu salinan device -> host per frame; mode tracking menyisipkan kolom id sebelum conf/cls
+        return [np.ascontiguousarray(r.boxes.data.cpu().numpy()[:, [0, 1, 2, 3, -2, -1]], dtype=np.float32)
+                for r in results]
+
+
+def letterbox(frame, size):
+    """Resize dengan rasio tetap + padding abu-abu (114) seperti ultralytics. Returns (blob CHW RGB 0-1, scale, pad)."""
+    height, width = frame.shape[:2]
+    scale = min(size / height, size / width)
+    new_w, new_h = round(width * scale), round(height * scale)
+    left, top = (size - new_w) // 2, (size - new_h) // 2
+    canvas = np.full((size, size, 3), 114, dtype=np.uint8)
+    canvas[top:top + new_h, left:left + new_w] = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    blob = canvas[:, :, ::-1].transpose(2, 0, 1).astype(np.float32) / 255.0
+    return blob, scale, (left, top)
+
+
+class GraphDetector(PPEDetector):
+    """Pra/pasca-proses bersama untuk graph hasil export (ONNX / OpenVINO).
+
+    Mendukung output YOLOv10 end-to-end (B, K, 6) [x1, y1, x2, y2, conf, cls] dan output mentah YOLOv8 (B, 4 + nc, A)
+    yang masih butuh NMS. Koordinat dikembalikan ke ukuran frame asli.
+    """
+
+    batch_size = 1  # Export default ultralytics: batch statis 1
+
+    def _infer(self, blob):
+        raise NotImplementedError
+
+    def detect(self, frames):
+        outputs = []
+        for start in range(0, len(frames), self.batch_size):
+            chunk = frames[start:start + self.batch_size]
+            prepared = [letterbox(frame, self.imgsz) for frame in chunk]
+            raw = self._infer(np.stack([blob for blob, _, _ in prepared]))
+            for frame, (_, scale, pad), prediction in zip(chunk, prepared, raw):
+                outputs.append(self._postprocess(prediction, frame.shape, scale, pad))
+        return outputs
+
+    def _postprocess(self, prediction, shape, scale, pad):
+        if prediction.shape[-1] == 6:  # YOLOv10: sudah tanpa duplikat
+            detections = prediction[prediction[:, 4] >= self.conf].astype(np.float32)
+        else:
+            detections = self._nms(prediction.T)
+        detections[:, [0, 2]] = ((detections[:, [0, 2]] - pad[0]) / scale).clip(0, shape[1])
+        detections[:, [1, 3]] = ((detections[:, [1, 3]] - pad[1]) / scale).clip(0, shape[0])
+        return np.ascontiguousarray(detections, dtype=np.float32)
+
+    def _nms(self, rows):
+        scores = rows[:, 4:]
+        class_ids = scores.argmax(axis=1)
+        confidences = scores[np.arange(len(rows)), class_ids]
+        keep = confidences >= self.conf
+        rows, class_ids, confidences = rows[keep], class_ids[keep], confidences[keep]
+        if not len(rows):
+            return np.zeros((0, 6), dtype=np.float32)
+        cx, cy, w, h = rows[:, 0], rows[:, 1], rows[:, 2], rows[:, 3]
+        xywh = np.stack([cx - w / 2, cy - h / 2, w, h], axis=1)
+        kept = np.asarray(cv2.dnn.NMSBoxesBatched(xywh.tolist(), confidences.tolist(), class_ids.tolist(),
+                                                  self.conf, self.iou), dtype=np.int64).reshape(-1)
+        xyxy = np.concatenate([xywh[:, :2], xywh[:, :2] + xywh[:, 2:]], axis=1)
+        return np.column_stack([xyxy[kept], confidences[kept], class_ids[kept]]).astype(np.float32)
+
+    def _check_classes(self, names):
+        """names dari metadata export harus sama dengan CLASS_NAMES agar class_id tetap bermakna."""
+        if names is not None and {int(k): v for k, v in names.items()} != CLASS_NAMES:
+            raise ValueError(f"Model classes in {self.path} do not match CLASS_NAMES: {names}")
+
+
+class OnnxRuntimeDetector(GraphDetector):
+    name = "onnxruntime"
+
+    def __init__(self, path, **kwargs):
+        super().__init__(path, **kwargs)
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.threads:
+            options.intra_op_num_threads = self.threads
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        if isinstance(model_input.shape[0], int):
+            self.batch_size = model_input.shape[0]
+        else:
+            self.batch_size = 16  # Batch dinamis
+        if isinstance(model_input.shape[2], int):
+            self.imgsz = model_input.shape[2]  # Graph statis: ukuran input ditentukan saat export
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self._check_classes(_parse_names(metadata.get("names")))
+
+    def _infer(self, blob):
+        return self.session.run(None, {self.input_name: blob})[0]
+
+
+class OpenVinoDetector(GraphDetector):
+    name = "openvino"
+
+    def __init__(self, path, **kwargs):
+        super().__init__(path, **kwargs)
+        import openvino as ov
+        core = ov.Core()
+        config = {"PERFORMANCE_HINT": "LATENCY"}
+        if self.threads:
+            config["INFERENCE_NUM_THREADS"] = self.threads
+        model = core.read_model(path)
+        shape = model.inputs[0].get_partial_shape()
+        if shape[2].is_static:
+            self.imgsz = shape[2].get_length()
+        self.compiled = core.compile_model(model, "CPU", config)
+        self.output = self.compiled.output(0)
+        # Export ultralytics menulis metadata.yaml di folder model
+        metadata_path = os.path.join(os.path.dirname(path), "metadata.yaml")
+        if os.path.exists(metadata_path):
+            import yaml
+            with open(metadata_path) as f:
+                self._check_classes(yaml.safe_load(f).get("names"))
+
+    def _infer(self, blob):
+        return self.compiled(blob)[self.output]
+
+
+def _parse_names(raw):
+    # Metadata ONNX ultralytics: string repr dict, mis. "{0: 'person', 1: 'ear', ...}"
+    if not raw:
+        return None
+    import ast
+    return ast.literal_eval(raw)
+
+
+_DETECTORS = {"ultralytics": UltralyticsDetector, "onnxruntime": OnnxRuntimeDetector, "openvino": OpenVinoDetector}
+
+def create_detector(backend=PPE_BACKEND, path=PPE_MODEL_PATH, **kwargs):
+    if backend not in _DETECTORS:
+        raise ValueError(f"Unknown PPE backend: {backend} (choose from {', '.join(BACKENDS)})")
+    return _DETECTORS[backend](path, **kwargs)
@@ -0,0 +1,22 @@
+# ppe_classes.py: Kelas model APD, warna overlay, dan aturan kepatuhan (tanpa dependensi berat)
+
+# --- PETA KELAS DAN WARNA ---
+CLASS_NAMES = {
+    0: 'person', 1: 'ear', 2: 'ear-muffs', 3: 'face', 4: 'face-guard',
+    5: 'face-mask', 6: 'foot', 7: 'tool', 8: 'glasses', 9: 'gloves',
+    10: 'helmet', 11: 'hands', 12: 'head', 13: 'coverall', 14: 'shoes',
+    15: 'coverall', 16: 'safety-vest'
+}
+
+COLOR_MAP = {
+    'person': (255, 255, 255), 'ear': (150, 150, 150), 'ear-muffs': (0, 165, 255),
+    'face': (200, 200, 200), 'face-guard': (255, 255, 0), 'face-mask': (235, 206, 135),
+    'foot': (42, 42, 165), 'tool': (255, 0, 255), 'glasses': (255, 0, 0),
+    'gloves': (50, 205, 50), 'helmet': (0, 255, 0), 'hands': (189, 215, 255),
+    'head': (203, 192, 255), 'coverall': (0, 0, 255), 'shoes': (0, 255, 255),
+    'safety-vest': (0, 215, 255)
+}
+
+# --- ATURAN APD ---
+PPE_WAJIB = {'coverall', 'helmet', 'shoes'}
+PPE_OPSIONAL = {'glasses', 'gloves', 'face-mask'}
@@ -0,0 +1,90 @@
+# readiness.py: Inisialisasi berat di latar belakang (schema, galeri, model) + status untuk probe liveness/readiness
+import asyncio
+import os
+import time
+
+READINESS_RETRY_SECONDS = float(os.getenv("READINESS_RETRY_SECONDS", "10"))  # Jeda ulang komponen yang gagal (mis. DB mati)
+
+PROCESS_STARTED = time.time()  # Dimuat paling awal oleh main.py; acuan semua waktu startup
+
+
+class Readiness:
+    """Status per komponen (pending -> loading -> ready / failed) dan waktu-waktu startup sejak PROCESS_STARTED.
+
+    Request auth/CRUD dilayani segera; hanya jalur yang butuh komponen tertentu yang menunggu lewat wait().
+    """
+
+    def __init__(self, components):
+        self.components = {name: {"status": "pending", "ready_s": None, "took_s": None, "error": None}
+                           for name in components}
+        self._events = {name: asyncio.Event() for name in components}
+        self.first_request_s = None
+        self.first_frame_s = None
+
+    @staticmethod
+    def since_start():
+        return round(time.time() - PROCESS_STARTED, 3)
+
+    async def run(self, name, fn, *args, retry_on=()):
+        """Jalankan fn (blocking, lewat to_thread, atau coroutine function) lalu tandai komponen.
+
+        Exception bertipe retry_on diulang tiap READINESS_RETRY_SECONDS; exception lain menandai failed.
+        """
+        component = self.components[name]
+        component["status"] = "loading"
+        started = time.perf_counter()
+        while True:
+            try:
+                if asyncio.iscoroutinefunction(fn):
+                    await fn(*args)
+                else:
+                    await asyncio.to_thread(fn, *args)
+                break
+            except retry_on as e:
+                component["error"] = str(e)
+                print(f"STARTUP: {name} belum siap ({e}), coba lagi dalam {READINESS_RETRY_SECONDS:.0f}s.")
+                await asyncio.sleep(READINESS_RETRY_SECONDS)
+            except Exception as e:
+                component.update(status="failed", error=str(e))
+                print(f"STARTUP ERROR: {name} gagal dimuat: {e}")
+                self._events[name].set()  # Jangan gantung penunggu; mereka lanjut dengan komponen kosong
+                return False
+        component.update(status="ready", error=None, ready_s=self.since_start(),
+                         took_s=round(time.perf_counter() - started, 3))
+        print(f"STARTUP: {name} ready in {component['took_s']:.1f}s ({component['ready_s']:.1f}s after start).")
+        self._events[name].set()
+        return True
+
+    async def wait(self, *names):
+        """Tunggu sampai komponen selesai dimuat (ready atau failed)."""
+        for name in names:
+            await self._events[name].wait()
+
+    def is_ready(self):
+        return all(component["status"] == "ready" for component in self.components.values())
+
+    def mark_first_request(self):
+        if self.first_request_s is None:
+            self.first_request_s = self.since_start()
+            print(f"STARTUP: first request served {self.first_request_s:.2f}s after start.")
+
+    def mark_first_frame(self):
+        if self.first_frame_s is None:
+            self.first_frame_s = self.since_start()
+            print(f"STARTUP: first frame processed {self.first_frame_s:.2f}s after start.")
+
+    def snapshot(self):
+        return {
+            "ready": self.is_ready(),
+            "uptime_s": self.since_start(),
+            "components": self.components,
+            "first_request_s": self.first_request_s,
+            "first_frame_s": self.first_frame_s,
+        }
+
+    def timings(self):
+        """{(phase,): detik sejak start} untuk CallbackGauge; fase yang belum terjadi tidak ditampilkan."""
+        values = {(f"{name}_ready",): component["ready_s"] for name, component in self.components.items()}
+        values[("first_request",)] = self.first_request_s
+        values[("first_frame",)] = self.first_frame_s
+        return values
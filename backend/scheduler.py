@@ -0,0 +1,90 @@
+# scheduler.py: Penjadwal frame adaptif, laju dari latensi terukur + motion gating untuk melewati scene statis
+import os
+import time
+import cv2
+
+from metrics import FRAMES
+
+SCHED_TARGET_FPS = float(os.getenv("SCHED_TARGET_FPS", "10"))
+SCHED_MOTION_THRESHOLD = float(os.getenv("SCHED_MOTION_THRESHOLD", "2.0"))  # Rata-rata selisih piksel (0-255)
+SCHED_MAX_SKIP_SECONDS = float(os.getenv("SCHED_MAX_SKIP_SECONDS", "2.0"))  # Paksa proses setidaknya sekali per interval ini
+_MOTION_SIZE = (64, 36)
+
+
+class FrameScheduler:
+    """Menentukan frame mana yang diproses dan berapa lama menunggu setelahnya.
+
+    - Frame basi dibuang oleh pembaca stream; jumlahnya dicatat lewat frame_read(dropped).
+    - should_process() melewati YOLO/wajah bila selisih thumbnail abu-abu terhadap frame terakhir
+      yang diproses di bawah motion_threshold, kecuali sudah max_skip_seconds tanpa proses.
+    - delay(elapsed) memberi sisa periode 1/effective_fps() setelah dikurangi waktu proses frame ini. Periodenya
+      max(1/target_fps, latensi EMA): bila pipeline lebih lambat dari target, laju mengikuti latensi terukur
+      (satu frame cepat di antara frame lambat tidak langsung disusul frame berikutnya).
+    source (mis. "camera:0", "cctv:3") menjadi label counter ppe_frames_total; None = tidak dicatat.
+    """
+
+    def __init__(self, target_fps=SCHED_TARGET_FPS, motion_threshold=SCHED_MOTION_THRESHOLD,
+                 max_skip_seconds=SCHED_MAX_SKIP_SECONDS, source=None):
+        self.source = source
+        self.target_fps = target_fps
+        self.motion_threshold = motion_threshold
+        self.max_skip_seconds = max_skip_seconds
+        self.processed = 0
+        self.skipped = 0
+        self.dropped = 0
+        self.latency = None  # EMA detik per frame yang diproses
+        self._reference = None
+        self._last_processed_at = 0.0
+
+    def frame_read(self, dropped=0):
+        dropped = max(dropped, 0)
+        self.dropped += dropped
+        if self.source is not None:
+            FRAMES.inc(source=self.source, result="captured")
+            if dropped:
+                FRAMES.inc(dropped, source=self.source, result="dropped")
+
+    def _thumbnail(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(gray, _MOTION_SIZE, interpolation=cv2.INTER_AREA)
+
+    def should_process(self, frame):
+        thumbnail = self._thumbnail(frame)
+        now = time.monotonic()
+        if (self._reference is None or self.motion_threshold <= 0
+                or now - self._last_processed_at >= self.max_skip_seconds
+                or cv2.absdiff(thumbnail, self._reference).mean() >= self.motion_threshold):
+            self._reference = thumbnail
+            self._last_processed_at = now
+            return True
+        self.record_skipped()
+        return False
+
+    def record_skipped(self, count=1):
+        self.skipped += count
+        if self.source is not None and count:
+            FRAMES.inc(count, source=self.source, result="skipped")
+
+    def record_latency(self, seconds):
+        self.processed += 1
+        if self.source is not None:
+            FRAMES.inc(source=self.source, result="processed")
+        self.latency = seconds if self.latency is None else 0.8 * self.latency + 0.2 * seconds
+
+    def delay(self, elapsed=0.0):
+        return max(1.0 / self.effective_fps() - elapsed, 0.0)
+
+    def effective_fps(self):
+        if not self.latency:
+            return self.target_fps
+        return min(self.target_fps, 1.0 / self.latency)
+
+    def stats(self):
+        return {
+            "processed": self.processed,
+            "skipped": self.skipped,
+            "dropped": self.dropped,
+            "latency_ms": round(self.latency * 1000, 1) if self.latency else None,
+            "effective_fps": round(self.effective_fps(), 2),
+            "target_fps": self.target_fps,
+        }
@@ -0,0 +1,22 @@
+# schema.py: Perubahan skema idempoten yang dijalankan saat startup (index, tabel tambahan)
+from database import db_cursor
+from analytics import ROLLUP_TABLE
+
+TABLES = [ROLLUP_TABLE]
+
+# (tabel, nama index, kolom)
+INDEXES = [
+    ("gate_logs", "idx_gate_logs_ts_id", "timestamp_in, log_id"),  # Keyset pagination /api/logs
+]
+
+def ensure_schema():
+    with db_cursor() as cursor:
+        for ddl in TABLES:
+            cursor.execute(ddl)
+        for table, name, columns in INDEXES:
+            cursor.execute(
+                "SELECT COUNT(*) FROM information_schema.statistics "
+                "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s", (table, name))
+            if cursor.fetchone()[0] == 0:
+                cursor.execute(f"CREATE INDEX {name} ON {table} ({columns})")
+                print(f"SCHEMA: created index {name} on {table}.")
@@ -0,0 +1,156 @@
+# streams.py: Ingest banyak CCTV (tabel cctv_streams) dengan inferensi YOLO batch, hasil dirutekan per kamera
+import asyncio
+import os
+import time
+from urllib.parse import quote
+
+from pipeline import Subscription, StreamReader
+from scheduler import FrameScheduler
+from transport import FramePacket
+
+CCTV_BATCH_SIZE = int(os.getenv("CCTV_BATCH_SIZE", "8"))  # Jumlah kamera maksimum per panggilan YOLO
+CCTV_RTSP_PATH = os.getenv("CCTV_RTSP_PATH", "/")  # Path RTSP setelah host:port, tergantung merek kamera
+CCTV_RETRY_SECONDS = float(os.getenv("CCTV_RETRY_SECONDS", "10"))  # Jeda ulang membaca cctv_streams bila gagal (DB mati)
+
+def stream_url(cctv):
+    """URL yang dibuka OpenCV untuk satu baris cctv_streams.
+
+    ip_address berupa URL lengkap atau path file video lokal dipakai apa adanya (berguna untuk pengujian).
+    """
+    address = cctv['ip_address']
+    if "://" in address or os.path.exists(address):
+        return address
+    credentials = ""
+    if cctv.get('username'):
+        credentials = f"{quote(cctv['username'], safe='')}:{quote(cctv.get('password') or '', safe='')}@"
+    port = f":{cctv['port']}" if cctv.get('port') else ""
+    return f"rtsp://{credentials}{address}{port}{CCTV_RTSP_PATH}"
+
+
+class MultiStreamService:
+    """Satu loop untuk semua CCTV terdaftar: kumpulkan frame terbaru tiap kamera, YOLO sekali per batch,
+    lalu pengenalan/kepatuhan per kamera dengan state (tracker, cctv_id) masing-masing.
+
+    load_streams() -> baris cctv_streams; detect_frames(frames) -> [(detections, timing), ...];
+    recognize_frame(frame, detections, state, timing) -> (annotated_frame, response_data).
+    Berjalan sejak start() (startup server) untuk semua kamera terdaftar, ditonton atau tidak, agar gate_logs
+    tercatat di setiap kamera; subscriber hanya menentukan kamera mana yang hasilnya dipublikasikan (dan di-encode).
+    Setiap kamera punya FrameScheduler sendiri untuk motion gating dan penghitung; laju loop mengikuti latensi
+    satu putaran batch.
+    """
+
+    def __init__(self, load_streams, detect_frames, recognize_frame, batch_size=CCTV_BATCH_SIZE):
+        self.load_streams = load_streams
+        self.detect_frames = detect_frames
+        self.recognize_frame = recognize_frame
+        self.batch_size = batch_size
+        self.pacer = FrameScheduler()
+        self.subscribers = {}  # cctv_id -> set(Subscription)
+        self.readers = {}
+        self.schedulers = {}
+        self._reload = True
+        self._task = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def subscribe(self, cctv_id):
+        sub = Subscription()
+        self.subscribers.setdefault(cctv_id, set()).add(sub)
+        self.start()  # Biasanya sudah jalan sejak startup
+        if not self._reload and cctv_id not in self.readers:
+            sub.publish(None)  # Kamera tidak terdaftar
+        return sub
+
+    def unsubscribe(self, cctv_id, sub):
+        # Ingest tetap jalan tanpa penonton; hanya publikasi ke kamera ini yang berhenti
+        self.subscribers.get(cctv_id, set()).discard(sub)
+
+    def stats(self):
+        return {cctv_id: scheduler.stats() for cctv_id, scheduler in self.schedulers.items()}
+
+    def reload(self):
+        """Baca ulang cctv_streams pada iterasi berikutnya (mis. setelah kamera ditambahkan)."""
+        self._reload = True
+
+    def _publish(self, cctv_id, packet):
+        for sub in list(self.subscribers.get(cctv_id, ())):
+            sub.publish(packet)
+
+    async def _sync_readers(self, states):
+        streams = {row['id']: row for row in await asyncio.to_thread(self.load_streams)}
+        for cctv_id in list(self.readers):
+            if cctv_id not in streams:
+                self.readers.pop(cctv_id).stop()
+                self._publish(cctv_id, None)
+        for cctv_id, row in streams.items():
+            if cctv_id not in self.readers:
+                self.readers[cctv_id] = StreamReader(cctv_id, stream_url(row))
+                self.readers[cctv_id].start()
+                states[cctv_id] = {"cctv_id": cctv_id, "seq": 0, "published": 0}  # seq = cursor StreamReader
+                self.schedulers.setdefault(cctv_id, FrameScheduler(source=f"cctv:{cctv_id}"))
+        for cctv_id in self.subscribers:
+            if cctv_id not in self.readers:
+                self._publish(cctv_id, None)  # Kamera tidak terdaftar
+        self._reload = False
+
+    async def _process_batch(self, batch, states):
+        results = await self.detect_frames([frame for _, frame in batch])
+        outputs = await asyncio.gather(*(
+            self.recognize_frame(frame, detections, states[cctv_id], timing)
+            for (cctv_id, frame), (detections, timing) in zip(batch, results)))
+        for (cctv_id, _), (frame, response_data) in zip(batch, outputs):
+            state = states[cctv_id]
+            state["published"] += 1  # Nomor paket sendiri; "seq" tetap cursor reader
+            if self.subscribers.get(cctv_id):  # Deteksi & log jalan untuk semua kamera; encode hanya bila ditonton
+                response_data["cctv_id"] = cctv_id
+                self._publish(cctv_id, FramePacket(state["published"], frame, response_data))
+
+    async def _run(self):
+        states = {}
+        try:
+            while True:
+                if self._reload:
+                    try:
+                        await self._sync_readers(states)
+                    except Exception as e:
+                        print(f"CCTV: gagal membaca cctv_streams: {e}; coba lagi {CCTV_RETRY_SECONDS:g}s")
+                        await asyncio.sleep(CCTV_RETRY_SECONDS)
+                        continue
+
+                fresh = []
+                for cctv_id, reader in self.readers.items():
+                    item = reader.latest(states[cctv_id]["seq"])
+                    if item is not None:
+                        self.schedulers[cctv_id].frame_read(item[0] - states[cctv_id]["seq"] - 1)
+                        states[cctv_id]["seq"], frame = item
+                        fresh.append((cctv_id, frame))
+
+                # Hanya kamera yang scene-nya berubah (atau sudah terlalu lama dilewati) masuk batch
+                ready = await asyncio.to_thread(
+                    lambda: [(cctv_id, frame) for cctv_id, frame in fresh
+                             if self.schedulers[cctv_id].should_process(frame)])
+
+                started = time.perf_counter()
+                for start in range(0, len(ready), self.batch_size):
+                    await self._process_batch(ready[start:start + self.batch_size], states)
+                elapsed = time.perf_counter() - started
+                for cctv_id, _ in ready:
+                    self.schedulers[cctv_id].record_latency(elapsed)
+                if ready:
+                    self.pacer.record_latency(elapsed)
+
+                await asyncio.sleep(self.pacer.delay(elapsed))
+        finally:
+            for reader in self.readers.values():
+                reader.stop()
+            self.readers = {}
+            self._reload = True
+            for cctv_id in list(self.subscribers):
+                self._publish(cctv_id, None)
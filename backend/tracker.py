@@ -0,0 +1,103 @@
+# tracker.py: Pelacakan wajah antar frame (IoU) agar encoding + matching hanya jalan untuk track baru/basi
+import itertools
+import os
+import numpy as np
+
+TRACK_IOU_THRESHOLD = 0.3  # IoU minimum agar wajah dianggap track yang sama
+TRACK_REENCODE_EVERY = int(os.getenv("TRACK_REENCODE_EVERY", "15"))  # Encode ulang paling lambat tiap N frame
+TRACK_MIN_CONFIDENCE = 0.6  # Encode ulang bila keyakinan track (produk IoU sejak encode terakhir) di bawah ini
+TRACK_MAX_MISSES = 5  # Track dibuang setelah N frame tanpa wajah yang cocok
+
+def iou_matrix(a, b):
+    """IoU (len(a), len(b)) antar box format face_recognition (top, right, bottom, left)."""
+    a = np.asarray(a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float32).reshape(-1, 4)
+    top = np.maximum(a[:, None, 0], b[None, :, 0])
+    right = np.minimum(a[:, None, 1], b[None, :, 1])
+    bottom = np.minimum(a[:, None, 2], b[None, :, 2])
+    left = np.maximum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(bottom - top, 0, None) * np.clip(right - left, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 1] - a[:, 3])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 1] - b[:, 3])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+class FaceTrack:
+    _ids = itertools.count(1)
+
+    def __init__(self, location):
+        self.track_id = next(FaceTrack._ids)
+        self.location = location
+        self.user_info = None
+        self.distance = None
+        self.encoded = False
+        self.frames_since_encode = 0
+        self.confidence = 0.0
+        self.misses = 0
+
+
+class FaceTracker:
+    """Membawa identitas wajah dari frame ke frame dengan pencocokan IoU greedy."""
+
+    def __init__(self, iou_threshold=TRACK_IOU_THRESHOLD, reencode_every=TRACK_REENCODE_EVERY,
+                 min_confidence=TRACK_MIN_CONFIDENCE, max_misses=TRACK_MAX_MISSES):
+        self.iou_threshold = iou_threshold
+        self.reencode_every = reencode_every
+        self.min_confidence = min_confidence
+        self.max_misses = max_misses
+        self.tracks = []
+        self.frame_tracks = []  # Track untuk setiap lokasi wajah di frame terakhir (urutan sama)
+
+    def update(self, face_locations):
+        """Cocokkan lokasi wajah frame ini ke track yang ada. Mengembalikan index wajah yang perlu di-encode."""
+        ious = iou_matrix([t.location for t in self.tracks], face_locations)
+        assigned = [None] * len(face_locations)
+        used = set()
+        if ious.size:
+            for flat in np.argsort(ious, axis=None)[::-1]:
+                ti, fi = divmod(int(flat), len(face_locations))
+                if ious[ti, fi] < self.iou_threshold:
+                    break
+                if ti in used or assigned[fi] is not None:
+                    continue
+                track = self.tracks[ti]
+                track.location = face_locations[fi]
+                track.confidence *= float(ious[ti, fi])
+                track.frames_since_encode += 1
+                track.misses = 0
+                assigned[fi] = track
+                used.add(ti)
+
+        for ti, track in enumerate(self.tracks):
+            if ti not in used:
+                track.misses += 1
+        self.tracks = [t for t in self.tracks if t.misses <= self.max_misses]
+
+        for fi, location in enumerate(face_locations):
+            if assigned[fi] is None:
+                assigned[fi] = FaceTrack(location)
+                self.tracks.append(assigned[fi])
+        self.frame_tracks = assigned
+
+        return [fi for fi, track in enumerate(assigned) if self._needs_encode(track)]
+
+    def _needs_encode(self, track):
+        if not track.encoded or track.frames_since_encode >= self.reencode_every:
+            return True
+        # Wajah tak dikenal hanya dicoba ulang sesuai jadwal, bukan tiap frame
+        return track.user_info is not None and track.confidence < self.min_confidence
+
+    def identify(self, face_indices, matches):
+        """Simpan hasil FaceGallery.match() untuk wajah yang baru di-encode."""
+        for fi, (user_info, distance) in zip(face_indices, matches):
+            track = self.frame_tracks[fi]
+            track.user_info = user_info
+            track.distance = distance
+            track.encoded = True
+            track.frames_since_encode = 0
+            track.confidence = 1.0
+
+    def faces(self):
+        """[(location, user_info atau None), ...] untuk frame terakhir."""
+        return [(track.location, track.user_info) for track in self.frame_tracks]
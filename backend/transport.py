@@ -0,0 +1,123 @@
+# transport.py: Paket frame bersama untuk semua subscriber + format pesan websocket (legacy / framed / overlay)
+import asyncio
+import json
+import struct
+import threading
+
+import cv2
+
+from metrics import STAGE_SECONDS
+
+TRANSPORT_MODES = ("legacy", "framed", "overlay")
+DEFAULT_JPEG_QUALITY = 95  # Sama dengan default cv2.imencode
+
+# Header pesan framed: versi, flags, seq, panjang JSON (big-endian), lalu JSON utf-8, lalu JPEG
+FRAME_HEADER = struct.Struct(">BBII")
+FRAME_VERSION = 1
+FLAG_IMAGE = 1
+FLAG_ANNOTATED = 2
+
+
+def draw_overlay(frame, overlay):
+    """Gambar kotak APD dan label wajah dari response_data["overlay"] ke frame (in-place)."""
+    for item in overlay.get("boxes", []):
+        x1, y1, x2, y2 = item["box"]
+        color = tuple(int(item["color"][i:i + 2], 16) for i in (5, 3, 1))  # "#rrggbb" -> BGR
+        cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+        cv2.putText(frame, item["label"], (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+    for item in overlay.get("faces", []):
+        left, top = item["at"]
+        cv2.putText(frame, item["text"], (left, top - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+    return frame
+
+
+class FramePacket:
+    """Satu hasil analisis yang dibagikan ke semua subscriber.
+
+    Frame mentah disimpan sekali; anotasi dan setiap varian JPEG (lebar, kualitas, beranotasi)
+    dibuat saat pertama diminta lalu di-cache, sehingga client dengan setelan sama tidak meng-encode ulang.
+    """
+
+    def __init__(self, seq, frame, data):
+        self.seq = seq
+        self.frame = frame
+        self.data = data
+        self._annotated = None
+        self._jpegs = {}
+        self._lock = threading.Lock()
+
+    def annotated(self):
+        if self._annotated is None:
+            self._annotated = draw_overlay(self.frame.copy(), self.data.get("overlay", {}))
+        return self._annotated
+
+    def jpeg(self, width=None, quality=DEFAULT_JPEG_QUALITY, annotated=True):
+        """JPEG bytes; width None/0 = resolusi asli, frame tidak pernah diperbesar. Blocking: panggil via to_thread."""
+        height, full_width = self.frame.shape[:2]
+        if not width or width >= full_width:
+            width = full_width
+        key = (width, quality, annotated)
+        with self._lock:
+            if key not in self._jpegs:
+                with STAGE_SECONDS.time(stage="jpeg_encode"):  # Hanya cache miss; client lain memakai hasil yang sama
+                    image = self.annotated() if annotated else self.frame
+                    if width != full_width:
+                        image = cv2.resize(image, (width, round(height * width / full_width)), interpolation=cv2.INTER_AREA)
+                    _, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+                    self._jpegs[key] = buffer.tobytes()
+            return self._jpegs[key]
+
+
+def pack_frame(seq, data, jpeg_bytes=None, annotated=True):
+    """Satu pesan biner: header + JSON metadata + JPEG opsional."""
+    meta = json.dumps(data, default=str).encode()
+    flags = (FLAG_IMAGE if jpeg_bytes is not None else 0) | (FLAG_ANNOTATED if annotated else 0)
+    return FRAME_HEADER.pack(FRAME_VERSION, flags, seq & 0xFFFFFFFF, len(meta)) + meta + (jpeg_bytes or b"")
+
+
+def unpack_frame(message):
+    """Kebalikan pack_frame (untuk client Python/benchmark): (seq, data, jpeg_bytes atau None, annotated)."""
+    version, flags, seq, meta_len = FRAME_HEADER.unpack_from(message)
+    if version != FRAME_VERSION:
+        raise ValueError(f"Unsupported frame version: {version}")
+    start = FRAME_HEADER.size
+    data = json.loads(message[start:start + meta_len])
+    jpeg_bytes = bytes(message[start + meta_len:]) if flags & FLAG_IMAGE else None
+    return seq, data, jpeg_bytes, bool(flags & FLAG_ANNOTATED)
+
+
+class TransportOptions:
+    """Setelan per client dari query string websocket: ?mode=framed&width=640&quality=60."""
+
+    def __init__(self, mode="legacy", width=None, quality=DEFAULT_JPEG_QUALITY):
+        if mode not in TRANSPORT_MODES:
+            raise ValueError(f"mode must be one of {', '.join(TRANSPORT_MODES)}")
+        if not 1 <= quality <= 100:
+            raise ValueError("quality must be between 1 and 100")
+        if width is not None and width < 0:
+            raise ValueError("width must be positive")
+        self.mode = mode
+        self.width = width
+        self.quality = quality
+
+    @classmethod
+    def from_query(cls, params):
+        width = params.get("width")
+        return cls(params.get("mode", "legacy"), int(width) if width else None,
+                   int(params.get("quality", DEFAULT_JPEG_QUALITY)))
+
+    async def send(self, websocket, packet):
+        annotated = self.mode != "overlay"
+        jpeg_bytes = await asyncio.to_thread(packet.jpeg, self.width, self.quality, annotated)
+        data = {key: value for key, value in packet.data.items() if key != "overlay"}
+        if self.mode == "overlay":
+            # Koordinat overlay dalam resolusi asli; client menskalakan ke ukuran gambar yang diterima
+            height, width = packet.frame.shape[:2]
+            data.update(overlay=packet.data.get("overlay", {}), frame_size=[width, height])
+        with STAGE_SECONDS.time(stage="ws_send"):  # Termasuk tekanan balik dari koneksi client yang lambat
+            if self.mode == "legacy":
+                # Format lama: dua pesan terpisah, frame lalu JSON
+                await websocket.send_bytes(jpeg_bytes)
+                await websocket.send_json(data)
+            else:
+                await websocket.send_bytes(pack_frame(packet.seq, data, jpeg_bytes, annotated))
@@ -0,0 +1,395 @@
+# workers.py: Mode PIPELINE_MODE=workers, capture + inferensi per kamera di proses terpisah (bebas GIL proses API)
+# Frame lewat ring buffer shared memory (tanpa pickle); hasil deteksi kecil kembali lewat multiprocessing.Queue.
+#
+#   proses capture --(ring kamera)--> N proses inferensi --(ring output per worker + Queue hasil)--> proses API
+#
+# Proses API hanya mencocokkan encoding ke galeri, menilai kepatuhan, menulis log, dan encode JPEG untuk client.
+import asyncio
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from metrics import STAGE_SECONDS
+from pipeline import Subscription, StreamReader
+from scheduler import FrameScheduler, SCHED_TARGET_FPS
+from transport import FramePacket
+
+PIPELINE_MODE = os.getenv("PIPELINE_MODE", "inprocess")  # "inprocess" (thread/executor) atau "workers" (proses per kamera)
+WORKERS_PER_CAMERA = int(os.getenv("WORKERS_PER_CAMERA", "1"))  # Proses inferensi per kamera; frame dibagi bergiliran
+FRAME_RING_SLOTS = int(os.getenv("FRAME_RING_SLOTS", "4"))
+FRAME_SLOT_BYTES = int(os.getenv("FRAME_SLOT_BYTES", str(1920 * 1080 * 3)))  # Frame lebih besar diperkecil saat capture
+WORKER_RESULT_QUEUE = 8  # Hasil per worker yang boleh menunggu proses API; lebih dari itu frame dibuang di worker
+
+PIPELINE_MODES = ("inprocess", "workers")
+
+_HEADER_WORDS = 2  # [seq terakhir yang ditulis, cadangan]
+_SLOT_WORDS = 4  # [seq (-1 = sedang ditulis), tinggi, lebar, kanal]
+
+
+class SharedFrameRing:
+    """Ring buffer frame di multiprocessing.shared_memory dengan satu penulis dan banyak pembaca.
+
+    Setiap slot punya seq: penulis mengisinya -1 sebelum menyalin dan seq baru sesudahnya; pembaca menyalin
+    lalu memeriksa seq lagi (seqlock), sehingga frame yang tertimpa di tengah salinan dibuang, bukan dipakai.
+    """
+
+    def __init__(self, shm, slots, slot_bytes, owner):
+        self.shm = shm
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.owner = owner
+        meta_bytes = (_HEADER_WORDS + slots * _SLOT_WORDS) * 8
+        self._header = np.ndarray(_HEADER_WORDS, dtype=np.int64, buffer=shm.buf)
+        self._meta = np.ndarray((slots, _SLOT_WORDS), dtype=np.int64, buffer=shm.buf, offset=_HEADER_WORDS * 8)
+        self._data = np.ndarray((slots, slot_bytes), dtype=np.uint8, buffer=shm.buf, offset=meta_bytes)
+
+    @classmethod
+    def create(cls, slots=FRAME_RING_SLOTS, slot_bytes=FRAME_SLOT_BYTES):
+        size = (_HEADER_WORDS + slots * _SLOT_WORDS) * 8 + slots * slot_bytes
+        ring = cls(shared_memory.SharedMemory(create=True, size=size), slots, slot_bytes, owner=True)
+        ring._header[:] = 0
+        ring._meta[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name, slots=FRAME_RING_SLOTS, slot_bytes=FRAME_SLOT_BYTES):
+        return cls(shared_memory.SharedMemory(name=name), slots, slot_bytes, owner=False)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def latest_seq(self):
+        return int(self._header[0])
+
+    def fit(self, frame):
+        """Perkecil frame (rasio tetap) bila tidak muat di satu slot."""
+        if frame.nbytes <= self.slot_bytes:
+            return frame
+        scale = (self.slot_bytes / frame.nbytes) ** 0.5
+        height, width = frame.shape[:2]
+        return cv2.resize(frame, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+
+    def write(self, frame):
+        """Salin frame ke slot berikutnya (hanya satu proses penulis per ring). Returns seq frame ini."""
+        frame = np.ascontiguousarray(self.fit(frame))
+        seq = self.latest_seq() + 1
+        slot = seq % self.slots
+        height, width = frame.shape[:2]
+        channels = frame.shape[2] if frame.ndim == 3 else 1
+        self._meta[slot, 0] = -1
+        self._data[slot, :frame.nbytes] = frame.reshape(-1)
+        self._meta[slot, 1:] = (height, width, channels)
+        self._meta[slot, 0] = seq
+        self._header[0] = seq
+        return seq
+
+    def read(self, seq):
+        """Salinan frame seq, atau None bila slot sudah ditimpa frame yang lebih baru."""
+        slot = seq % self.slots
+        if self._meta[slot, 0] != seq:
+            return None
+        height, width, channels = (int(v) for v in self._meta[slot, 1:])
+        frame = self._data[slot, :height * width * channels].reshape(height, width, channels).copy()
+        if self._meta[slot, 0] != seq:
+            return None
+        return frame
+
+    def close(self):
+        # View numpy harus dilepas dulu; SharedMemory.close() gagal bila buffer masih direferensikan
+        self._header = self._meta = self._data = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def claim_latest(ring, claimed):
+    """Ambil frame terbaru yang belum diambil worker lain. Returns (seq, jumlah frame yang terlewati) atau None."""
+    with claimed.get_lock():
+        latest = ring.latest_seq()
+        if latest <= claimed.value:
+            return None
+        dropped = latest - claimed.value - 1 if claimed.value else 0
+        claimed.value = latest
+    return latest, dropped
+
+
+# --- Proses anak (spawn): import berat terjadi di sini, bukan di proses API ---
+def capture_main(name, url, ring_name, stop):
+    """Proses capture: StreamReader (reconnect, file diputar ulang) menulis setiap frame ke ring kamera."""
+    ring = SharedFrameRing.attach(ring_name)
+    reader = StreamReader(name, url, on_frame=ring.write)
+    reader.start()
+    try:
+        stop.wait()
+    finally:
+        reader.stop()
+        reader.join(timeout=5)
+        ring.close()
+
+def inference_main(index, workers, ring_name, out_name, claimed, results, stop):
+    """Proses inferensi: YOLO, lokasi wajah, tracker, encoding wajah baru/basi. Frame hasil ditulis ke ring output."""
+    from detection import get_ppe_model, locate_faces, locate_faces_in_regions, encode_faces_at
+    from face_regions import FaceLocator
+    from tracker import FaceTracker
+
+    ring = SharedFrameRing.attach(ring_name)
+    out = SharedFrameRing.attach(out_name)
+    model = get_ppe_model()
+    tracker = FaceTracker()
+    locator = FaceLocator()
+    # Laju per worker = target kamera / jumlah worker; motion gating terhadap frame terakhir worker ini
+    scheduler = FrameScheduler(target_fps=SCHED_TARGET_FPS / workers)
+    dropped = skipped = 0
+    try:
+        while not stop.is_set():
+            claim = claim_latest(ring, claimed)
+            if claim is None:
+                stop.wait(0.002)
+                continue
+            seq, missed = claim
+            dropped += missed
+            frame = ring.read(seq)
+            if frame is None:
+                dropped += 1
+                continue
+            if not scheduler.should_process(frame):
+                skipped += 1
+                stop.wait(scheduler.delay())
+                continue
+
+            started = time.perf_counter()
+            boxes = model.detect([frame])[0]
+            t_yolo = time.perf_counter()
+            regions = locator.plan(boxes, frame.shape)
+            if regions is None:
+                face_locations, locate_stage = locate_faces(frame), "locate_faces"
+            else:
+                face_locations = locate_faces_in_regions(frame, regions) if len(regions) else []
+                locate_stage = "locate_faces_in_regions"
+            t_locate = time.perf_counter()
+            stale = tracker.update(face_locations)
+            encodings = encode_faces_at(frame, [face_locations[i] for i in stale])
+            # Identitas dicocokkan di proses API; di sini track dianggap dikenal agar re-encode saat IoU turun tetap jalan
+            tracker.identify(stale, [(True, None)] * len(stale))
+            t_encode = time.perf_counter()
+
+            result = {
+                "worker": index, "seq": seq, "out_seq": out.write(frame), "boxes": boxes,
+                "faces": [(location, track.track_id) for location, track in zip(face_locations, tracker.frame_tracks)],
+                "encoded": {tracker.frame_tracks[i].track_id: encoding for i, encoding in zip(stale, encodings)},
+                "live": [track.track_id for track in tracker.tracks],
+                "stages": {"detect_batch": t_yolo - started, locate_stage: t_locate - t_yolo,
+                           "encode_faces_at": t_encode - t_locate},
+                "dropped": dropped, "skipped": skipped,
+            }
+            try:
+                results.put_nowait(result)
+                dropped = skipped = 0
+            except queue.Full:
+                dropped += 1  # Proses API tertinggal; frame ini tidak dipublikasikan
+            stop.wait(scheduler.delay(time.perf_counter() - started))
+    finally:
+        ring.close()
+        out.close()
+
+
+class ProcessPipeline:
+    """Pengganti CameraPipeline untuk satu sumber dengan capture + WORKERS_PER_CAMERA proses inferensi.
+
+    resolve_url: async () -> URL/indeks kamera atau None (sumber tidak ada).
+    finish: async (frame, result, state) -> (frame, response_data); pencocokan galeri + kepatuhan di proses API.
+    initial_state: isi awal state per kamera, mis. {"cctv_id": ...} agar gate_logs dan response membawa id CCTV.
+    Proses anak hidup selama ada subscriber (seperti CameraPipeline) atau selama always_on (CCTV terdaftar).
+    """
+
+    def __init__(self, name, resolve_url, finish, workers=WORKERS_PER_CAMERA, initial_state=None):
+        self.name = name
+        self.initial_state = dict(initial_state or {})
+        self.always_on = False
+        self.resolve_url = resolve_url
+        self.finish = finish
+        self.workers = workers
+        self.subscribers = set()
+        # target_fps tidak dipakai untuk pacing di sini; latency = jarak antar hasil sehingga effective_fps = throughput
+        self.scheduler = FrameScheduler(target_fps=SCHED_TARGET_FPS, source=name)
+        self.last_timing = None
+        self._task = None
+
+    def _start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def _stop_if_idle(self):
+        if not self.subscribers and not self.always_on and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def set_always_on(self, on):
+        """Tetap jalan tanpa subscriber (ingest + log kepatuhan), mis. untuk semua CCTV terdaftar."""
+        self.always_on = on
+        self._start() if on else self._stop_if_idle()
+
+    def subscribe(self):
+        sub = Subscription()
+        self.subscribers.add(sub)
+        self._start()
+        return sub
+
+    def unsubscribe(self, sub):
+        self.subscribers.discard(sub)
+        self._stop_if_idle()
+
+    def _publish(self, packet):
+        for sub in list(self.subscribers):
+            sub.publish(packet)
+
+    async def _run(self):
+        url = await self.resolve_url()
+        if url is None:
+            self._publish(None)
+            return
+        ctx = multiprocessing.get_context("spawn")
+        ring = SharedFrameRing.create()
+        outs = [SharedFrameRing.create() for _ in range(self.workers)]
+        stop = ctx.Event()
+        claimed = ctx.Value("q", 0)
+        results = ctx.Queue(maxsize=WORKER_RESULT_QUEUE * self.workers)
+        processes = [ctx.Process(target=capture_main, args=(self.name, url, ring.name, stop),
+                                 name=f"capture-{self.name}", daemon=True)]
+        processes += [ctx.Process(target=inference_main, args=(i, self.workers, ring.name, outs[i].name, claimed,
+                                                               results, stop),
+                                  name=f"inference-{self.name}-{i}", daemon=True) for i in range(self.workers)]
+        for process in processes:
+            process.start()
+
+        # Queue multiprocessing blocking: dibaca thread sendiri lalu diteruskan ke event loop
+        loop = asyncio.get_running_loop()
+        inbox = asyncio.Queue()
+        reader = threading.Thread(target=self._drain, args=(results, stop, loop, inbox),
+                                  name=f"results-{self.name}", daemon=True)
+        reader.start()
+
+        state = dict(self.initial_state)
+        published = last_seq = 0
+        last_result_at = None
+        try:
+            while self.subscribers or self.always_on:
+                try:
+                    result = await asyncio.wait_for(inbox.get(), timeout=5)
+                except asyncio.TimeoutError:
+                    if not any(p.is_alive() for p in processes[1:]):
+                        print(f"{self.name}: semua proses inferensi berhenti.")
+                        break
+                    continue
+                frame = outs[result["worker"]].read(result["out_seq"])
+                self.scheduler.frame_read(result["dropped"])
+                self.scheduler.record_skipped(result["skipped"])  # Motion gating terjadi di worker
+                for stage, seconds in result["stages"].items():
+                    STAGE_SECONDS.observe(seconds, stage=stage)
+                if frame is None:
+                    continue  # Ring output worker sudah ditimpa; proses API terlalu tertinggal
+
+                frame, response_data = await self.finish(frame, result, state)
+                now = time.perf_counter()
+                if last_result_at is not None:
+                    self.scheduler.record_latency(now - last_result_at)
+                last_result_at = now
+                self.last_timing = response_data.get("timing")
+                if result["seq"] > last_seq:  # Worker lain bisa selesai lebih dulu untuk frame yang lebih baru
+                    last_seq = result["seq"]
+                    published += 1
+                    self._publish(FramePacket(published, frame, response_data))
+        finally:
+            stop.set()
+            await asyncio.to_thread(self._shutdown, processes, reader, results)
+            ring.close()
+            for out in outs:
+                out.close()
+            self._publish(None)
+
+    @staticmethod
+    def _drain(results, stop, loop, inbox):
+        while not stop.is_set():
+            try:
+                result = results.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+            loop.call_soon_threadsafe(inbox.put_nowait, result)
+
+    @staticmethod
+    def _shutdown(processes, reader, results):
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        reader.join(timeout=1)
+        results.cancel_join_thread()
+        results.close()
+
+
+class ProcessHub:
+    """Registry ProcessPipeline per kunci sumber; antarmuka sama dengan PipelineHub/MultiStreamService.
+
+    load_keys: async () -> kunci yang harus selalu jalan (CCTV terdaftar), dibaca saat start() dan reload().
+    """
+
+    def __init__(self, create, load_keys=None):
+        self.create = create  # key -> ProcessPipeline
+        self.load_keys = load_keys
+        self.pipelines = {}
+        self._started = False
+
+    def get(self, key):
+        if key not in self.pipelines:
+            self.pipelines[key] = self.create(key)
+        return self.pipelines[key]
+
+    # Antarmuka MultiStreamService untuk /ws/cctv
+    def subscribe(self, key):
+        return self.get(key).subscribe()
+
+    def unsubscribe(self, key, sub):
+        self.get(key).unsubscribe(sub)
+
+    @property
+    def schedulers(self):
+        return {key: pipeline.scheduler for key, pipeline in self.pipelines.items()}
+
+    def stats(self):
+        return {key: pipeline.scheduler.stats() for key, pipeline in self.pipelines.items()}
+
+    def start(self):
+        self._started = True
+        self.reload()
+
+    def stop(self):
+        self._started = False
+        for pipeline in self.pipelines.values():
+            pipeline.set_always_on(False)
+
+    def reload(self):
+        # URL dibaca ulang saat pipeline mulai lagi; pipeline yang sedang jalan tidak diubah
+        if self._started and self.load_keys is not None:
+            asyncio.create_task(self._sync())
+
+    async def _sync(self):
+        try:
+            keys = set(await self.load_keys())
+        except Exception as e:
+            print(f"Gagal membaca daftar sumber: {e}")
+            return
+        for key, pipeline in list(self.pipelines.items()):
+            if key not in keys:
+                pipeline.set_always_on(False)
+        for key in keys:
+            self.get(key).set_always_on(True)
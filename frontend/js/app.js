@@ -12,6 +12,70 @@ document.addEventListener("DOMContentLoaded", function() {
     // --- Variabel Global untuk Elemen & Status ---
     let dashboardWs = null;
     let enrollWs = null;
+
+    // --- Transport frame: satu pesan biner (header + JSON + JPEG) per frame ---
+    // feedMode: 'framed' (server menggambar anotasi) atau 'overlay' (browser menggambar kotak; hemat CPU server)
+    // feedQuality / feedWidth: turunkan untuk koneksi lambat di kantor lapangan
+    const FEED_OPTIONS = {
+        mode: localStorage.getItem('feedMode') || 'framed',
+        quality: localStorage.getItem('feedQuality') || '70',
+        width: localStorage.getItem('feedWidth') || '',
+    };
+
+    function feedUrl(path, width) {
+        const params = new URLSearchParams({ mode: FEED_OPTIONS.mode, quality: FEED_OPTIONS.quality });
+        const maxWidth = FEED_OPTIONS.width || width;
+        if (maxWidth) params.set('width', Math.round(maxWidth));
+        return API_URL.replace('http', 'ws') + `${path}?${params}`;
+    }
+
+    // Header: versi (u8), flags (u8: 1 = ada gambar, 2 = beranotasi), seq (u32), panjang JSON (u32), big-endian
+    function parseFrame(buffer) {
+        const view = new DataView(buffer);
+        const flags = view.getUint8(1);
+        const metaLength = view.getUint32(6);
+        const data = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 10, metaLength)));
+        const image = (flags & 1) ? new Blob([new Uint8Array(buffer, 10 + metaLength)], { type: 'image/jpeg' }) : null;
+        return { seq: view.getUint32(2), data, image };
+    }
+
+    async function drawClientOverlay(image, data) {
+        const bitmap = await createImageBitmap(image);
+        const canvas = document.createElement('canvas');
+        canvas.width = bitmap.width;
+        canvas.height = bitmap.height;
+        const ctx = canvas.getContext('2d');
+        ctx.drawImage(bitmap, 0, 0);
+        const scale = bitmap.width / data.frame_size[0];
+        ctx.lineWidth = 2;
+        ctx.font = `${Math.max(10, Math.round(16 * scale))}px sans-serif`;
+        (data.overlay.boxes || []).forEach(({ label, box: [x1, y1, x2, y2], color }) => {
+            ctx.strokeStyle = ctx.fillStyle = color;
+            ctx.strokeRect(x1 * scale, y1 * scale, (x2 - x1) * scale, (y2 - y1) * scale);
+            ctx.fillText(label, x1 * scale, y1 * scale - 6);
+        });
+        ctx.fillStyle = '#ffffff';
+        (data.overlay.faces || []).forEach(({ text, at: [left, top] }) => ctx.fillText(text, left * scale, top * scale - 6));
+        return new Promise(resolve => canvas.toBlob(resolve, 'image/jpeg', 0.9));
+    }
+
+    // Pasang handler frame ke <img>; frame yang datang terlambat (seq lebih kecil) diabaikan
+    function attachFeed(ws, img, onData) {
+        let lastSeq = 0;
+        ws.binaryType = 'arraybuffer';
+        ws.onmessage = async (event) => {
+            if (!(event.data instanceof ArrayBuffer)) return;
+            const { seq, data, image } = parseFrame(event.data);
+            if (seq <= lastSeq) return;
+            lastSeq = seq;
+            if (onData) onData(data);
+            if (!image) return;
+            const blob = data.overlay ? await drawClientOverlay(image, data) : image;
+            const urlObject = URL.createObjectURL(blob);
+            img.src = urlObject;
+            img.onload = () => URL.revokeObjectURL(urlObject);
+        };
+    }
     
     const addWorkerModalEl = document.getElementById('addWorkerModal');
     const editWorkerModalEl = document.getElementById('editWorkerModal');
@@ -38,34 +102,60 @@ document.addEventListener("DOMContentLoaded", function() {
     // --- Logika Dashboard jika di dashboard.html ---
     if (window.location.pathname.endsWith('dashboard.html')) {
         startDashboardWebSocket();
-        loadActivityLogs();  // Load initial
-        setInterval(loadActivityLogs, 5000);  // Real-time refresh every 5s
+        loadActivityLogs();  // Load initial, lalu event baru di-push lewat /ws/logs
+    }
+
+    const ACTIVITY_LOG_SIZE = 10;
+    let lastLogId = null;
+    let logsWs = null;
+
+    function renderLogItem(log) {
+        const statusClass = log.status === 'hijau' ? 'alert-success' : log.status === 'orange' ? 'alert-warning' : 'alert-danger';
+        return `
+            <div class="log-item alert ${statusClass}">
+                <div class="log-time">${new Date(log.timestamp).toLocaleTimeString()}</div>
+                <div class="log-details">${log.name} - ${log.description}</div>
+                <div class="log-action"><button class="btn btn-sm btn-outline-secondary">View</button></div>
+            </div>`;
     }
 
     function loadActivityLogs() {
         const activityLog = document.querySelector('.activity-log');
         if (!activityLog) return;
-        fetch(`${API_URL}/api/logs?limit=10&filter=today`, {  // Recent 10 today
+        fetch(`${API_URL}/api/logs?limit=${ACTIVITY_LOG_SIZE}&filter=today`, {  // Recent 10 today
             headers: { 'Authorization': `Bearer ${token}` }
         }).then(res => res.json()).then(logs => {
-            activityLog.innerHTML = '';
-            logs.forEach(log => {
-                const statusClass = log.status === 'hijau' ? 'alert-success' : log.status === 'orange' ? 'alert-warning' : 'alert-danger';
-                activityLog.innerHTML += `
-                    <div class="log-item alert ${statusClass}">
-                        <div class="log-time">${new Date(log.timestamp).toLocaleTimeString()}</div>
-                        <div class="log-details">${log.name} - ${log.description}</div>
-                        <div class="log-action"><button class="btn btn-sm btn-outline-secondary">View</button></div>
-                    </div>`;
-            });
+            activityLog.innerHTML = logs.map(renderLogItem).join('');
+            lastLogId = logs.reduce((max, log) => Math.max(max, log.log_id), lastLogId || 0);
+            startLogStream();
         }).catch(err => console.error(err));
     }
 
+    // Push log baru dari server; saat reconnect kirim last_id agar event yang terlewat ikut dikirim
+    function startLogStream() {
+        if (logsWs) return;
+        const activityLog = document.querySelector('.activity-log');
+        const params = new URLSearchParams({ token });
+        if (lastLogId !== null) params.set('last_id', lastLogId);
+        logsWs = new WebSocket(API_URL.replace('http', 'ws') + `/ws/logs?${params}`);
+
+        logsWs.onmessage = (event) => {
+            const log = JSON.parse(event.data);
+            lastLogId = Math.max(lastLogId || 0, log.log_id);
+            activityLog.insertAdjacentHTML('afterbegin', renderLogItem(log));
+            while (activityLog.children.length > ACTIVITY_LOG_SIZE) activityLog.lastElementChild.remove();
+        };
+        logsWs.onclose = () => {
+            logsWs = null;
+            setTimeout(startLogStream, 3000);
+        };
+    }
+
     function startDashboardWebSocket() {
         if (dashboardWs) return;
         
-        dashboardWs = new WebSocket(API_URL.replace('http', 'ws') + '/ws/dashboard');
         const videoFeed = document.getElementById('videoFeed');
+        dashboardWs = new WebSocket(feedUrl('/ws/dashboard', videoFeed.clientWidth * window.devicePixelRatio));
         const userInfoPanel = document.getElementById('userInfoPanel');
         const userNameEl = document.getElementById('userName');
         const ppeListEl = document.getElementById('ppeList');
@@ -81,18 +171,7 @@ document.addEventListener("DOMContentLoaded", function() {
             dashboardWs = null;
         };
 
-        dashboardWs.onmessage = (event) => {
-            if (event.data instanceof Blob) {
-                const urlObject = URL.createObjectURL(event.data);
-                videoFeed.src = urlObject;
-                videoFeed.onload = () => URL.revokeObjectURL(urlObject);
-            } else {
-                try {
-                    const data = JSON.parse(event.data);
-                    updateUserInfoPanel(data, userInfoPanel, userNameEl, ppeListEl);
-                } catch (e) { /* Abaikan pesan non-JSON */ }
-            }
-        };
+        attachFeed(dashboardWs, videoFeed, data => updateUserInfoPanel(data, userInfoPanel, userNameEl, ppeListEl));
     }
 
     function updateUserInfoPanel(data, panelEl, nameEl, listEl) {
@@ -251,12 +330,17 @@ document.addEventListener("DOMContentLoaded", function() {
         }
     }
 
+    let cctvSockets = [];
+
     function updateCctvGrid(layout) {
         const selectedCheckboxes = document.querySelectorAll('#cctvTableBody input[type="checkbox"]:checked');
-        const selectedIps = Array.from(selectedCheckboxes).map(cb => cb.dataset.ip);
+        const selectedIds = Array.from(selectedCheckboxes).map(cb => cb.dataset.id);
         const grid = document.getElementById('cctvGrid');
         grid.innerHTML = '';
-        const numStreams = Math.min(layout, selectedIps.length);
+        // Tutup feed lama; backend berhenti memproses kamera yang tidak lagi ditonton
+        cctvSockets.forEach(ws => ws.close());
+        cctvSockets = [];
+        const numStreams = Math.min(layout, selectedIds.length);
         if (numStreams === 0) return;
 
         let rows = 1, cols = 1;
@@ -270,13 +354,17 @@ document.addEventListener("DOMContentLoaded", function() {
         grid.style.height = '100%';  // Full height
         grid.style.display = 'grid';  // Ensure grid
 
-        selectedIps.slice(0, layout).forEach(ip => {
+        selectedIds.slice(0, layout).forEach(id => {
             const videoDiv = document.createElement('div');
             const img = document.createElement('img');
-            img.src = ip;
             img.alt = 'CCTV Stream';
             videoDiv.appendChild(img);
             grid.appendChild(videoDiv);
+
+            // Resolusi sesuai ukuran tile: layout 3x3 tidak perlu frame penuh
+            const ws = new WebSocket(feedUrl(`/ws/cctv/${id}`, grid.clientWidth / cols * window.devicePixelRatio));
+            attachFeed(ws, img);
+            cctvSockets.push(ws);
         });
     }
 
@@ -511,29 +599,24 @@ document.addEventListener("DOMContentLoaded", function() {
 
     function startEnrollmentWebSocket() {
         if (enrollWs) return;
-        const wsUrl = API_URL.replace('http', 'ws') + '/ws/enroll';
-        enrollWs = new WebSocket(wsUrl);
+        enrollWs = new WebSocket(feedUrl('/ws/enroll', enrollmentFeed.clientWidth * window.devicePixelRatio));
 
         enrollWs.onopen = () => {
             enrollmentStatus.textContent = "Camera ready. Position your face in the frame.";
             enrollmentStatus.className = 'mt-2 fw-bold text-success';
         };
 
-        enrollWs.onmessage = (event) => {
-            if (event.data instanceof Blob) {
-                enrollmentFeed.src = URL.createObjectURL(event.data);
-            } else {
-                const data = JSON.parse(event.data);
-                enrollmentStatus.textContent = data.message;
-                enrollmentStatus.className = `mt-2 fw-bold text-${data.status === 'success' ? 'success' : 'danger'}`;
-                if (data.status === 'success') {
-                    setTimeout(() => {
-                        addWorkerModal.hide();
-                        loadWorkers();
-                    }, 2000);
-                }
+        attachFeed(enrollWs, enrollmentFeed, data => {
+            if (!data.status) return;  // Frame biasa tanpa hasil capture
+            enrollmentStatus.textContent = data.message;
+            enrollmentStatus.className = `mt-2 fw-bold text-${data.status === 'success' ? 'success' : 'danger'}`;
+            if (data.status === 'success') {
+                setTimeout(() => {
+                    addWorkerModal.hide();
+                    loadWorkers();
+                }, 2000);
             }
-        };
+        });
         
         enrollWs.onerror = (event) => {
             console.error("WebSocket Error:", event);
@@ -1,23 +1,28 @@
-# (Kode ini sama seperti di jawaban sebelumnya, pastikan
-# konfigurasi database di dalamnya sudah benar)
+# add_worker.py: Pendaftaran satu pekerja dari webcam (untuk banyak pekerja sekaligus pakai enroll_bulk.py)
+# Pakai (dari folder backend): python ../scripts/add_worker.py
+# INSERT dan format encoding sama dengan ws_enroll (enrollment.py); restart server atau
+# POST /api/workers/reload-gallery agar wajah baru dikenali server yang sedang berjalan.
+import os
+import sys
 import cv2
-import face_recognition
-import mysql.connector
-import pickle
 
-DB_CONFIG = {
-    'host': 'localhost', 'user': 'root', 'password': '',
-    'database': 'pertamina_gate_system'
-}
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+from database import db_cursor, Error
+from detection import encode_faces
+from enrollment import INSERT_WORKER_SQL, face_count_error, worker_row
 
 def add_new_worker():
-    employee_id = input("Masukkan Nomor Identitas Pekerja: ")
-    name = input("Masukkan Nama Lengkap: ")
-    role = input("Masukkan Fungsi/Jabatan: ")
+    worker = {
+        "employee_id": input("Masukkan Nomor Identitas Pekerja: "),
+        "name": input("Masukkan Nama Lengkap: "),
+        "company": input("Masukkan Perusahaan: "),
+        "role": input("Masukkan Fungsi/Jabatan: "),
+        "status_sim_l": input("Status SIM L (Aktif/Tidak Aktif) [Aktif]: ") or "Aktif",
+    }
 
     cap = cv2.VideoCapture(0)
     print("\nPandang ke kamera. Tekan 's' untuk menyimpan, 'q' untuk keluar.")
-    
+
     while True:
         ret, frame = cap.read()
         if not ret: break
@@ -25,29 +30,19 @@ def add_new_worker():
 
         key = cv2.waitKey(1) & 0xFF
         if key == ord('s'):
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            face_locations = face_recognition.face_locations(rgb_frame)
-            
-            if len(face_locations) == 1:
-                face_encoding = face_recognition.face_encodings(rgb_frame, face_locations)[0]
+            face_locations, face_encodings = encode_faces(frame)
+            error = face_count_error(len(face_locations))
+
+            if error is None:
                 try:
-                    conn = mysql.connector.connect(**DB_CONFIG)
-                    cursor = conn.cursor()
-                    encoding_bytes = pickle.dumps(face_encoding)
-                    sql = "INSERT INTO workers (employee_id, name, role, face_encoding) VALUES (%s, %s, %s, %s)"
-                    val = (employee_id, name, role, encoding_bytes)
-                    cursor.execute(sql, val)
-                    conn.commit()
-                    print(f"\nSukses! Data untuk {name} telah ditambahkan.")
-                except mysql.connector.Error as err:
+                    with db_cursor() as cursor:
+                        cursor.execute(INSERT_WORKER_SQL, worker_row(worker, face_encodings[0]))
+                    print(f"\nSukses! Data untuk {worker['name']} telah ditambahkan.")
+                except Error as err:
                     print(f"Error: {err}")
-                finally:
-                    if conn.is_connected():
-                        cursor.close()
-                        conn.close()
                 break
             else:
-                print("Wajah tidak terdeteksi atau terdeteksi lebih dari satu. Coba lagi.")
+                print(f"{error} Coba lagi.")
         elif key == ord('q'):
             break
 
@@ -55,4 +50,4 @@ def add_new_worker():
     cv2.destroyAllWindows()
 
 if __name__ == "__main__":
-    add_new_worker()
\ No newline at end of file
+    add_new_worker()
@@ -0,0 +1,37 @@
+# archive_logs.py: Pindahkan bulan lama gate_logs ke arsip Parquet sekarang (server melakukannya berkala sendiri)
+# Pakai (dari folder backend):
+#   python ../scripts/archive_logs.py [--hot-months 12] [--dry-run]
+#   python ../scripts/archive_logs.py --stats
+# Butuh pyarrow. Server yang sedang berjalan membaca manifest baru otomatis; history API tetap mencakup bulan yang dipindah.
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+from log_archive import LogArchive, LOG_HOT_MONTHS, archive_due_months, hot_cutoff
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hot-months", type=int, default=LOG_HOT_MONTHS, help="bulan yang tetap di MySQL")
+    parser.add_argument("--dry-run", action="store_true", help="hitung baris per bulan tanpa menulis/menghapus")
+    parser.add_argument("--stats", action="store_true", help="tampilkan isi arsip saja")
+    args = parser.parse_args()
+
+    archive = LogArchive()
+    if not args.stats:
+        from database import db_cursor
+        print(f"hot table keeps >= {hot_cutoff(hot_months=args.hot_months):%Y-%m}; archive: {archive.root}")
+        started = time.perf_counter()
+        moved = archive_due_months(db_cursor, archive, hot_months=args.hot_months, dry_run=args.dry_run)
+        for month, rows in moved:
+            print(f"{month}: {rows} rows {'would be moved' if args.dry_run else 'moved'}")
+        print(f"{sum(rows for _, rows in moved)} rows in {time.perf_counter() - started:.1f}s")
+
+    stats = archive.stats()
+    print(f"archive: {stats['months']} months, {stats['rows']} rows, {stats['bytes'] / 1e6:.1f} MB, "
+          f"archived_until {stats['archived_until']}")
+
+if __name__ == "__main__":
+    main()
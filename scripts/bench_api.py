@@ -0,0 +1,56 @@
+# bench_api.py: Uji beban endpoint API dengan banyak client bersamaan (hanya stdlib)
+# Pakai: python scripts/bench_api.py --username admin --password ... [--url http://127.0.0.1:8000]
+#        [--paths /api/logs /api/workers] [--clients 1 10 50] [--requests 200]
+# Jalankan sekali terhadap build lama dan sekali terhadap build baru untuk perbandingan sebelum/sesudah.
+import argparse
+import concurrent.futures
+import json
+import statistics
+import time
+import urllib.parse
+import urllib.request
+
+def login(url, username, password):
+    body = urllib.parse.urlencode({"username": username, "password": password}).encode()
+    with urllib.request.urlopen(urllib.request.Request(f"{url}/token", data=body)) as res:
+        return json.load(res)["access_token"]
+
+def timed_get(url, token):
+    request = urllib.request.Request(url, headers={"Authorization": f"Bearer {token}"})
+    t0 = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=60) as res:
+            res.read()
+            ok = res.status == 200
+    except Exception:
+        ok = False
+    return time.perf_counter() - t0, ok
+
+def percentile(values, q):
+    return statistics.quantiles(values, n=100)[q - 1] if len(values) > 1 else values[0]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--paths", nargs="+", default=["/api/logs", "/api/workers"])
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    token = login(args.url, args.username, args.password)
+    print(f"{'path':<16} {'clients':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+    for path in args.paths:
+        for clients in args.clients:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=clients) as pool:
+                t0 = time.perf_counter()
+                results = list(pool.map(lambda _: timed_get(args.url + path, token), range(args.requests)))
+                wall = time.perf_counter() - t0
+            latencies = [lat * 1000 for lat, _ in results]
+            errors = sum(1 for _, ok in results if not ok)
+            print(f"{path:<16} {clients:>7} {len(results) / wall:>8.1f} {percentile(latencies, 50):>8.1f} "
+                  f"{percentile(latencies, 95):>8.1f} {errors:>7}")
+
+if __name__ == "__main__":
+    main()
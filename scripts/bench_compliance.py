@@ -0,0 +1,79 @@
+# bench_compliance.py: Volume log gate_logs dan flapping status, last_records per kamera vs ComplianceStore bersama
+# Pakai (dari folder backend):
+#   python ../scripts/bench_compliance.py [--workers 50] [--cameras 2] [--minutes 10] [--fps 10] [--miss 0.1]
+# Simulasi tanpa model/DB: setiap pekerja terlihat di semua kamera, patuh penuh, tetapi setiap item APD
+# "hilang" dari deteksi satu frame dengan peluang --miss (false negative YOLO). Sebagian pekerja (--violators)
+# benar-benar melepas helm di tengah simulasi; perubahan itu harus tetap tercatat.
+import argparse
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+from association import PPE_ITEMS
+from compliance import ComplianceStore, evaluate
+
+
+def observations(args):
+    """Yield (now, cctv_id, user_info, ppe_worn) urut waktu."""
+    rng = random.Random(args.seed)
+    users = [{"id": i, "name": f"W{i}", "company": "PT Sim", "role": "Operator", "status_sim_l": "Aktif"}
+             for i in range(args.workers)]
+    violators = set(range(args.violators))
+    start = datetime(2026, 1, 1, 7, 0)
+    for frame in range(int(args.minutes * 60 * args.fps)):
+        now = start + timedelta(seconds=frame / args.fps)
+        helmet_off = frame >= args.minutes * 60 * args.fps / 2
+        for cctv_id in range(args.cameras):
+            for user in users:
+                worn = {item: rng.random() >= args.miss for item in PPE_ITEMS}
+                if helmet_off and user["id"] in violators:
+                    worn["helmet"] = False
+                yield now, cctv_id, user, worn
+
+def legacy(args):
+    """Perilaku lama: status mentah per frame, last_records per kamera (log bila > 60 s)."""
+    rows, flips, last_records, shown = [], 0, {}, {}
+    for now, cctv_id, user, worn in observations(args):
+        overall = evaluate(user, worn)[0]
+        key = (cctv_id, user["id"])
+        if key in last_records and (now - last_records[key]).total_seconds() <= 60:
+            pass
+        else:
+            rows.append((user["id"], now, overall))
+            last_records[key] = now
+        flips += shown.get(user["id"], overall) != overall
+        shown[user["id"]] = overall
+    return rows, flips
+
+def shared(args):
+    rows, flips, shown = [], 0, {}
+    store = ComplianceStore(lambda row, meta: rows.append(row[:3]))
+    for now, cctv_id, user, worn in observations(args):
+        overall = store.observe(user, worn, cctv_id, now)["overall"]
+        flips += shown.get(user["id"], overall) != overall
+        shown[user["id"]] = overall
+    return rows, flips
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=50)
+    parser.add_argument("--cameras", type=int, default=2)
+    parser.add_argument("--minutes", type=float, default=10)
+    parser.add_argument("--fps", type=float, default=10)
+    parser.add_argument("--miss", type=float, default=0.1, help="peluang satu item APD tidak terdeteksi per frame")
+    parser.add_argument("--violators", type=int, default=5, help="pekerja yang melepas helm di tengah simulasi")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{args.workers} workers x {args.cameras} cameras, {args.minutes:g} min @ {args.fps:g} fps, miss={args.miss}")
+    print(f"{'mode':<8} {'log rows':>9} {'merah rows':>11} {'flips':>8} {'violators caught':>17}")
+    for name, run in (("legacy", legacy), ("shared", shared)):
+        rows, flips = run(args)
+        merah = [row for row in rows if row[2] == "merah"]
+        caught = len({row[0] for row in merah if row[0] < args.violators})
+        print(f"{name:<8} {len(rows):>9} {len(merah):>11} {flips:>8} {caught:>10}/{args.violators}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# bench_face_regions.py: Lokasi wajah HOG seluruh frame vs hanya di region face/head YOLO (FACE_LOCATE_MODE=regions)
+# Pakai (dari folder backend agar PPE_MODEL_PATH relatif tetap benar):
+#   python ../scripts/bench_face_regions.py --video cctv_1080p.mp4 [--frames 300] [--scale 0.5] [--full-every 30]
+# Galeri dibangun dari wajah di video (scan penuh tiap --enroll-every frame), lalu kedua jalur dijalankan pada frame
+# yang sama dengan deteksi YOLO yang sama. Recognition rate = wajah yang cocok dengan galeri per frame;
+# identity recall = identitas yang dikenali jalur penuh per frame yang juga dikenali jalur region.
+import argparse
+import os
+import sys
+import time
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+from detection import detect_batch, locate_faces, locate_faces_in_regions, encode_faces_at
+from face_regions import FaceLocator, FACE_REGION_PADDING, FACE_FULL_SCAN_EVERY
+from gallery import FaceGallery
+
+
+def read_frames(path, limit):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < limit:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+def build_gallery(frames, every):
+    """Satu identitas per wajah berbeda yang terlihat (encoding pertama), dari scan penuh tiap `every` frame."""
+    gallery = FaceGallery()
+    for frame in frames[::every]:
+        for encoding in encode_faces_at(frame, locate_faces(frame)):
+            user_info, _ = gallery.match([encoding])[0]
+            if user_info is None:
+                gallery = gallery.added(encoding, {"id": len(gallery) + 1})
+    return gallery
+
+def run(frames, detections, gallery, locator, scale=1.0):
+    locate_ms, encode_ms, located, identities = [], [], [], []
+    for frame, boxes in zip(frames, detections):
+        t0 = time.perf_counter()
+        regions = locator.plan(boxes, frame.shape)
+        if regions is None:
+            face_locations = locate_faces(frame)
+        else:
+            face_locations = locate_faces_in_regions(frame, regions, scale) if len(regions) else []
+        t1 = time.perf_counter()
+        encodings = encode_faces_at(frame, face_locations)
+        t2 = time.perf_counter()
+        locate_ms.append((t1 - t0) * 1000)
+        encode_ms.append((t2 - t1) * 1000)
+        located.append(len(face_locations))
+        identities.append({m["id"] for m, _ in gallery.match(encodings) if m is not None})
+    return {"locate_ms": locate_ms, "encode_ms": encode_ms, "located": located, "identities": identities,
+            "full_scans": locator.full_scans}
+
+def report(name, result, frames):
+    locate = np.asarray(result["locate_ms"])
+    total = locate + np.asarray(result["encode_ms"])
+    recognized = sum(len(ids) for ids in result["identities"])
+    print(f"{name:<10} {np.percentile(locate, 50):>10.1f} {np.percentile(locate, 95):>10.1f} {total.mean():>10.1f} "
+          f"{sum(result['located']):>8} {recognized / frames:>10.2f} {result['full_scans']:>6}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--video", required=True)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--scale", type=float, default=1.0, help="skala crop sebelum HOG (FACE_REGION_SCALE)")
+    parser.add_argument("--padding", type=float, default=FACE_REGION_PADDING)
+    parser.add_argument("--full-every", type=int, default=FACE_FULL_SCAN_EVERY, help="scan penuh tiap N frame, 0 = tidak")
+    parser.add_argument("--enroll-every", type=int, default=10, help="frame untuk membangun galeri")
+    args = parser.parse_args()
+
+    frames = read_frames(args.video, args.frames)
+    if not frames:
+        sys.exit(f"Tidak bisa membaca frame dari {args.video}")
+    detections = [detect_batch([frame], with_faces=False)[0] for frame in frames]  # Sama untuk kedua jalur, tidak diukur
+    gallery = build_gallery(frames, args.enroll_every)
+
+    full = run(frames, detections, gallery, FaceLocator("full"))
+    regions = run(frames, detections, gallery, FaceLocator("regions", args.full_every, args.padding), args.scale)
+
+    n = len(frames)
+    height, width = frames[0].shape[:2]
+    print(f"frames: {n} ({width}x{height}), gallery: {len(gallery)} identities, scale: {args.scale}, "
+          f"full scan every: {args.full_every}")
+    print(f"{'path':<10} {'locate p50':>10} {'locate p95':>10} {'ms/frame':>10} {'located':>8} {'recog/frm':>10} {'full':>6}")
+    report("full", full, n)
+    report("regions", regions, n)
+    found = sum(len(ids) for ids in full["identities"])
+    kept = sum(len(a & b) for a, b in zip(full["identities"], regions["identities"]))
+    extra = sum(len(b - a) for a, b in zip(full["identities"], regions["identities"]))
+    speedup = np.mean(full["locate_ms"]) / max(np.mean(regions["locate_ms"]), 1e-9)
+    print(f"locate speedup: {speedup:.2f}x, identity recall vs full: {kept / found if found else 0:.1%}, "
+          f"identities only found by regions: {extra}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# bench_log_archive.py: Ukuran arsip Parquet vs baris gate_logs mentah, dan latensi query dengan/tanpa pushdown
+# Pakai (dari folder backend):
+#   python ../scripts/bench_log_archive.py [--rows 2000000] [--months 24] [--companies 40] [--output archive.json]
+# Tanpa MySQL: baris sintetis ditulis lewat LogArchive.write_month ke folder sementara. "raw" = ukuran kolom
+# gate_logs seperti di MySQL (ppe_details JSON utuh), tanpa overhead halaman/index InnoDB.
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+from log_archive import LogArchive, add_months, _pyarrow
+from ppe_classes import PPE_WAJIB, PPE_OPSIONAL
+
+STATUSES = ("hijau", "orange", "merah")
+
+
+def synthetic_month(rng, month, count, first_id, companies):
+    rows, raw_bytes = [], 0
+    seconds = (add_months(month, 1) - month).total_seconds()
+    for i in range(count):
+        status = rng.choices(STATUSES, weights=(80, 12, 8))[0]
+        used = {"wajib": {item: status != "merah" or rng.random() < 0.5 for item in PPE_WAJIB},
+                "opsional": {item: status == "hijau" or rng.random() < 0.5 for item in PPE_OPSIONAL}}
+        missing = [item for group in used.values() for item, worn in group.items() if not worn]
+        description = "APD Lengkap dan SIML Aktif" if not missing else "; ".join(
+            f"Tidak Menggunakan <b style='color:red'>{item.capitalize()}</b>" for item in missing)
+        details = json.dumps({"ppe_used": used, "description": description})
+        worker_id = rng.randrange(1, 2000)
+        rows.append({"log_id": first_id + i, "timestamp": month + timedelta(seconds=seconds * i / count),
+                     "status": status, "description": description, "name": f"Worker {worker_id}",
+                     "company": f"PT Kontraktor {worker_id % companies}", "role": "Operator",
+                     "worker_id": worker_id, "cctv_id": rng.randrange(1, 9), "missing": missing})
+        raw_bytes += 8 + 8 + 4 + len(status) + len(details) + 4 + 4  # log_id, timestamp, worker_id, status, JSON, cctv
+    return rows, raw_bytes
+
+def timed(fn, repeat=5):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return result, sorted(samples)[len(samples) // 2]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--companies", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+    pq = _pyarrow()[1]
+    rng = random.Random(args.seed)
+    first_month = datetime(2023, 1, 1)
+    per_month = args.rows // args.months
+
+    with tempfile.TemporaryDirectory() as root:
+        archive = LogArchive(root)
+        raw_total, started = 0, time.perf_counter()
+        for m in range(args.months):
+            month = add_months(first_month, m)
+            rows, raw_bytes = synthetic_month(rng, month, per_month, m * per_month + 1, args.companies)
+            archive.write_month(month, rows)
+            raw_total += raw_bytes
+        write_s = time.perf_counter() - started
+        stats = archive.stats()
+
+        year = (datetime(2024, 1, 1), datetime(2025, 1, 1))
+        company = "PT Kontraktor 7"
+        queries = {
+            "latest_page": lambda: archive.query(limit=50),
+            "year_2024_page": lambda: archive.query(*year, limit=100),
+            "year_2024_merah_company": lambda: archive.query(*year, limit=100, status="merah", company=company),
+            "deep_page_cursor": lambda: archive.query(*year, after=(datetime(2024, 6, 15), 0), limit=100),
+        }
+        results = {}
+        for name, fn in queries.items():
+            rows, ms = timed(fn)
+            results[name] = {"rows": len(rows), "p50_ms": round(ms, 2)}
+
+        def no_pushdown():
+            # Baca semua kolom semua bulan lalu filter di memori, seperti scan tabel tanpa index
+            matched = 0
+            for month in archive.months():
+                for row in pq.read_table(archive.month_path(month)).to_pylist():
+                    matched += (year[0] <= row["timestamp"] < year[1] and row["status"] == "merah"
+                                and row["company"] == company)
+            return matched
+        matched, ms = timed(no_pushdown, repeat=1)
+        results["year_2024_merah_company_full_scan"] = {"rows": matched, "p50_ms": round(ms, 2)}
+
+    result = {"rows": per_month * args.months, "months": args.months, "raw_mb": round(raw_total / 1e6, 1),
+              "archive_mb": round(stats["bytes"] / 1e6, 1), "ratio": round(raw_total / stats["bytes"], 1),
+              "write_s": round(write_s, 1), "queries": results}
+    print(f"rows: {result['rows']}  raw: {result['raw_mb']} MB  parquet+zstd: {result['archive_mb']} MB  "
+          f"({result['ratio']}x)  write: {result['write_s']}s")
+    print(f"{'query':<36} {'rows':>7} {'p50 ms':>9}")
+    for name, value in results.items():
+        print(f"{name:<36} {value['rows']:>7} {value['p50_ms']:>9.2f}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+if __name__ == "__main__":
+    main()
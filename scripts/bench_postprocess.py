@@ -0,0 +1,109 @@
+# bench_postprocess.py: Biaya pasca-proses deteksi per frame, loop per-box lama vs salinan tunggal + asosiasi APD per orang
+# Pakai: python scripts/bench_postprocess.py [--persons 8 16 32] [--repeat 200]
+# Tensor torch dipakai bila terpasang (int(box.cls) per box = satu sinkronisasi device -> host); selain itu array NumPy.
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+from ppe_classes import CLASS_NAMES, PPE_WAJIB, PPE_OPSIONAL
+from association import associate_ppe, PPE_ITEMS
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
+LABEL_CLASS = {label: class_id for class_id, label in CLASS_NAMES.items()}
+# Letak relatif item di badan: (x1, y1, x2, y2) sebagai fraksi kotak person
+ITEM_LAYOUT = {
+    'helmet': (0.3, 0.0, 0.7, 0.12), 'glasses': (0.38, 0.1, 0.62, 0.14), 'face-mask': (0.38, 0.14, 0.62, 0.2),
+    'coverall': (0.1, 0.2, 0.9, 0.85), 'gloves': (0.0, 0.5, 0.15, 0.6), 'shoes': (0.2, 0.9, 0.8, 1.0),
+}
+
+
+class FakeBoxes:
+    """Meniru result.boxes ultralytics: iterasi per box (.cls, .xyxy) dan .data untuk seluruh batch."""
+
+    def __init__(self, data):
+        self.data = torch.from_numpy(data) if torch is not None else data
+
+    def __iter__(self):
+        for row in self.data:
+            yield FakeBox(row)
+
+
+class FakeBox:
+    def __init__(self, row):
+        self.cls = row[5]
+        self.xyxy = row[None, :4]
+
+
+def synthetic_frame(persons, rng):
+    """Baris berdiri berdampingan; setiap orang memakai subset APD acak. Returns (data, faces, worn_truth)."""
+    rows, faces, truth = [], [], []
+    for i in range(persons):
+        x1, y1, w, h = 10 + i * 120, 50, 100, 400
+        rows.append([x1, y1, x1 + w, y1 + h, 0.9, LABEL_CLASS['person']])
+        faces.append((y1 + 12, x1 + 60, y1 + 52, x1 + 40))  # (top, right, bottom, left)
+        worn = {item for item in PPE_ITEMS if rng.random() < 0.7}
+        truth.append(worn)
+        for item in worn:
+            fx1, fy1, fx2, fy2 = ITEM_LAYOUT[item]
+            rows.append([x1 + fx1 * w, y1 + fy1 * h, x1 + fx2 * w, y1 + fy2 * h, 0.8, LABEL_CLASS[item]])
+        rows.append([x1 + 30, y1 + 380, x1 + 45, y1 + 400, 0.5, LABEL_CLASS['tool']])
+    return np.array(rows, dtype=np.float32), faces, truth
+
+def evaluate(worn):
+    status_wajib = {item: item in worn for item in PPE_WAJIB}
+    status_opsional = {item: item in worn for item in PPE_OPSIONAL}
+    return status_wajib, status_opsional
+
+def legacy(boxes, faces):
+    # Seperti process_frame lama: tarik cls/xyxy per box, satu set global untuk semua orang di frame
+    detected_items = set()
+    for box in boxes:
+        label = CLASS_NAMES.get(int(box.cls), 'unknown')
+        x1, y1, x2, y2 = map(int, box.xyxy[0])
+        detected_items.add(label)
+    return [evaluate(detected_items) for _ in faces]
+
+def vectorized(boxes, faces):
+    data = boxes.data.cpu().numpy() if torch is not None else boxes.data
+    detections = np.ascontiguousarray(data[:, [0, 1, 2, 3, -2, -1]], dtype=np.float32)
+    overlay = [(CLASS_NAMES.get(int(c), 'unknown'), int(x1), int(y1), int(x2), int(y2))
+               for x1, y1, x2, y2, _, c in detections.tolist()]
+    worn = associate_ppe(detections, faces)
+    return [evaluate({item for item, on in zip(PPE_ITEMS, row) if on}) for row in worn.tolist()]
+
+def accuracy(results, truth):
+    return sum(result == evaluate(worn) for result, worn in zip(results, truth)) / len(truth)
+
+def timed(fn, repeat):
+    fn()  # pemanasan
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1000
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--persons", type=int, nargs="+", default=[8, 16, 32])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    print(f"backend: {'torch ' + torch.__version__ if torch is not None else 'numpy (torch tidak terpasang)'}")
+    print(f"{'persons':>7} {'detections':>10} {'legacy ms':>10} {'vector ms':>10} {'legacy acc':>11} {'vector acc':>11}")
+    for persons in args.persons:
+        data, faces, truth = synthetic_frame(persons, rng)
+        boxes = FakeBoxes(data)
+        legacy_ms = timed(lambda: legacy(boxes, faces), args.repeat)
+        vector_ms = timed(lambda: vectorized(boxes, faces), args.repeat)
+        print(f"{persons:>7} {len(data):>10} {legacy_ms:>10.3f} {vector_ms:>10.3f} "
+              f"{accuracy(legacy(boxes, faces), truth):>10.0%} {accuracy(vectorized(boxes, faces), truth):>10.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+# bench_replay.py: Replay video rekaman / frame sintetis lewat tahap pipeline dashboard, latensi per tahap tanpa webcam & MySQL
+# Pakai (dari folder backend agar PPE_MODEL_PATH relatif tetap benar):
+#   python ../scripts/bench_replay.py --video gate.mp4 [--frames 300] [--gallery 10000] --output run.json
+#   python ../scripts/bench_replay.py --synthetic 200 --baseline run.json   # bandingkan dengan hasil sebelumnya
+# Tahap sama dengan analyze_frame/recognize_frame: yolo, face_locate (mengikuti FACE_LOCATE_MODE), track, face_encode, gallery_match,
+# compliance (asosiasi APD + evaluasi + submit log), jpeg_encode; log_write = batch GateLogWriter ke SQLite pengganti MySQL.
+# Wajah yang tidak dikenali didaftarkan ke galeri saat pertama terlihat (--no-enroll-seen untuk mematikan),
+# sehingga tahap kepatuhan dan log ikut terukur pada video rekaman.
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+from detection import get_ppe_model, detect_batch, locate_faces, locate_faces_in_regions, encode_faces_at
+from face_regions import FaceLocator, FACE_LOCATE_MODE
+from gallery import FaceGallery
+from tracker import FaceTracker
+from compliance import process_frame, ComplianceStore
+from log_writer import GateLogWriter, GATE_LOG_COLUMNS
+from transport import FramePacket
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+STAGES = ("decode", "yolo", "face_locate", "track", "face_encode", "gallery_match", "compliance", "jpeg_encode")
+
+
+class TimedLogWriter(GateLogWriter):
+    """GateLogWriter yang mencatat durasi setiap batch tulis."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.write_ms = []
+
+    def _write(self, batch):
+        t0 = time.perf_counter()
+        written = super()._write(batch)
+        self.write_ms.append((time.perf_counter() - t0) * 1000)
+        return written
+
+
+def video_frames(paths, limit):
+    count = 0
+    for path in paths:
+        cap = cv2.VideoCapture(path)
+        while count < limit:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            count += 1
+            yield frame
+        cap.release()
+
+def synthetic_frames(count, width, height, seed=0):
+    """Latar statis + beberapa kotak bergerak; cukup untuk biaya YOLO/JPEG, tidak berisi wajah."""
+    rng = np.random.default_rng(seed)
+    background = rng.integers(0, 255, size=(height, width, 3), dtype=np.uint8)
+    background = cv2.GaussianBlur(background, (31, 31), 0)
+    for i in range(count):
+        frame = background.copy()
+        for k in range(4):
+            x = int((i * (5 + k) + k * width // 4) % (width - 120))
+            cv2.rectangle(frame, (x, 100 + k * 120), (x + 120, 200 + k * 120), (40 * k, 200, 255 - 40 * k), -1)
+        yield frame
+
+def synthetic_gallery(size, seed=0):
+    rng = np.random.default_rng(seed)
+    metadata = [{"id": i + 1, "employee_id": f"E{i + 1:06d}", "name": f"Worker {i + 1}", "company": f"Company {i % 20}",
+                 "role": f"Role {i % 7}", "status_sim_l": "Aktif"} for i in range(size)]
+    return FaceGallery(rng.normal(0.0, 0.09, size=(size, 128)), metadata)
+
+def stand_in_db(path):
+    with sqlite3.connect(path) as conn:
+        conn.execute(f"CREATE TABLE gate_logs (log_id INTEGER PRIMARY KEY AUTOINCREMENT, {', '.join(GATE_LOG_COLUMNS)})")
+    return lambda: sqlite3.connect(path)
+
+def summarize(values):
+    if not values:
+        return {"count": 0}
+    values = np.asarray(values)
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"count": len(values), "mean": round(float(values.mean()), 3), "p50": round(float(p50), 3),
+            "p95": round(float(p95), 3), "p99": round(float(p99), 3), "max": round(float(values.max()), 3)}
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)  # macOS: byte, Linux: KB
+
+def replay(frames, gallery, store, args):
+    tracker = FaceTracker()
+    locator = FaceLocator()  # Mengikuti FACE_LOCATE_MODE seperti recognize_frame
+    state = {}
+    timings = {stage: [] for stage in STAGES}
+    end_to_end = []
+    processed = 0
+    started = None
+
+    frames = iter(frames)
+    while True:
+        t0 = time.perf_counter()
+        frame = next(frames, None)
+        if frame is None:
+            break
+        sample = {"decode": time.perf_counter() - t0}
+
+        def stage(name, fn, *fn_args):
+            t = time.perf_counter()
+            result = fn(*fn_args)
+            sample[name] = time.perf_counter() - t
+            return result
+
+        detections = stage("yolo", lambda: detect_batch([frame], with_faces=False)[0])
+
+        def locate():
+            regions = locator.plan(detections, frame.shape)
+            if regions is None:
+                return locate_faces(frame)
+            return locate_faces_in_regions(frame, regions) if len(regions) else []
+        face_locations = stage("face_locate", locate)
+        stale = stage("track", tracker.update, face_locations)
+        encodings = stage("face_encode", encode_faces_at, frame, [face_locations[i] for i in stale])
+
+        def match():
+            nonlocal gallery
+            matches = gallery.match(encodings)
+            if args.enroll_seen:
+                for i, (user_info, _) in enumerate(matches):
+                    if user_info is None:
+                        worker_id = len(gallery) + 1
+                        user_info = {"id": worker_id, "employee_id": f"S{worker_id:06d}", "name": f"Seen {worker_id}",
+                                     "company": "Replay", "role": "Visitor", "status_sim_l": "Aktif"}
+                        gallery = gallery.added(encodings[i], user_info)
+                        matches[i] = (user_info, 0.0)
+            tracker.identify(stale, matches)
+        stage("gallery_match", match)
+
+        frame, response_data = stage("compliance", process_frame, frame, detections, tracker.faces(), state, store)
+        processed += 1
+        stage("jpeg_encode", FramePacket(processed, frame, response_data).jpeg, args.width, args.quality)
+
+        if processed == args.warmup:
+            started = time.perf_counter()
+        if processed > args.warmup:
+            for name, seconds in sample.items():
+                timings[name].append(seconds * 1000)
+            end_to_end.append(sum(sample.values()) * 1000)
+
+    measured = processed - args.warmup
+    wall = time.perf_counter() - started if started is not None and measured > 0 else None
+    return timings, end_to_end, measured, wall
+
+def compare(result, baseline):
+    print(f"\n{'vs baseline':<14} {'p50 ms':>10} {'was':>10} {'change':>8} {'p95 ms':>10} {'was':>10} {'change':>8}")
+    for name, stats in list(result["stages"].items()) + [("end_to_end", result["end_to_end"])]:
+        old = baseline["stages"].get(name) if name != "end_to_end" else baseline.get("end_to_end")
+        if not old or not old.get("count") or not stats.get("count"):
+            continue
+        cells = []
+        for key in ("p50", "p95"):
+            change = (stats[key] - old[key]) / old[key] * 100 if old[key] else 0.0
+            cells.append(f"{stats[key]:>10.2f} {old[key]:>10.2f} {change:>+7.1f}%")
+        print(f"{name:<14} {' '.join(cells)}")
+    if result.get("fps") and baseline.get("fps"):
+        print(f"{'fps':<14} {result['fps']:>10.2f} {baseline['fps']:>10.2f} "
+              f"{(result['fps'] - baseline['fps']) / baseline['fps'] * 100:>+7.1f}%")
+
+def main():
+    parser = argparse.ArgumentParser()
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--video", nargs="+", help="satu atau lebih file video rekaman")
+    source.add_argument("--synthetic", type=int, metavar="N", help="N frame sintetis")
+    parser.add_argument("--frames", type=int, default=300, help="batas frame dari video")
+    parser.add_argument("--size", default="1280x720", help="ukuran frame sintetis WxH")
+    parser.add_argument("--warmup", type=int, default=5, help="frame awal yang tidak diukur")
+    parser.add_argument("--gallery", type=int, default=1000, help="jumlah identitas sintetis di galeri")
+    parser.add_argument("--index", action="store_true", help="pakai index terpartisi (IVF) galeri")
+    parser.add_argument("--no-enroll-seen", dest="enroll_seen", action="store_false")
+    parser.add_argument("--width", type=int, default=None, help="lebar JPEG (default resolusi asli)")
+    parser.add_argument("--quality", type=int, default=95)
+    parser.add_argument("--output", help="tulis hasil JSON ke file ini")
+    parser.add_argument("--baseline", help="hasil JSON sebelumnya untuk dibandingkan")
+    args = parser.parse_args()
+
+    if args.video:
+        frames = video_frames(args.video, args.frames)
+    else:
+        width, height = map(int, args.size.lower().split("x"))
+        frames = synthetic_frames(args.synthetic, width, height)
+
+    gallery = synthetic_gallery(args.gallery)
+    if args.index:
+        gallery.build_index()
+    get_ppe_model()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = TimedLogWriter(stand_in_db(os.path.join(tmp, "gate_logs.db")), placeholder="?")
+        writer.start()
+        store = ComplianceStore(writer.submit)
+        timings, end_to_end, measured, wall = replay(frames, gallery, store, args)
+        writer.close()
+
+    result = {
+        "config": {"source": args.video or f"synthetic:{args.synthetic}@{args.size}", "gallery": args.gallery,
+                   "index": args.index, "face_locate": FACE_LOCATE_MODE, "warmup": args.warmup, "width": args.width,
+                   "quality": args.quality},
+        "machine": {"platform": platform.platform(), "python": platform.python_version(),
+                    "processor": platform.processor(), "cpus": os.cpu_count(), "opencv": cv2.__version__},
+        "frames": measured,
+        "fps": round(measured / wall, 2) if wall else None,
+        "stages": {name: summarize(values) for name, values in timings.items()},
+        "end_to_end": summarize(end_to_end),
+        "log_write": summarize(writer.write_ms),
+        "log_writer": writer.stats(),
+        "compliance": store.stats(),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+    print(f"{'stage':<14} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'mean ms':>9}")
+    for name, stats in list(result["stages"].items()) + [("end_to_end", result["end_to_end"]), ("log_write", result["log_write"])]:
+        if stats["count"]:
+            print(f"{name:<14} {stats['p50']:>9.2f} {stats['p95']:>9.2f} {stats['p99']:>9.2f} {stats['mean']:>9.2f}")
+    print(f"frames: {measured}  fps: {result['fps']}  peak RSS: {result['peak_rss_mb']} MB  "
+          f"log rows: {result['log_writer']['written']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(result, json.load(f))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# bench_startup.py: Waktu startup server dari luar: spawn uvicorn, ukur sampai request pertama terlayani,
+# /health/ready 200, dan (opsional) frame pertama dari websocket dashboard/CCTV.
+# Pakai: python scripts/bench_startup.py [--port 8765] [--feed /ws/dashboard] [--runs 3] [--output startup.json]
+# --feed butuh paket `websockets`. Server memakai .env / env var yang sama dengan deployment (DB, PPE_BACKEND, ...).
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend')
+
+
+def get(url, timeout=1.0):
+    """(status, body dict) atau (None, None) bila server belum menerima koneksi."""
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"{}")
+    except (urllib.error.URLError, ConnectionError, TimeoutError):
+        return None, None
+
+async def first_frame(url, timeout):
+    import websockets
+    async with websockets.connect(url, max_size=None) as ws:
+        await asyncio.wait_for(ws.recv(), timeout)
+
+def measure(args):
+    base = f"http://127.0.0.1:{args.port}"
+    started = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port)],
+                              cwd=BACKEND_DIR, stdout=subprocess.DEVNULL if args.quiet else None,
+                              stderr=subprocess.STDOUT if args.quiet else None)
+    result = {"first_request_s": None, "ready_s": None, "first_frame_s": None, "server": None}
+    try:
+        deadline = started + args.timeout
+        while time.perf_counter() < deadline and result["first_request_s"] is None:
+            status, _ = get(f"{base}/health/live")
+            if status == 200:
+                result["first_request_s"] = round(time.perf_counter() - started, 3)
+            else:
+                time.sleep(0.05)
+
+        if args.feed:
+            # Frame pertama diminta segera setelah server hidup, seperti dashboard yang dibuka saat restart
+            try:
+                asyncio.run(first_frame(f"ws://127.0.0.1:{args.port}{args.feed}", max(deadline - time.perf_counter(), 1)))
+                result["first_frame_s"] = round(time.perf_counter() - started, 3)
+            except Exception as e:
+                print(f"feed error: {e}")
+
+        while time.perf_counter() < deadline:
+            status, body = get(f"{base}/health/ready")
+            if status == 200:
+                result["ready_s"] = round(time.perf_counter() - started, 3)
+                break
+            time.sleep(0.2)
+        result["server"] = get(f"{base}/health/ready")[1]  # Waktu per komponen versi server (sejak import main.py)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--feed", help="path websocket untuk frame pertama, mis. /ws/dashboard atau /ws/cctv/1")
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--quiet", action="store_true", help="sembunyikan log server")
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    runs = [measure(args) for _ in range(args.runs)]
+    print(f"{'run':>4} {'first request s':>16} {'first frame s':>14} {'ready s':>9}")
+    for i, run in enumerate(runs, 1):
+        cells = [f"{run[key]:.2f}" if run[key] is not None else "-" for key in ("first_request_s", "first_frame_s", "ready_s")]
+        print(f"{i:>4} {cells[0]:>16} {cells[1]:>14} {cells[2]:>9}")
+    if runs[-1]["server"]:
+        print("server components (s since start):",
+              {name: c["ready_s"] for name, c in runs[-1]["server"]["components"].items()})
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(runs, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# bench_streams.py: Throughput YOLO untuk N kamera, satu panggilan per kamera vs satu panggilan batch
+# Pakai (dari folder backend agar PPE_MODEL_PATH relatif tetap benar):
+#   python ../scripts/bench_streams.py --videos cam1.mp4 cam2.mp4 [--streams 8] [--rounds 20]
+import argparse
+import os
+import sys
+import time
+import cv2
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+from detection import get_ppe_model, detect_batch
+
+def load_frames(videos, streams, rounds):
+    """rounds x streams frame; video diulang bila jumlah file < jumlah stream."""
+    caps = [cv2.VideoCapture(videos[i % len(videos)]) for i in range(streams)]
+    frames = []
+    for _ in range(rounds):
+        row = []
+        for cap in caps:
+            ret, frame = cap.read()
+            if not ret:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                ret, frame = cap.read()
+            row.append(frame)
+        frames.append(row)
+    for cap in caps:
+        cap.release()
+    return frames
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--videos", nargs="+", required=True)
+    parser.add_argument("--streams", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    get_ppe_model()  # Muat + warmup backend PPE_BACKEND
+
+    print(f"{'streams':>7} {'separate fps':>13} {'batched fps':>12} {'gain':>6}")
+    for n in args.streams:
+        rounds = load_frames(args.videos, n, args.rounds)
+
+        t0 = time.perf_counter()
+        for row in rounds:
+            for frame in row:
+                detect_batch([frame], with_faces=False)
+        separate_fps = n * len(rounds) / (time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        for row in rounds:
+            detect_batch(row, with_faces=False)
+        batched_fps = n * len(rounds) / (time.perf_counter() - t0)
+
+        print(f"{n:>7} {separate_fps:>13.1f} {batched_fps:>12.1f} {batched_fps / separate_fps:>5.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# bench_workers.py: PIPELINE_MODE=workers, biaya transport frame dan skala throughput terhadap jumlah proses
+# Pakai (dari folder backend):
+#   python ../scripts/bench_workers.py transport [--size 1920x1080] [--frames 500]
+#       ring shared memory (SharedFrameRing) vs frame di-pickle lewat multiprocessing.Queue ke proses lain
+#   python ../scripts/bench_workers.py scale --video cctv.mp4 [--workers 1 2 4 8] [--cameras 1] [--seconds 30]
+#       ProcessPipeline asli (capture + N proses inferensi per kamera), hasil/detik per konfigurasi
+# Mode scale memakai model APD + face_recognition sungguhan; tanpa DB, galeri, dan kepatuhan (tahap proses API).
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+from workers import SharedFrameRing, ProcessPipeline, claim_latest
+
+
+# --- transport ---
+def queue_consumer(source, sink, frames):
+    for _ in range(frames):
+        sent_at, frame = source.get()
+        frame[0, 0, 0]  # Sentuh data seperti worker sungguhan
+        sink.put(time.perf_counter() - sent_at)
+
+def ring_consumer(ring_name, slots, slot_bytes, claimed, sink, frames):
+    ring = SharedFrameRing.attach(ring_name, slots, slot_bytes)
+    seen = 0
+    while seen < frames:
+        claim = claim_latest(ring, claimed)
+        if claim is None:
+            time.sleep(0.0005)
+            continue
+        frame = ring.read(claim[0])
+        if frame is not None:
+            sent_at = float(frame.reshape(-1)[:8].view(np.float64)[0])  # Timestamp disisipkan di byte pertama
+            sink.put(time.perf_counter() - sent_at)
+        seen += 1 + claim[1]
+    ring.close()
+
+def bench_transport(args):
+    width, height = map(int, args.size.lower().split("x"))
+    ctx = multiprocessing.get_context("spawn")
+    frame = np.random.default_rng(0).integers(0, 255, size=(height, width, 3), dtype=np.uint8)
+    results = {}
+
+    source, sink = ctx.Queue(maxsize=4), ctx.Queue()
+    consumer = ctx.Process(target=queue_consumer, args=(source, sink, args.frames))
+    consumer.start()
+    started = time.perf_counter()
+    for _ in range(args.frames):
+        source.put((time.perf_counter(), frame))
+    latencies = [sink.get() for _ in range(args.frames)]
+    results["queue_pickle"] = (time.perf_counter() - started, latencies)
+    consumer.join()
+
+    ring = SharedFrameRing.create(args.slots, frame.nbytes)
+    claimed, sink = ctx.Value("q", 0), ctx.Queue()
+    consumer = ctx.Process(target=ring_consumer, args=(ring.name, args.slots, frame.nbytes, claimed, sink, args.frames))
+    consumer.start()
+    time.sleep(1.0)  # Tunggu proses spawn siap agar yang diukur hanya transport
+    started = time.perf_counter()
+    stamped = frame.copy()
+    for _ in range(args.frames):
+        stamped.reshape(-1)[:8] = np.frombuffer(np.float64(time.perf_counter()).tobytes(), dtype=np.uint8)
+        ring.write(stamped)
+        time.sleep(args.interval)
+    consumer.join()
+    elapsed = time.perf_counter() - started
+    latencies = []
+    while not sink.empty():
+        latencies.append(sink.get())
+    results["shared_ring"] = (elapsed, latencies)
+    ring.close()
+
+    print(f"frame {width}x{height} ({frame.nbytes / 1e6:.1f} MB), {args.frames} frames")
+    print(f"{'path':<14} {'frames/s':>9} {'delivered':>10} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, (elapsed, latencies) in results.items():
+        p50, p95 = np.percentile(np.asarray(latencies) * 1000, [50, 95]) if latencies else (0, 0)
+        print(f"{name:<14} {args.frames / elapsed:>9.1f} {len(latencies):>10} {p50:>8.2f} {p95:>8.2f}")
+    print("queue_pickle mengirim setiap frame; shared_ring selalu mengambil frame terbaru (frame lama boleh terlewati).")
+
+# --- scale ---
+async def run_pipelines(video, workers, cameras, seconds, warmup):
+    async def finish(frame, result, state):
+        return frame, {"timing": result["stages"]}
+
+    async def resolve():
+        return video
+
+    pipelines = [ProcessPipeline(f"bench:{i}", resolve, finish, workers=workers) for i in range(cameras)]
+    subs = [pipeline.subscribe() for pipeline in pipelines]
+    counts = [0] * cameras
+
+    async def consume(i):
+        while True:
+            packet = await subs[i].get()
+            if packet is None:
+                return
+            counts[i] += 1
+
+    consumers = [asyncio.create_task(consume(i)) for i in range(cameras)]
+    await asyncio.sleep(warmup)  # Spawn + muat model per proses
+    before = list(counts)
+    await asyncio.sleep(seconds)
+    measured = [after - b for after, b in zip(counts, before)]
+    for pipeline, sub in zip(pipelines, subs):
+        pipeline.unsubscribe(sub)
+    await asyncio.gather(*consumers, return_exceptions=True)
+    return sum(measured) / seconds
+
+def bench_scale(args):
+    # Dibaca proses worker saat spawn: tanpa motion gating dan pacing, yang diukur kapasitas mentah
+    os.environ.setdefault("SCHED_MOTION_THRESHOLD", "0")
+    os.environ.setdefault("SCHED_TARGET_FPS", "1000")
+    rows = []
+    for workers in args.workers:
+        fps = asyncio.run(run_pipelines(args.video, workers, args.cameras, args.seconds, args.warmup))
+        rows.append({"workers_per_camera": workers, "cameras": args.cameras, "processes": workers * args.cameras,
+                     "results_per_s": round(fps, 2)})
+        print(f"workers/camera {workers:>2} x cameras {args.cameras}: {fps:7.2f} frames/s")
+    base = rows[0]["results_per_s"] or 1
+    print(f"cpus: {os.cpu_count()}; speedup vs {rows[0]['workers_per_camera']} worker(s): "
+          + ", ".join(f"{r['workers_per_camera']}={r['results_per_s'] / base:.2f}x" for r in rows))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"cpus": os.cpu_count(), "video": args.video, "rows": rows}, f, indent=2)
+
+def main():
+    parser = argparse.ArgumentParser()
+    commands = parser.add_subparsers(dest="command", required=True)
+    transport = commands.add_parser("transport")
+    transport.add_argument("--size", default="1920x1080")
+    transport.add_argument("--frames", type=int, default=500)
+    transport.add_argument("--slots", type=int, default=4)
+    transport.add_argument("--interval", type=float, default=0.0, help="jeda antar frame ring (detik), mis. 0.04 = 25 fps")
+    scale = commands.add_parser("scale")
+    scale.add_argument("--video", required=True)
+    scale.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    scale.add_argument("--cameras", type=int, default=1)
+    scale.add_argument("--seconds", type=float, default=30)
+    scale.add_argument("--warmup", type=float, default=20, help="detik untuk spawn + muat model sebelum diukur")
+    scale.add_argument("--output")
+    args = parser.parse_args()
+    bench_transport(args) if args.command == "transport" else bench_scale(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+# compare_ppe_backends.py: Export model APD ke ONNX/OpenVINO (fp32 + int8) lalu bandingkan latensi & akurasi per backend
+# Pakai (dari folder backend):
+#   python ../scripts/compare_ppe_backends.py export --weights ../models/ppe_yolov10m/weights/best.pt \
+#       --calib-images ../datasets/calib [--calib-data data.yaml] [--imgsz 640]
+#   python ../scripts/compare_ppe_backends.py compare --images ../datasets/holdout/images [--labels ../datasets/holdout/labels] \
+#       --candidate pt=ultralytics:../models/ppe_yolov10m/weights/best.pt \
+#       --candidate onnx-int8=onnxruntime:../models/ppe_yolov10m/weights/best-int8.onnx [--threads 4] --output cmp.json
+# Tanpa --labels, kandidat pertama (--reference) dipakai sebagai acuan. Label format YOLO: "class cx cy w h" ternormalisasi.
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+from ppe_backends import create_detector, letterbox, BACKENDS, PPE_IMGSZ
+from ppe_classes import CLASS_NAMES, PPE_WAJIB, PPE_OPSIONAL
+
+IMAGE_PATTERNS = ("*.jpg", "*.jpeg", "*.png", "*.bmp")
+IOU_MATCH = 0.5
+PPE_CLASS_IDS = sorted(class_id for class_id, label in CLASS_NAMES.items() if label in PPE_WAJIB | PPE_OPSIONAL)
+
+
+def list_images(folder):
+    return sorted(path for pattern in IMAGE_PATTERNS for path in glob.glob(os.path.join(folder, pattern)))
+
+# --- Export ---
+class _CalibrationReader:
+    """CalibrationDataReader ONNX Runtime dari folder gambar, pra-proses sama dengan GraphDetector."""
+
+    def __init__(self, input_name, images, imgsz):
+        self.input_name = input_name
+        self.images = iter(images)
+        self.imgsz = imgsz
+
+    def get_next(self):
+        path = next(self.images, None)
+        if path is None:
+            return None
+        blob, _, _ = letterbox(cv2.imread(path), self.imgsz)
+        return {self.input_name: blob[None]}
+
+def export(args):
+    from ultralytics import YOLO
+    exported = {}
+    onnx_path = YOLO(args.weights).export(format="onnx", imgsz=args.imgsz, simplify=True)
+    exported["onnx"] = onnx_path
+    openvino_dir = YOLO(args.weights).export(format="openvino", imgsz=args.imgsz)
+    exported["openvino"] = os.path.join(openvino_dir, os.path.splitext(os.path.basename(args.weights))[0] + ".xml")
+
+    if args.calib_images:
+        # int8 statis (QDQ, per-channel) dengan gambar lapangan sebagai data kalibrasi
+        import onnxruntime as ort
+        from onnxruntime.quantization import quantize_static, QuantFormat, QuantType
+        images = list_images(args.calib_images)[:args.calib_count]
+        input_name = ort.InferenceSession(onnx_path, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+        int8_path = os.path.splitext(onnx_path)[0] + "-int8.onnx"
+        quantize_static(onnx_path, int8_path, _CalibrationReader(input_name, images, args.imgsz),
+                        quant_format=QuantFormat.QDQ, per_channel=True,
+                        activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8)
+        exported["onnx-int8"] = int8_path
+    if args.calib_data:
+        # OpenVINO int8 lewat NNCF bawaan export ultralytics; butuh dataset YAML untuk kalibrasi
+        int8_dir = YOLO(args.weights).export(format="openvino", imgsz=args.imgsz, int8=True, data=args.calib_data)
+        exported["openvino-int8"] = os.path.join(int8_dir, os.path.splitext(os.path.basename(args.weights))[0] + ".xml")
+
+    for name, path in exported.items():
+        print(f"{name:<14} {path}")
+
+# --- Compare ---
+def parse_candidate(spec):
+    name, _, rest = spec.partition("=")
+    backend, _, path = rest.partition(":")
+    if backend not in BACKENDS or not path:
+        raise argparse.ArgumentTypeError(f"Candidate must be name=backend:path with backend in {BACKENDS}: {spec}")
+    return name, backend, path
+
+def load_labels(label_dir, image_path, shape):
+    path = os.path.join(label_dir, os.path.splitext(os.path.basename(image_path))[0] + ".txt")
+    if not os.path.exists(path):
+        return np.zeros((0, 6), dtype=np.float32)
+    rows = np.loadtxt(path, ndmin=2, dtype=np.float32)
+    height, width = shape[:2]
+    cx, cy, w, h = rows[:, 1] * width, rows[:, 2] * height, rows[:, 3] * width, rows[:, 4] * height
+    return np.column_stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2, np.ones(len(rows)), rows[:, 0]])
+
+def iou(a, b):
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+def match_counts(predicted, truth):
+    """(tp, fp, fn) per class_id: pencocokan greedy per kelas, conf tertinggi dulu, IoU >= IOU_MATCH."""
+    counts = {}
+    for class_id in set(predicted[:, 5].astype(int)) | set(truth[:, 5].astype(int)):
+        pred = predicted[predicted[:, 5] == class_id]
+        pred = pred[np.argsort(-pred[:, 4])]
+        gt = truth[truth[:, 5] == class_id]
+        matched = np.zeros(len(gt), dtype=bool)
+        tp = 0
+        if len(pred) and len(gt):
+            ious = iou(pred, gt)
+            for row in ious:
+                row = np.where(matched, -1.0, row)
+                best = int(row.argmax())
+                if row[best] >= IOU_MATCH:
+                    matched[best] = True
+                    tp += 1
+        counts[class_id] = (tp, len(pred) - tp, len(gt) - tp)
+    return counts
+
+def ppe_labels(detections):
+    return {CLASS_NAMES[int(c)] for c in detections[:, 5] if int(c) in PPE_CLASS_IDS}
+
+def score(predictions, truths):
+    totals = np.zeros(3, dtype=np.int64)
+    per_class = {}
+    agree = 0
+    for predicted, truth in zip(predictions, truths):
+        for class_id, counts in match_counts(predicted, truth).items():
+            totals += counts
+            per_class[class_id] = per_class.get(class_id, np.zeros(3, dtype=np.int64)) + counts
+        agree += ppe_labels(predicted) == ppe_labels(truth)  # Set APD per gambar sama = keputusan kepatuhan sama
+    tp, fp, fn = totals
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    ppe_recall = {CLASS_NAMES[c]: round(float(per_class[c][0] / (per_class[c][0] + per_class[c][2])), 3)
+                  for c in PPE_CLASS_IDS if c in per_class and per_class[c][0] + per_class[c][2]}
+    return {"precision": round(precision, 4), "recall": round(recall, 4), "f1": round(f1, 4),
+            "ppe_set_agreement": round(agree / len(truths), 4) if truths else None, "ppe_recall": ppe_recall}
+
+def compare(args):
+    paths = list_images(args.images)[:args.limit]
+    images = [cv2.imread(path) for path in paths]
+    if not images:
+        sys.exit(f"No images in {args.images}")
+
+    results = {}
+    for name, backend, path in args.candidate:
+        detector = create_detector(backend, path, imgsz=args.imgsz, threads=args.threads)
+        detector.warmup()
+        latencies, predictions = [], []
+        for _ in range(args.runs):
+            for image in images:
+                t0 = time.perf_counter()
+                detections = detector.detect([image])[0]
+                latencies.append((time.perf_counter() - t0) * 1000)
+                if len(predictions) < len(images):
+                    predictions.append(detections)
+        p50, p95 = np.percentile(latencies, [50, 95])
+        results[name] = {"backend": backend, "path": path, "imgsz": detector.imgsz, "threads": args.threads,
+                         "p50_ms": round(float(p50), 2), "p95_ms": round(float(p95), 2),
+                         "images_per_s": round(1000 / float(np.mean(latencies)), 2), "predictions": predictions}
+
+    reference = args.reference or args.candidate[0][0]
+    if args.labels:
+        truths = [load_labels(args.labels, path, image.shape) for path, image in zip(paths, images)]
+        truth_source = f"labels:{args.labels}"
+    else:
+        truths = results[reference]["predictions"]
+        truth_source = f"reference:{reference}"
+    for result in results.values():
+        result.update(score(result.pop("predictions"), truths))
+
+    print(f"truth: {truth_source}, images: {len(images)}, runs: {args.runs}")
+    print(f"{'candidate':<14} {'backend':<12} {'p50 ms':>8} {'p95 ms':>8} {'img/s':>7} {'prec':>6} {'recall':>6} "
+          f"{'f1':>6} {'ppe agree':>9}")
+    for name, r in results.items():
+        print(f"{name:<14} {r['backend']:<12} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['images_per_s']:>7.1f} "
+              f"{r['precision']:>6.3f} {r['recall']:>6.3f} {r['f1']:>6.3f} {r['ppe_set_agreement']:>9.1%}")
+
+    # Rekomendasi: tercepat yang F1-nya tidak turun lebih dari --max-f1-drop dari acuan
+    baseline_f1 = results[reference]["f1"]
+    eligible = [name for name, r in results.items() if r["f1"] >= baseline_f1 - args.max_f1_drop]
+    best = min(eligible, key=lambda name: results[name]["p50_ms"])
+    print(f"\nfastest within {args.max_f1_drop:.2f} F1 of {reference}: {best} "
+          f"(PPE_BACKEND={results[best]['backend']} PPE_MODEL_PATH={results[best]['path']})")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"truth": truth_source, "images": len(images), "recommended": best, "candidates": results}, f, indent=2)
+
+def main():
+    parser = argparse.ArgumentParser()
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="export .pt ke ONNX/OpenVINO, opsional int8")
+    export_parser.add_argument("--weights", required=True)
+    export_parser.add_argument("--imgsz", type=int, default=PPE_IMGSZ)
+    export_parser.add_argument("--calib-images", help="folder gambar untuk kalibrasi int8 ONNX")
+    export_parser.add_argument("--calib-count", type=int, default=200)
+    export_parser.add_argument("--calib-data", help="dataset YAML ultralytics untuk int8 OpenVINO")
+
+    compare_parser = commands.add_parser("compare", help="latensi + akurasi kandidat pada gambar held-out")
+    compare_parser.add_argument("--images", required=True)
+    compare_parser.add_argument("--labels", help="folder label YOLO; tanpa ini kandidat acuan menjadi ground truth")
+    compare_parser.add_argument("--candidate", type=parse_candidate, action="append", required=True,
+                                help="name=backend:path, boleh diulang")
+    compare_parser.add_argument("--reference", help="nama kandidat acuan (default kandidat pertama)")
+    compare_parser.add_argument("--imgsz", type=int, default=PPE_IMGSZ)
+    compare_parser.add_argument("--threads", type=int, default=0)
+    compare_parser.add_argument("--runs", type=int, default=3, help="ulangan set gambar untuk latensi")
+    compare_parser.add_argument("--limit", type=int, default=None)
+    compare_parser.add_argument("--max-f1-drop", type=float, default=0.02)
+    compare_parser.add_argument("--output")
+
+    args = parser.parse_args()
+    export(args) if args.command == "export" else compare(args)
+
+if __name__ == "__main__":
+    main()
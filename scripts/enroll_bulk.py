@@ -0,0 +1,214 @@
+# enroll_bulk.py: Pendaftaran massal pekerja dari folder foto / manifest CSV, encode paralel di process pool
+# Pakai (dari folder backend):
+#   python ../scripts/enroll_bulk.py --manifest crew.csv [--photos foto/] [--average] [--workers 8] \
+#       [--on-duplicate skip|update] [--dry-run] [--report enroll_report.csv] [--api http://localhost:8000 --username admin]
+#   python ../scripts/enroll_bulk.py --photos foto/ --company "PT Kontraktor" --role Welder
+# Manifest: kolom employee_id, name (wajib), company, role, status_sim_l, image (opsional). Beberapa baris dengan
+# employee_id sama = beberapa sampel; image boleh berisi beberapa path dipisah ';' (relatif ke folder manifest).
+# Tanpa kolom image, foto dicari di --photos: <employee_id>.jpg dan/atau <employee_id>/*.jpg.
+# Tanpa manifest, setiap file/subfolder di --photos adalah satu pekerja: "<employee_id>__<nama>" atau "<employee_id>".
+import argparse
+import concurrent.futures
+import csv
+import getpass
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+import urllib.parse
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+from enrollment import WORKER_COLUMNS, encode_photo, combine_samples, existing_employee_ids, write_workers
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+REPORT_COLUMNS = ("file", "employee_id", "name", "status", "detail")
+
+
+def is_image(path):
+    return path.lower().endswith(IMAGE_EXTENSIONS)
+
+def photos_for(photos_dir, employee_id):
+    paths = [path for path in glob.glob(os.path.join(photos_dir, glob.escape(employee_id) + ".*")) if is_image(path)]
+    folder = os.path.join(photos_dir, employee_id)
+    if os.path.isdir(folder):
+        paths += [os.path.join(folder, name) for name in os.listdir(folder) if is_image(name)]
+    return sorted(paths)
+
+def load_manifest(path, photos_dir, defaults):
+    """{employee_id: {"worker": {...}, "images": [...], "conflicts": [...]}} dari CSV."""
+    workers = {}
+    base = os.path.dirname(os.path.abspath(path))
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for line, row in enumerate(csv.DictReader(f), start=2):
+            row = {key.strip(): (value or "").strip() for key, value in row.items() if key}
+            employee_id = row.get("employee_id", "")
+            if not employee_id or not row.get("name"):
+                workers.setdefault(f"<line {line}>", {"worker": None, "images": [], "conflicts": [],
+                                                      "error": "employee_id dan name wajib diisi"})
+                continue
+            worker = {column: row.get(column) or defaults[column] for column in WORKER_COLUMNS if column in defaults}
+            worker.update(employee_id=employee_id, name=row["name"])
+            entry = workers.setdefault(employee_id, {"worker": worker, "images": [], "conflicts": []})
+            if entry["worker"] != worker:
+                entry["conflicts"].append(f"baris {line} berbeda dari baris pertama; metadata pertama dipakai")
+            images = [os.path.join(base, image.strip()) for image in row.get("image", "").split(";") if image.strip()]
+            entry["images"] += images
+    if photos_dir:
+        for entry in workers.values():
+            if entry["worker"] and not entry["images"]:
+                entry["images"] = photos_for(photos_dir, entry["worker"]["employee_id"])
+    return workers
+
+def scan_photos(photos_dir, defaults):
+    """Tanpa manifest: nama file/subfolder = "<employee_id>__<nama>" atau "<employee_id>" (nama = employee_id)."""
+    workers = {}
+    for name in sorted(os.listdir(photos_dir)):
+        path = os.path.join(photos_dir, name)
+        if os.path.isdir(path):
+            stem, images = name, sorted(os.path.join(path, f) for f in os.listdir(path) if is_image(f))
+        elif is_image(name):
+            stem, images = os.path.splitext(name)[0], [path]
+        else:
+            continue
+        employee_id, _, worker_name = stem.partition("__")
+        entry = workers.setdefault(employee_id, {"worker": {**defaults, "employee_id": employee_id,
+                                                            "name": worker_name or employee_id},
+                                                 "images": [], "conflicts": []})
+        entry["images"] += images
+    return workers
+
+def encode_all(paths, workers):
+    """{path: (status, encoding, detail)} dengan process pool (spawn: dlib/OpenCV tidak diwarisi dari parent)."""
+    results = {}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        for i, (path, status, encoding, detail) in enumerate(pool.map(encode_photo, paths, chunksize=4), start=1):
+            results[path] = (status, encoding, detail)
+            if i % 50 == 0 or i == len(paths):
+                print(f"encoded {i}/{len(paths)} photos")
+    return results
+
+def refresh_gallery(api, username, updated_ids=()):
+    """Satu reload galeri di server yang sedang berjalan (endpoint admin).
+
+    updated_ids: employee_id yang wajahnya ditimpa; server membacanya ulang dari DB, bukan dari snapshot galeri.
+    """
+    password = os.getenv("ENROLL_API_PASSWORD") or getpass.getpass(f"Password {username}: ")
+    body = urllib.parse.urlencode({"username": username, "password": password}).encode()
+    with urllib.request.urlopen(urllib.request.Request(f"{api}/token", data=body)) as response:
+        token = json.loads(response.read())["access_token"]
+    request = urllib.request.Request(f"{api}/api/workers/reload-gallery", method="POST",
+                                     data=json.dumps({"employee_ids": list(updated_ids)}).encode(),
+                                     headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"})
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--manifest", help="CSV metadata pekerja")
+    parser.add_argument("--photos", help="folder foto (wajib tanpa manifest)")
+    parser.add_argument("--company", default="", help="default bila kolom kosong/tidak ada")
+    parser.add_argument("--role", default="")
+    parser.add_argument("--status-sim-l", default="Aktif")  # Sama dengan default form enrollment
+    parser.add_argument("--average", action="store_true", help="rata-rata semua sampel valid per pekerja")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="ukuran process pool")
+    parser.add_argument("--on-duplicate", choices=("skip", "update"), default="skip",
+                        help="employee_id yang sudah ada di DB: lewati atau timpa metadata + wajah")
+    parser.add_argument("--dry-run", action="store_true", help="encode + laporan saja, tanpa menulis DB")
+    parser.add_argument("--report", default="enroll_report.csv")
+    parser.add_argument("--api", help="URL server untuk reload galeri sekali di akhir, mis. http://localhost:8000")
+    parser.add_argument("--username", default="admin")
+    args = parser.parse_args()
+    if not args.manifest and not args.photos:
+        parser.error("--manifest atau --photos wajib diisi")
+
+    defaults = {"company": args.company, "role": args.role, "status_sim_l": args.status_sim_l}
+    workers = load_manifest(args.manifest, args.photos, defaults) if args.manifest else scan_photos(args.photos, defaults)
+    report = []
+
+    def record(path, worker, status, detail=""):
+        report.append({"file": path, "employee_id": worker["employee_id"] if worker else "",
+                       "name": worker["name"] if worker else "", "status": status, "detail": detail})
+
+    paths = sorted({path for entry in workers.values() if entry["worker"] for path in entry["images"]})
+    started = time.perf_counter()
+    encoded = encode_all(paths, args.workers) if paths else {}
+    encode_s = time.perf_counter() - started
+
+    ready = []  # (worker, encoding)
+    for key, entry in workers.items():
+        worker = entry["worker"]
+        if worker is None:
+            record("", None, "invalid", f"{key}: {entry['error']}")
+            continue
+        for conflict in entry["conflicts"]:
+            record("", worker, "warning", conflict)
+        if not entry["images"]:
+            record("", worker, "rejected", "Tidak ada foto untuk pekerja ini.")
+            continue
+        samples = []
+        for path in entry["images"]:
+            status, encoding, detail = encoded[path]
+            if status == "ok":
+                samples.append((path, encoding))
+            else:
+                record(path, worker, status, detail)
+        if not samples:
+            record("", worker, "rejected", "Tidak ada foto dengan tepat satu wajah.")
+            continue
+        encoding, outliers = combine_samples([e for _, e in samples], average=args.average)
+        if encoding is None:
+            for path, _ in samples:
+                record(path, worker, "outlier", "Wajah berbeda dari sampel lain pekerja ini; tidak dipakai.")
+            record("", worker, "rejected", "Sampel tidak konsisten: tidak ada foto yang cocok dengan sampel lain.")
+            continue
+        for i, (path, _) in enumerate(samples):
+            if i in outliers:
+                record(path, worker, "outlier", "Wajah berbeda dari sampel lain pekerja ini; tidak dipakai.")
+            else:
+                record(path, worker, "accepted", "averaged" if args.average and len(samples) > 1 else "")
+        ready.append((worker, encoding))
+
+    written, updated_ids = 0, []
+    if ready and not args.dry_run:
+        from database import db_cursor
+        with db_cursor() as cursor:
+            existing = existing_employee_ids(cursor, [worker["employee_id"] for worker, _ in ready])
+        inserts = [(w, e) for w, e in ready if w["employee_id"] not in existing]
+        updates = [(w, e) for w, e in ready if w["employee_id"] in existing]
+        if args.on_duplicate == "skip":
+            for worker, _ in updates:
+                record("", worker, "duplicate", "employee_id sudah terdaftar; dilewati (--on-duplicate update untuk menimpa).")
+            updates = []
+        for worker, error in write_workers(db_cursor, inserts, updates):
+            if error:
+                record("", worker, "db_error", error)
+            else:
+                record("", worker, "updated" if worker["employee_id"] in existing else "enrolled")
+                written += 1
+                if worker["employee_id"] in existing:
+                    updated_ids.append(worker["employee_id"])
+
+    with open(args.report, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_COLUMNS)
+        writer.writeheader()
+        writer.writerows(report)
+
+    counts = {}
+    for row in report:
+        counts[row["status"]] = counts.get(row["status"], 0) + 1
+    print(f"workers: {sum(1 for e in workers.values() if e['worker'])}, photos: {len(paths)} "
+          f"({encode_s:.1f}s, {len(paths) / encode_s if encode_s else 0:.1f} photos/s with {args.workers} processes)")
+    print("report:", ", ".join(f"{status}={count}" for status, count in sorted(counts.items())), f"-> {args.report}")
+
+    if written and args.api:
+        print("gallery:", refresh_gallery(args.api.rstrip("/"), args.username, updated_ids))
+    elif written:
+        print("Jalankan POST /api/workers/reload-gallery (admin) agar wajah baru dikenali"
+              + (f'; wajah yang ditimpa: body {{"employee_ids": [...]}} ({len(updated_ids)} pekerja).'
+                 if updated_ids else "."))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+# test_enrollment.py: Penggabungan beberapa sampel wajah satu pekerja (enroll_bulk.py)
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+from enrollment import combine_samples
+
+
+def test_all_samples_inconsistent_rejected():
+    samples = np.eye(3, 128)  # Tiga wajah berbeda: semuanya jauh dari median
+    for average in (True, False):
+        encoding, outliers = combine_samples(samples, average=average)
+        assert encoding is None
+        assert outliers == [0, 1, 2]
+
+def test_outlier_dropped_from_average():
+    samples = np.zeros((4, 128))
+    samples[2, 0] = 1.0
+    encoding, outliers = combine_samples(samples)
+    assert outliers == [2]
+    assert not np.isnan(encoding).any() and encoding[0] == 0
@@ -0,0 +1,61 @@
+# test_gallery.py: Reload galeri setelah face_encoding ditimpa langsung di DB (enroll_bulk --on-duplicate update)
+import os
+import pickle
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+from gallery import FaceGalleryStore, encode_face_blob, decode_face_blob
+
+WORKER = {"id": 1, "employee_id": "E1", "name": "A", "company": "PT X", "role": "Op", "status_sim_l": "Aktif"}
+OLD = np.zeros(128, dtype=np.float32)
+NEW = np.full(128, 0.1, dtype=np.float32)
+
+
+def test_reload_refreshes_overwritten_encoding(tmp_path):
+    path = str(tmp_path / "faces")
+    FaceGalleryStore(snapshot_path=path).reload([WORKER], lambda ids: {1: OLD})  # Snapshot berisi wajah lama
+
+    store = FaceGalleryStore(snapshot_path=path)
+    store.reload([WORKER], lambda ids: {1: NEW})
+    assert store.match([NEW])[0][0] is None  # Tanpa refresh_ids snapshot menang
+
+    store.reload([WORKER], lambda ids: {1: NEW}, refresh_ids=[1])
+    assert store.match([NEW])[0][0]["id"] == 1
+
+    restarted = FaceGalleryStore(snapshot_path=path)  # Snapshot ikut diperbarui
+    restarted.reload([WORKER], lambda ids: {1: OLD})
+    assert restarted.match([NEW])[0][0]["id"] == 1
+
+def test_raw_blob_starting_with_pickle_opcode_round_trips():
+    encoding = np.random.default_rng(0).normal(size=128)
+    blob = bytearray(encode_face_blob(encoding))
+    blob[0] = 0x80  # Byte pertama sama dengan opcode PROTO pickle
+    decoded = decode_face_blob(bytes(blob))
+    assert decoded.shape == (128,)
+    assert decoded.tobytes() == bytes(blob)
+
+def test_legacy_pickle_blob_still_decodes():
+    encoding = np.random.default_rng(1).normal(size=128)
+    assert np.array_equal(decode_face_blob(pickle.dumps(encoding)), encoding)
+
+def test_reload_keeps_changes_made_during_rebuild(tmp_path):
+    store = FaceGalleryStore(snapshot_path=str(tmp_path / "faces"))
+    store.reload([WORKER], lambda ids: {1: OLD})
+    other = {**WORKER, "id": 2, "employee_id": "E2"}
+
+    def fetch_while_enrolling(ids):
+        # Enroll/hapus dari request lain saat reload masih membaca DB
+        store.add(NEW, other)
+        store.remove(1)
+        return {1: OLD}
+
+    store.reload([WORKER], fetch_while_enrolling, refresh_ids=[1])
+    assert [m["id"] for m in store.gallery.metadata] == [2]
+    assert store.match([NEW])[0][0]["id"] == 2
+
+def test_add_replaces_existing_id():
+    gallery = FaceGalleryStore(snapshot_path="unused").gallery.added(OLD, WORKER).added(NEW, WORKER)
+    assert len(gallery) == 1
+    assert gallery.match([NEW])[0][0]["id"] == 1
@@ -0,0 +1,60 @@
+# test_log_archive.py: Manifest arsip gate_logs dipakai bersama server dan scripts/archive_logs.py (proses lain)
+import multiprocessing
+import os
+import sys
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+pytest.importorskip("pyarrow")
+from log_archive import LogArchive
+
+
+def month_rows(month, first_id, count=10):
+    return [{"log_id": first_id + i, "timestamp": month + timedelta(hours=i), "status": "hijau",
+             "description": f"d{first_id + i}", "name": "A", "company": "PT X", "role": "Op",
+             "worker_id": 1, "cctv_id": None, "missing": []} for i in range(count)]
+
+def write_in_other_process(root, month, first_id):
+    LogArchive(root).write_month(month, month_rows(month, first_id))
+
+def run_with_timeout(fn, timeout=10):
+    """Jalankan fn di thread; gagal (bukan hang) bila tidak selesai dalam timeout."""
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(value=fn()), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "blocked on LogArchive lock"
+    return result.get("value")
+
+def test_write_after_other_process_keeps_both_months(tmp_path):
+    root = str(tmp_path)
+    server = LogArchive(root)
+    server.write_month(datetime(2025, 1, 1), month_rows(datetime(2025, 1, 1), 1))
+
+    other = multiprocessing.get_context("spawn").Process(
+        target=write_in_other_process, args=(root, datetime(2025, 3, 1), 100))
+    other.start()
+    other.join(30)
+    assert other.exitcode == 0
+
+    run_with_timeout(lambda: server.write_month(datetime(2025, 2, 1), month_rows(datetime(2025, 2, 1), 50)))
+
+    assert run_with_timeout(lambda: server.archived_until) == datetime(2025, 4, 1)
+    assert [f"{m:%Y-%m}" for m in server.months()] == ["2025-01", "2025-02", "2025-03"]
+    assert LogArchive(root).stats()["rows"] == 30
+
+def test_query_sees_months_written_by_other_process(tmp_path):
+    root = str(tmp_path)
+    server = LogArchive(root)
+    assert server.query() == []
+
+    other = LogArchive(root)  # Instance kedua pada direktori yang sama = proses script
+    other.write_month(datetime(2025, 5, 1), month_rows(datetime(2025, 5, 1), 1))
+
+    logs = run_with_timeout(lambda: server.query(limit=5))
+    assert [log["log_id"] for log in logs] == [10, 9, 8, 7, 6]
+    after = (logs[-1]["timestamp"], logs[-1]["log_id"])
+    assert [log["log_id"] for log in server.query(after=after, limit=10)] == [5, 4, 3, 2, 1]
@@ -0,0 +1,54 @@
+# test_log_writer.py: Batch gate_logs yang gagal ditulis dicoba ulang, bukan langsung dibuang
+import os
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+from log_writer import GateLogWriter, GATE_LOG_COLUMNS
+
+ROW = (1, "2025-01-01 08:00:00", "hijau", "{}", None)
+
+
+def flaky_db(path, failures):
+    """connect() yang gagal `failures` kali dulu, seperti MySQL yang sedang restart."""
+    with sqlite3.connect(path) as conn:
+        conn.execute(f"CREATE TABLE gate_logs (log_id INTEGER PRIMARY KEY AUTOINCREMENT, {', '.join(GATE_LOG_COLUMNS)})")
+    state = {"failures": failures}
+
+    def connect():
+        if state["failures"]:
+            state["failures"] -= 1
+            raise sqlite3.OperationalError("database is restarting")
+        return sqlite3.connect(path)
+    return connect
+
+def count_rows(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM gate_logs").fetchone()[0]
+
+def test_failed_batch_is_retried_until_written(tmp_path):
+    path = str(tmp_path / "logs.db")
+    writer = GateLogWriter(flaky_db(path, failures=3), flush_seconds=0.05, placeholder="?", retry_seconds=0.01)
+    writer.start()
+    for _ in range(5):
+        writer.submit(ROW)
+    deadline = time.monotonic() + 5
+    while writer.stats()["written"] < 5 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    writer.close()
+    assert count_rows(path) == 5
+    assert writer.stats()["failed"] == 0
+    assert writer.stats()["retries"] == 3
+
+def test_failed_batch_dropped_only_when_queue_overflows(tmp_path):
+    path = str(tmp_path / "logs.db")
+    writer = GateLogWriter(flaky_db(path, failures=1), max_queue=2, placeholder="?")
+    writer.submit(ROW)
+    writer.submit(ROW)
+    batch = [writer._queue.get_nowait(), writer._queue.get_nowait()]
+    writer.submit(ROW)
+    writer.submit(ROW)  # Antrean penuh di belakang batch yang gagal
+    writer._write_with_retry(batch)
+    assert writer.stats()["failed"] == 2
+    assert writer.stats()["retries"] == 0